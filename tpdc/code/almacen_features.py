@@ -0,0 +1,200 @@
+import pandas as pd
+import numpy as np
+from cargador_datos import cargar_tabla, cargar_derivada
+from tabla_hechos import cargar_hechos, FUENTES_HECHOS
+from rachas import es_llegada
+from analisis_clasificacion import cargar_brechas
+
+# Versión del almacén de features: incrementarla al cambiar métricas o ventanas
+VERSION_ALMACEN = 2
+FUENTES_ALMACEN = FUENTES_HECHOS + ["qualifying"]
+
+# Ventana móvil (carreras) y vida media del promedio exponencial (carreras)
+VENTANA_MOVIL = 5
+VIDA_MEDIA_EWM = 5
+
+# Métricas por carrera de cada nivel; las features se calculan sobre estas columnas
+METRICAS = {
+    'pilotos': ['puntos', 'grilla', 'llegada', 'abandono', 'q3', 'delta_compañero',
+                'brecha_qualy_compañero_ms'],
+    'constructores': ['puntos', 'grilla', 'llegada', 'abandono', 'q3']
+}
+ENTIDADES = {'pilotos': 'driverId', 'constructores': 'constructorId'}
+
+COLUMNAS_HECHOS = ['raceId', 'race_date', 'driverId', 'constructorId', 'points', 'grid',
+                   'position', 'positionOrder', 'status']
+
+
+def _delta_compañeros(valores, claves):
+    """
+    Diferencia de cada fila con el promedio de sus compañeros (misma carrera y equipo);
+    NA si corrió solo o si no hay valor
+    """
+    grupo = valores.groupby([claves['raceId'], claves['constructorId']])
+    suma = grupo.transform('sum')
+    cantidad = grupo.transform('count')
+    promedio_compañeros = (suma - valores) / (cantidad - 1).where(cantidad > 1)
+    return valores - promedio_compañeros
+
+
+def construir_base_pilotos(hechos=None, qualifying=None, brechas=None):
+    """
+    Métricas de cada piloto en cada carrera: una fila por (driverId, raceId).
+
+    puntos, grilla (NA si larga desde boxes), llegada (posición, NA si no clasificó),
+    abandono (1/0), q3 (1/0, NA sin datos de clasificación), delta_compañero
+    (positionOrder menos el del compañero) y brecha_qualy_compañero_ms (mejor tiempo de
+    clasificación menos el del compañero, de analisis_clasificacion.cargar_brechas).
+    """
+    if hechos is None:
+        hechos = cargar_hechos(COLUMNAS_HECHOS)
+    if qualifying is None:
+        qualifying = cargar_tabla('qualifying', ['raceId', 'driverId', 'q3'])
+    if brechas is None:
+        brechas = cargar_brechas('entrada')
+
+    qualy = qualifying[['raceId', 'driverId']].assign(
+        q3=qualifying['q3'].notna().astype('float64')
+    ).drop_duplicates(['raceId', 'driverId'])
+    qualy = qualy.merge(brechas[['raceId', 'driverId', 'gap_compañero_ms']].drop_duplicates(['raceId', 'driverId']),
+                        on=['raceId', 'driverId'], how='left')
+    datos = hechos[COLUMNAS_HECHOS].merge(qualy, on=['raceId', 'driverId'], how='left')
+
+    orden = datos['positionOrder'].astype('float64')
+    base = pd.DataFrame({
+        'driverId': datos['driverId'],
+        'raceId': datos['raceId'],
+        'race_date': datos['race_date'],
+        'constructorId': datos['constructorId'],
+        'puntos': datos['points'].astype('float64'),
+        'grilla': datos['grid'].astype('float64').where(datos['grid'] > 0),
+        'llegada': datos['position'].astype('float64'),
+        'abandono': (~es_llegada(datos['status'])).astype('float64'),
+        'q3': datos['q3'],
+        'delta_compañero': _delta_compañeros(orden, datos),
+        'brecha_qualy_compañero_ms': datos['gap_compañero_ms'].astype('float64')
+    })
+
+    # Autos compartidos de los años 50: un piloto con dos resultados en la misma carrera
+    agregaciones = {m: 'mean' for m in METRICAS['pilotos']}
+    agregaciones.update({'puntos': 'sum', 'race_date': 'first', 'constructorId': 'first'})
+    return base.groupby(['driverId', 'raceId'], as_index=False, sort=False).agg(agregaciones)
+
+
+def construir_base_constructores(base_pilotos):
+    """
+    Métricas de cada equipo en cada carrera a partir de las de sus pilotos
+    """
+    return base_pilotos.groupby(['constructorId', 'raceId'], as_index=False, sort=False).agg(
+        race_date=('race_date', 'first'),
+        puntos=('puntos', 'sum'),
+        grilla=('grilla', 'mean'),
+        llegada=('llegada', 'mean'),
+        abandono=('abandono', 'mean'),
+        q3=('q3', 'mean')
+    )
+
+
+def calcular_features(base, nivel):
+    """
+    Features móviles, acumuladas y exponenciales de cada métrica por entidad.
+
+    Cada fila incluye la carrera de esa fila (estado *después* de la carrera); las
+    consultas sin fuga de información se hacen con features_previas, que toma la
+    última fila estrictamente anterior a la fecha pedida.
+    """
+    entidad = ENTIDADES[nivel]
+    metricas = METRICAS[nivel]
+    base = base.sort_values([entidad, 'race_date', 'raceId']).reset_index(drop=True)
+    grupo = base.groupby(entidad)[metricas]
+
+    movil = grupo.rolling(VENTANA_MOVIL, min_periods=1).mean().reset_index(level=0, drop=True)
+    acumulada = grupo.expanding().mean().reset_index(level=0, drop=True)
+    exponencial = grupo.ewm(halflife=VIDA_MEDIA_EWM, ignore_na=True).mean().reset_index(level=0, drop=True)
+
+    features = pd.concat([
+        base,
+        movil.add_suffix(f'_m{VENTANA_MOVIL}'),
+        acumulada.add_suffix('_acum'),
+        exponencial.add_suffix('_ewm')
+    ], axis=1)
+    features['carreras'] = base.groupby(entidad).cumcount() + 1
+    return features
+
+
+def construir_almacen(nivel='pilotos'):
+    base = construir_base_pilotos()
+    if nivel == 'constructores':
+        base = construir_base_constructores(base)
+    return calcular_features(base, nivel)
+
+
+def cargar_almacen(nivel='pilotos', forzar=False):
+    """
+    Almacén persistido de features por (driverId, raceId) o (constructorId, raceId)
+    """
+    return cargar_derivada(f"almacen_features_{nivel}", FUENTES_ALMACEN, VERSION_ALMACEN,
+                           lambda: construir_almacen(nivel), forzar=forzar)
+
+
+def actualizar_almacen(almacen, nueva_base, nivel='pilotos'):
+    """
+    Incorpora carreras nuevas ('nueva_base' con el formato de construir_base_*).
+    Solo se recalculan las entidades que aparecen en las carreras nuevas; el resto
+    del almacén no se toca.
+    """
+    entidad = ENTIDADES[nivel]
+    afectadas = almacen[entidad].isin(nueva_base[entidad].unique())
+    columnas_base = nueva_base.columns
+    historia = pd.concat([almacen.loc[afectadas, columnas_base], nueva_base], ignore_index=True) \
+        .drop_duplicates([entidad, 'raceId'], keep='last')
+    recalculadas = calcular_features(historia, nivel)
+    return pd.concat([almacen[~afectadas], recalculadas], ignore_index=True) \
+        .sort_values([entidad, 'race_date', 'raceId']).reset_index(drop=True)
+
+
+def features_previas(almacen, consultas, nivel='pilotos'):
+    """
+    Lookup point-in-time: para cada fila de 'consultas' (entidad + race_date) devuelve
+    las features de la última carrera de esa entidad estrictamente anterior a la fecha.
+    Sirve tanto para carreras futuras como para entrenar sobre carreras pasadas sin fuga.
+    """
+    entidad = ENTIDADES[nivel]
+    columnas = [entidad] + [c for c in almacen.columns
+                            if c not in (entidad, 'race_date', 'raceId', 'constructorId')]
+    consultas = consultas.reset_index(drop=True)
+    # merge_asof exige claves del mismo tipo: el almacén guarda ids int32 y las consultas suelen ser int64
+    claves = {entidad: 'int64', 'race_date': 'datetime64[ns]'}
+    izquierda = consultas[[entidad, 'race_date']].astype(claves).assign(_fila=np.arange(len(consultas))) \
+        .sort_values('race_date')
+    derecha = almacen[columnas + ['race_date']].astype(claves).sort_values('race_date')
+    unidas = pd.merge_asof(izquierda, derecha, on='race_date', by=entidad, allow_exact_matches=False)
+    unidas = unidas.sort_values('_fila').drop(columns=['_fila', entidad, 'race_date']).reset_index(drop=True)
+    unidas['carreras'] = unidas['carreras'].fillna(0).astype(int)  # 0 = sin carreras previas
+    return pd.concat([consultas, unidas], axis=1)
+
+
+if __name__ == "__main__":
+    import time
+
+    for nivel in ENTIDADES:
+        inicio = time.perf_counter()
+        almacen = cargar_almacen(nivel, forzar=True)
+        print(f"🗄️ Almacén de features de {nivel}: {len(almacen):,} filas × {almacen.shape[1]} columnas "
+              f"en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    # Consulta point-in-time: estado de la grilla antes de la última carrera cargada
+    almacen = cargar_almacen('pilotos')
+    ultima = almacen.loc[almacen['race_date'].idxmax(), ['raceId', 'race_date']]
+    grilla = almacen[almacen['raceId'] == ultima['raceId']][['driverId', 'race_date']]
+    previas = features_previas(almacen, grilla)
+
+    # Las consultas armadas a mano traen ids int64 (el almacén usa int32): deben dar lo mismo
+    manual = pd.DataFrame({'driverId': grilla['driverId'].to_numpy(dtype=np.int64),
+                           'race_date': grilla['race_date'].to_numpy()})
+    assert features_previas(almacen, manual).drop(columns=['driverId', 'race_date']) \
+        .equals(previas.drop(columns=['driverId', 'race_date']).reset_index(drop=True))
+    print(f"\n🔎 Features previas a la carrera {ultima['raceId']} ({ultima['race_date']:%Y-%m-%d}):")
+    print(previas[['driverId', 'carreras', f'puntos_m{VENTANA_MOVIL}', 'puntos_ewm', 'abandono_acum',
+                   'q3_ewm', 'delta_compañero_ewm']].sort_values('puntos_ewm', ascending=False)
+          .head(10).round(2).to_string(index=False))
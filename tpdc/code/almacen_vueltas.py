@@ -0,0 +1,237 @@
+import pandas as pd
+import numpy as np
+import glob
+import json
+import os
+from cargador_datos import rutas_cache, guardar_binario, leer_binario
+from sesiones_fastf1 import RUTA_CACHE_FF1, cargar_sesiones, resumen_cargas
+
+# Versión del almacén de vueltas: incrementarla al cambiar columnas o tipos
+VERSION_ALMACEN_VUELTAS = 3
+
+TABLAS_ALMACEN = ('vueltas', 'stints', 'clima', 'resultados', 'estado_pista')
+
+# Columnas timedelta de FastF1 que se guardan como milisegundos enteros (sufijo _ms)
+TIEMPOS_VUELTA = ['Time', 'LapTime', 'LapStartTime', 'PitOutTime', 'PitInTime',
+                  'Sector1Time', 'Sector2Time', 'Sector3Time']
+VELOCIDADES = ['SpeedI1', 'SpeedI2', 'SpeedFL', 'SpeedST']
+BANDERAS_VUELTA = ['IsPersonalBest', 'FreshTyre', 'Deleted', 'IsAccurate']
+# El estado de pista por vuelta no se guarda: se obtiene de la tabla estado_pista (vueltas_verdes)
+CATEGORIAS_VUELTA = ['Driver', 'DriverNumber', 'Team', 'Compound']
+
+CLIMA = ['AirTemp', 'Humidity', 'Pressure', 'TrackTemp', 'WindDirection', 'WindSpeed']
+RESULTADOS = {
+    'DriverNumber': 'category', 'Abbreviation': 'category', 'FullName': 'category',
+    'TeamName': 'category', 'Position': 'Int8', 'GridPosition': 'Int8', 'Points': 'float32',
+    'Status': 'category'
+}
+
+
+def a_ms(tiempos):
+    """
+    Timedeltas (o NaT) a milisegundos enteros Int64
+    """
+    tiempos = pd.to_timedelta(pd.Series(tiempos, copy=False))
+    ns = tiempos.to_numpy(dtype='timedelta64[ns]').view('int64')
+    return pd.Series(pd.array(ns // 1_000_000, dtype='Int64'), index=tiempos.index).mask(tiempos.isna())
+
+
+def sesiones_en_cache():
+    """
+    Sesiones presentes en fastf1_cache como (year, evento, sesión, carpeta), p. ej.
+    (2024, 'Monaco Grand Prix', 'Race', '.../2024/2024-05-26_Monaco_Grand_Prix/2024-05-26_Race')
+    """
+    sesiones = []
+    for carpeta in sorted(glob.glob(os.path.join(RUTA_CACHE_FF1, '[0-9]*', '*', '*'))):
+        if not glob.glob(os.path.join(carpeta, '*.ff1pkl')):
+            continue
+        year = int(os.path.basename(os.path.dirname(os.path.dirname(carpeta))))
+        evento = os.path.basename(os.path.dirname(carpeta)).split('_', 1)[1].replace('_', ' ')
+        sesion = os.path.basename(carpeta).split('_', 1)[1].replace('_', ' ')
+        sesiones.append((year, evento, sesion, carpeta))
+    return sesiones
+
+
+def _firma_cache(sesiones):
+    """
+    Firma (mtime y tamaño de cada .ff1pkl) de las sesiones de la cache
+    """
+    firma = {}
+    for *_, carpeta in sesiones:
+        for archivo in sorted(glob.glob(os.path.join(carpeta, '*.ff1pkl'))):
+            st = os.stat(archivo)
+            firma[os.path.relpath(archivo, RUTA_CACHE_FF1)] = [st.st_mtime_ns, st.st_size]
+    return firma
+
+
+def compactar_vueltas(vueltas):
+    """
+    Tabla de vueltas de FastF1 con tiempos en ms (Int64), velocidades en float32,
+    banderas booleanas y piloto, equipo y compuesto como categorías
+    """
+    compacta = pd.DataFrame(index=vueltas.index)
+    for col in CATEGORIAS_VUELTA:
+        compacta[col] = vueltas[col].astype('string').astype('category')
+    compacta['LapNumber'] = vueltas['LapNumber'].astype('Int16')
+    compacta['Stint'] = vueltas['Stint'].astype('Int8')
+    compacta['TyreLife'] = vueltas['TyreLife'].astype('Int16')
+    compacta['Position'] = vueltas['Position'].astype('Int8')
+    for col in TIEMPOS_VUELTA:
+        compacta[f'{col}_ms'] = a_ms(vueltas[col])
+    for col in VELOCIDADES:
+        compacta[col] = vueltas[col].astype('float32')
+    for col in BANDERAS_VUELTA:
+        compacta[col] = vueltas[col].astype('boolean')
+    return compacta.reset_index(drop=True)
+
+
+def resumir_stints(vueltas):
+    """
+    Una fila por (Driver, Stint) a partir de las vueltas compactas: compuesto,
+    primera y última vuelta, vueltas del stint y vida del neumático al empezar
+    """
+    stints = vueltas[vueltas['Stint'].notna()].groupby(['Driver', 'Stint'], observed=True).agg(
+        Compound=('Compound', 'first'),
+        primera_vuelta=('LapNumber', 'min'),
+        ultima_vuelta=('LapNumber', 'max'),
+        vueltas=('LapNumber', 'size'),
+        vida_inicial=('TyreLife', 'min')
+    ).reset_index()
+    stints['Compound'] = stints['Compound'].astype('category')
+    return stints
+
+
+def compactar_carga(carga):
+    """
+    Convierte una carga de sesiones_fastf1 en las tablas compactas del almacén, con
+    year, evento y sesión como columnas de identificación
+    """
+    vueltas = compactar_vueltas(carga['vueltas'])
+    clima = pd.DataFrame({'Time_ms': a_ms(carga['clima']['Time'])}) if len(carga['clima']) else pd.DataFrame()
+    for col in CLIMA:
+        if col in carga['clima']:
+            clima[col] = carga['clima'][col].astype('float32')
+    if 'Rainfall' in carga['clima']:
+        clima['Rainfall'] = carga['clima']['Rainfall'].astype('boolean')
+    resultados = pd.DataFrame({col: carga['resultados'][col].astype(tipo) for col, tipo in RESULTADOS.items()
+                               if col in carga['resultados']})
+    estado = carga['estado_pista']
+    estado_pista = pd.DataFrame({
+        'Time_ms': a_ms(estado['Time']),
+        'Status': estado['Status'].astype('string').astype('category'),
+        'Message': estado['Message'].astype('string').astype('category')
+    }) if len(estado) else pd.DataFrame()
+
+    tablas = {'vueltas': vueltas, 'stints': resumir_stints(vueltas), 'clima': clima, 'resultados': resultados,
+              'estado_pista': estado_pista}
+    for tabla in tablas.values():
+        tabla.insert(0, 'sesion', carga['sesion'])
+        tabla.insert(0, 'evento', carga['evento'])
+        tabla.insert(0, 'year', np.int16(carga['year']))
+    return tablas
+
+
+def _unir(tablas):
+    """
+    Concatena las tablas de varias sesiones conservando las columnas categóricas
+    """
+    unida = pd.concat(tablas, ignore_index=True)
+    for col in unida.columns:
+        if col in ('evento', 'sesion') or any(isinstance(t[col].dtype, pd.CategoricalDtype)
+                                              for t in tablas if col in t):
+            unida[col] = unida[col].astype('string').astype('category')
+    return unida
+
+
+def construir_almacen_vueltas(n_procesos=None):
+    """
+    Extrae vueltas, stints, clima, resultados y estado de pista de todas las sesiones de fastf1_cache
+    (cargadas en paralelo y en modo offline) y los guarda en la cache columnar de
+    archive. Devuelve (tablas, resumen de cargas); la firma de la cache solo se guarda
+    si todas las sesiones cargaron bien.
+    """
+    sesiones = sesiones_en_cache()
+    cargas = cargar_sesiones([s[:3] for s in sesiones], n_procesos=n_procesos, offline=True)
+    compactas = [compactar_carga(c) for c in cargas if c['ok']]
+
+    tablas = {}
+    for nombre in TABLAS_ALMACEN:
+        tablas[nombre] = _unir([c[nombre] for c in compactas]) if compactas else pd.DataFrame()
+        guardar_binario(tablas[nombre], rutas_cache(f"ff1_{nombre}")[0])
+
+    # Con alguna sesión fallida el almacén queda incompleto: sin meta, la próxima lectura reintenta
+    resumen = resumen_cargas(cargas)
+    ruta_meta = rutas_cache("ff1_vueltas")[1]
+    if all(c['ok'] for c in cargas):
+        with open(ruta_meta, "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION_ALMACEN_VUELTAS, "firma": _firma_cache(sesiones)}, f, indent=2)
+    elif os.path.exists(ruta_meta):
+        os.remove(ruta_meta)
+    return tablas, resumen
+
+
+def _leer_mapeado(ruta_datos, columnas=None):
+    """
+    Lee una tabla del almacén; con Parquet y pyarrow el archivo se mapea en memoria
+    en vez de copiarse a un buffer
+    """
+    if ruta_datos.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+            return pq.read_table(ruta_datos, columns=columnas, memory_map=True).to_pandas()
+        except ImportError:
+            pass
+    return leer_binario(ruta_datos, columnas)
+
+
+def cargar_almacen_vueltas(tablas=TABLAS_ALMACEN, forzar=False, n_procesos=None):
+    """
+    Devuelve (tablas, resumen): las tablas pedidas del almacén de vueltas
+    ({nombre: DataFrame}) y, si hubo que reconstruirlo, el resumen de cargas por sesión
+    (None al leerlo del disco). Se reconstruye si cambia VERSION_ALMACEN_VUELTAS o algún
+    .ff1pkl de la cache, o si la última construcción tuvo sesiones fallidas.
+    """
+    ruta_meta = rutas_cache("ff1_vueltas")[1]
+    try:
+        with open(ruta_meta, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = None
+
+    vigente = meta is not None and meta.get("version") == VERSION_ALMACEN_VUELTAS \
+        and meta.get("firma") == _firma_cache(sesiones_en_cache()) \
+        and all(os.path.exists(rutas_cache(f"ff1_{nombre}")[0]) for nombre in tablas)
+    if forzar or not vigente:
+        construidas, resumen = construir_almacen_vueltas(n_procesos)
+        return {nombre: construidas[nombre] for nombre in tablas}, resumen
+    return {nombre: _leer_mapeado(rutas_cache(f"ff1_{nombre}")[0]) for nombre in tablas}, None
+
+
+def tablas_sesion(almacen, year, evento, sesion='Race'):
+    """
+    Filas del almacén de una sesión; 'evento' puede ser parcial ('Monaco' → 'Monaco Grand Prix')
+    """
+    seleccion = {}
+    for nombre, tabla in almacen.items():
+        if 'year' not in tabla:
+            seleccion[nombre] = tabla
+            continue
+        mascara = (tabla['year'] == int(year)) & tabla['evento'].astype('string').str.contains(evento, case=False) \
+            & (tabla['sesion'] == sesion)
+        seleccion[nombre] = tabla[mascara.fillna(False)]
+    return seleccion
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    almacen, resumen = construir_almacen_vueltas()
+    print(f"🗜️  Almacén de vueltas construido en {time.perf_counter() - inicio:.2f} s "
+          f"({resumen['ok'].sum()} de {len(resumen)} sesiones)")
+    for nombre, tabla in almacen.items():
+        print(f"   • {nombre:<10}: {len(tabla):6,} filas, {tabla.memory_usage(deep=True).sum() / 1024:8.1f} KB")
+
+    inicio = time.perf_counter()
+    almacen, _ = cargar_almacen_vueltas()
+    print(f"⚡ Lectura desde el almacén: {(time.perf_counter() - inicio) * 1000:.1f} ms")
@@ -0,0 +1,102 @@
+from cargador_datos import cargar_tabla, cargar_derivada
+from tiempos import tiempo_a_ms
+
+# Versión de las tablas de clasificación: incrementarla al cambiar columnas
+VERSION_CLASIFICACION = 1
+
+SESIONES = ['q1', 'q2', 'q3']
+
+
+def tiempos_clasificacion(qualifying=None):
+    """
+    qualifying.csv con q1, q2 y q3 convertidos a milisegundos enteros (q1_ms, q2_ms,
+    q3_ms) y el mejor tiempo de cada entrada (mejor_ms)
+    """
+    if qualifying is None:
+        qualifying = cargar_tabla('qualifying', ['raceId', 'driverId', 'constructorId', 'position'] + SESIONES)
+    tiempos = qualifying.drop(columns=SESIONES).copy()
+    for sesion in SESIONES:
+        tiempos[f'{sesion}_ms'] = tiempo_a_ms(qualifying[sesion])
+    tiempos['mejor_ms'] = tiempos[[f'{s}_ms' for s in SESIONES]].min(axis=1).astype('Int64')
+    return tiempos
+
+
+def _diferencia_compañero(ms, claves):
+    """
+    Tiempo menos el promedio de los compañeros en la misma sesión; NA si no hay compañero con tiempo
+    """
+    grupo = ms.groupby([claves[c] for c in ['raceId', 'sesion', 'constructorId']], observed=True)
+    suma = grupo.transform('sum')
+    cantidad = grupo.transform('count')
+    return ms - (suma - ms) / (cantidad - 1).where(cantidad > 1)
+
+
+def construir_brechas_sesion():
+    """
+    Una fila por (raceId, sesión, piloto) con tiempo: diferencia con la pole de la
+    sesión, con el compañero y porcentaje respecto del mejor tiempo de la sesión
+    (la regla del 107% se lee directamente de 'pct_mejor').
+    """
+    tiempos = tiempos_clasificacion()
+    largo = tiempos.melt(id_vars=['raceId', 'driverId', 'constructorId'],
+                         value_vars=[f'{s}_ms' for s in SESIONES], var_name='sesion', value_name='ms')
+    largo = largo[largo['ms'].notna()].copy()
+    largo['sesion'] = largo['sesion'].str.replace('_ms', '', regex=False).astype('category')
+    largo['ms'] = largo['ms'].astype('float64')
+
+    mejor = largo.groupby(['raceId', 'sesion'], observed=True)['ms'].transform('min')
+    largo['gap_pole_ms'] = largo['ms'] - mejor
+    largo['pct_mejor'] = largo['ms'] / mejor * 100
+    largo['gap_compañero_ms'] = _diferencia_compañero(largo['ms'], largo)
+    return largo.sort_values(['raceId', 'sesion', 'ms']).reset_index(drop=True)
+
+
+def construir_brechas_entrada():
+    """
+    Una fila por entrada de qualifying.csv con el mejor tiempo del piloto en toda la
+    clasificación: diferencia con la pole, con el compañero y porcentaje de la pole
+    """
+    tiempos = tiempos_clasificacion()
+    entrada = tiempos[['raceId', 'driverId', 'constructorId', 'position']].copy()
+    mejor = tiempos['mejor_ms'].astype('float64')
+    pole = mejor.groupby(tiempos['raceId']).transform('min')
+    entrada['mejor_ms'] = mejor
+    entrada['gap_pole_ms'] = mejor - pole
+    entrada['pct_pole'] = mejor / pole * 100
+    entrada['gap_compañero_ms'] = _diferencia_compañero(mejor, tiempos.assign(sesion='todas'))
+    return entrada
+
+
+def cargar_brechas(por='entrada', forzar=False):
+    """
+    Brechas de clasificación persistidas: por='entrada' (mejor tiempo de cada piloto
+    en cada carrera) o por='sesion' (cada tiempo de Q1, Q2 y Q3)
+    """
+    construir = {'entrada': construir_brechas_entrada, 'sesion': construir_brechas_sesion}[por]
+    return cargar_derivada(f"brechas_clasificacion_{por}", ["qualifying"], VERSION_CLASIFICACION,
+                           construir, forzar=forzar)
+
+
+if __name__ == "__main__":
+    import time
+    from tabla_hechos import cargar_hechos
+
+    for por in ('sesion', 'entrada'):
+        inicio = time.perf_counter()
+        brechas = cargar_brechas(por, forzar=True)
+        print(f"🏁 Brechas de clasificación por {por}: {len(brechas):,} filas en "
+              f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    # Brecha media con la pole y con el compañero de la grilla 2024
+    hechos = cargar_hechos(['raceId', 'year', 'driverId', 'driver_name'])
+    entrada = brechas.merge(hechos, on=['raceId', 'driverId'])
+    temporada = entrada[entrada['year'] == entrada['year'].max()]
+    resumen = temporada.groupby('driver_name', observed=True).agg(
+        gap_pole=('gap_pole_ms', 'median'),
+        gap_compañero=('gap_compañero_ms', 'median'),
+        pct_pole=('pct_pole', 'median')
+    ).sort_values('gap_pole')
+    print(f"\n📊 CLASIFICACIÓN {temporada['year'].max()} (medianas, ms):")
+    for piloto, fila in resumen.head(10).iterrows():
+        print(f"   • {piloto:<20}: pole +{fila['gap_pole']:5.0f} | compañero {fila['gap_compañero']:+5.0f} | "
+              f"{fila['pct_pole']:.3f}%")
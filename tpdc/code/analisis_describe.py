@@ -1,142 +1,123 @@
-import pandas as pd
 import os
+from cargador_datos import RUTA_ARCHIVE
+from perfil_archivos import perfilar_archive
 
-def analizar_archivos_con_describe():
+# Archivos esperados en archive (lap_times.csv puede faltar: se informa y se sigue)
+ARCHIVOS = [
+    "circuits",
+    "constructor_results",
+    "constructor_standings",
+    "constructors",
+    "driver_standings",
+    "drivers",
+    "lap_times",
+    "pit_stops",
+    "qualifying",
+    "races",
+    "results",
+    "seasons",
+    "sprint_results",
+    "status"
+]
+
+
+def _mostrar_perfil(perfil):
     """
-    Aplica la función .describe() de pandas a todos los archivos CSV
-    para obtener estadísticas descriptivas completas
+    Imprime el perfil de un archivo con el formato del análisis descriptivo
+    """
+    print(f"\n{'='*80}")
+    print(f"📁 ARCHIVO: {perfil['archivo'].upper()}")
+    print(f"{'='*80}")
+
+    if not perfil['existe']:
+        print(f"❌ No se encontró {perfil['archivo']}, se omite")
+        return
+
+    filas, columnas = perfil['filas'], perfil['columnas']
+    print(f"📊 INFORMACIÓN GENERAL:")
+    print(f"   • Forma del dataset: {filas:,} filas × {columnas} columnas")
+    print(f"   • Tamaño en disco: {perfil['bytes'] / 1024**2:.2f} MB")
+
+    perfiles = perfil['perfil_columnas']
+    print(f"\n🔢 TIPOS DE DATOS:")
+    tipos = {}
+    for col in perfiles.values():
+        tipos[col['tipo']] = tipos.get(col['tipo'], 0) + 1
+    for tipo, cantidad in sorted(tipos.items(), key=lambda kv: -kv[1]):
+        print(f"   • {tipo}: {cantidad} columnas")
+
+    print(f"\n❓ VALORES NULOS:")
+    print(f"   • Total de valores nulos: {perfil['nulos']:,}")
+    if perfil['nulos'] > 0 and filas > 0:
+        print(f"   • Porcentaje de valores nulos: {perfil['nulos'] / (filas * columnas) * 100:.2f}%")
+        print("   • Columnas con valores nulos:")
+        for nombre, col in perfiles.items():
+            if col['nulos'] > 0:
+                print(f"     - {nombre}: {col['nulos']:,} ({col['nulos'] / filas * 100:.1f}%)")
+    else:
+        print("   • ✅ No hay valores nulos")
+
+    numericas = {nombre: col for nombre, col in perfiles.items() if 'media' in col}
+    if numericas:
+        print(f"\n📈 ESTADÍSTICAS DESCRIPTIVAS (COLUMNAS NUMÉRICAS):")
+        print(f"   {'columna':<22}{'conteo':>10}{'media':>14}{'desvío':>14}{'mín':>12}"
+              f"{'25%':>12}{'50%':>12}{'75%':>12}{'máx':>12}{'únicos':>10}")
+        for nombre, col in numericas.items():
+            q = col['cuantiles']
+            print(f"   {nombre:<22}{col['conteo']:>10,}{col['media']:>14.3f}{col['desvio']:>14.3f}"
+                  f"{col['minimo']:>12.6g}{q['0.25']:>12.6g}{q['0.5']:>12.6g}{q['0.75']:>12.6g}"
+                  f"{col['maximo']:>12.6g}{col['distintos_aprox']:>10,}")
+
+    texto = {nombre: col for nombre, col in perfiles.items() if 'media' not in col}
+    if texto:
+        print(f"\n📝 ESTADÍSTICAS DESCRIPTIVAS (COLUMNAS DE TEXTO Y FECHAS):")
+        for nombre, col in texto.items():
+            print(f"   • {nombre}: {col['conteo']:,} valores, ~{col['distintos_aprox']:,} únicos "
+                  f"(de '{col['minimo']}' a '{col['maximo']}')")
+
+    frecuentes = {nombre: col['frecuencias'] for nombre, col in perfiles.items() if 'frecuencias' in col}
+    if frecuentes:
+        print(f"\n🔍 DISTRIBUCIÓN DE COLUMNAS CON POCOS VALORES:")
+        for nombre, frecuencias in frecuentes.items():
+            print(f"   • {nombre}: {dict(list(frecuencias.items())[:5])}")
+
+    print(f"\n🔄 REGISTROS DUPLICADOS{'' if perfil['duplicados_exactos'] else ' (estimados)'}:")
+    print(f"   • Total de filas duplicadas: {perfil['duplicados']:,}")
+    if perfil['duplicados'] > 0:
+        print(f"   • Porcentaje de duplicados: {perfil['duplicados'] / filas * 100:.2f}%")
+    else:
+        print("   • ✅ No hay registros duplicados")
+
+    print(f"\n✅ Análisis de {perfil['archivo']} completado")
+
+
+def analizar_archivos_con_describe(n_procesos=None):
+    """
+    Estadísticas descriptivas de todos los CSV de archive con el perfilador por
+    bloques de perfil_archivos: una sola pasada por archivo con memoria acotada,
+    archivos en paralelo y reporte JSON en archive/cache/perfil_archive.json
     """
-    # Obtener la ruta a los archivos
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    ruta = os.path.join(script_dir, "..", "archive") + os.sep
-    
     print("="*90)
-    print("📊 ANÁLISIS ESTADÍSTICO DESCRIPTIVO DE ARCHIVOS F1 CON .describe()")
+    print("📊 ANÁLISIS ESTADÍSTICO DESCRIPTIVO DE ARCHIVOS F1")
     print("="*90)
-    
-    # Lista de archivos CSV a analizar
-    archivos = [
-        "circuits.csv",
-        "constructor_results.csv",
-        "constructor_standings.csv",
-        "constructors.csv",
-        "driver_standings.csv",
-        "drivers.csv",
-        "lap_times.csv",
-        "pit_stops.csv",
-        "qualifying.csv",
-        "races.csv",
-        "results.csv",
-        "seasons.csv",
-        "sprint_results.csv",
-        "status.csv"
-    ]
-    
-    # Verificar que el directorio existe
-    if not os.path.exists(ruta):
-        print(f"❌ Error: No se encontró el directorio {ruta}")
+
+    if not os.path.exists(RUTA_ARCHIVE):
+        print(f"❌ Error: No se encontró el directorio {RUTA_ARCHIVE}")
         return
-    
-    print(f"🔍 Analizando archivos en: {ruta}")
-    print()
-    
-    for archivo in archivos:
-        try:
-            print(f"\n{'='*80}")
-            print(f"📁 ARCHIVO: {archivo.upper()}")
-            print(f"{'='*80}")
-            
-            # Cargar el archivo
-            df = pd.read_csv(ruta + archivo)
-            
-            print(f"📊 INFORMACIÓN GENERAL:")
-            print(f"   • Forma del dataset: {df.shape[0]:,} filas × {df.shape[1]} columnas")
-            print(f"   • Memoria utilizada: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-            
-            # Información de tipos de datos
-            print(f"\n🔢 TIPOS DE DATOS:")
-            tipos = df.dtypes.value_counts()
-            for tipo, cantidad in tipos.items():
-                print(f"   • {tipo}: {cantidad} columnas")
-            
-            # Valores nulos
-            nulos = df.isnull().sum()
-            total_nulos = nulos.sum()
-            print(f"\n❓ VALORES NULOS:")
-            print(f"   • Total de valores nulos: {total_nulos:,}")
-            if total_nulos > 0:
-                print(f"   • Porcentaje de valores nulos: {(total_nulos / (df.shape[0] * df.shape[1]) * 100):.2f}%")
-                print("   • Columnas con valores nulos:")
-                for col, nul in nulos[nulos > 0].items():
-                    print(f"     - {col}: {nul:,} ({nul/len(df)*100:.1f}%)")
-            else:
-                print("   • ✅ No hay valores nulos")
-            
-            # Análisis describe para columnas numéricas
-            columnas_numericas = df.select_dtypes(include=['number']).columns
-            if len(columnas_numericas) > 0:
-                print(f"\n📈 ESTADÍSTICAS DESCRIPTIVAS (COLUMNAS NUMÉRICAS):")
-                print(f"   • Columnas numéricas encontradas: {len(columnas_numericas)}")
-                print(f"   • Columnas: {', '.join(columnas_numericas)}")
-                print()
-                
-                desc_num = df[columnas_numericas].describe()
-                print(desc_num.to_string())
-                
-                # Análisis adicional para columnas numéricas
-                print(f"\n🔍 ANÁLISIS ADICIONAL COLUMNAS NUMÉRICAS:")
-                for col in columnas_numericas:
-                    valores_unicos = df[col].nunique()
-                    print(f"   • {col}: {valores_unicos:,} valores únicos")
-                    if valores_unicos <= 20:  # Si hay pocos valores únicos, mostrar la distribución
-                        print(f"     Distribución: {dict(df[col].value_counts().head())}")
-            else:
-                print(f"\n📈 ESTADÍSTICAS DESCRIPTIVAS:")
-                print("   • No se encontraron columnas numéricas")
-            
-            # Análisis describe para columnas categóricas/objeto
-            columnas_objeto = df.select_dtypes(include=['object']).columns
-            if len(columnas_objeto) > 0:
-                print(f"\n📝 ESTADÍSTICAS DESCRIPTIVAS (COLUMNAS DE TEXTO):")
-                print(f"   • Columnas de texto encontradas: {len(columnas_objeto)}")
-                print(f"   • Columnas: {', '.join(columnas_objeto)}")
-                print()
-                
-                desc_obj = df[columnas_objeto].describe()
-                print(desc_obj.to_string())
-                
-                # Análisis adicional para columnas de texto
-                print(f"\n🔍 ANÁLISIS ADICIONAL COLUMNAS DE TEXTO:")
-                for col in columnas_objeto:
-                    valores_unicos = df[col].nunique()
-                    print(f"   • {col}: {valores_unicos:,} valores únicos")
-                    if valores_unicos <= 10:  # Si hay pocos valores únicos, mostrar todos
-                        print(f"     Valores: {list(df[col].unique())}")
-                    elif valores_unicos <= 20:  # Si hay algunos valores, mostrar los más frecuentes
-                        print(f"     Top valores: {list(df[col].value_counts().head().index)}")
-            
-            # Duplicados
-            duplicados = df.duplicated().sum()
-            print(f"\n🔄 REGISTROS DUPLICADOS:")
-            print(f"   • Total de filas duplicadas: {duplicados:,}")
-            if duplicados > 0:
-                print(f"   • Porcentaje de duplicados: {(duplicados/len(df)*100):.2f}%")
-            else:
-                print("   • ✅ No hay registros duplicados")
-            
-            print(f"\n✅ Análisis de {archivo} completado")
-            
-        except Exception as e:
-            print(f"❌ Error al procesar {archivo}: {str(e)}")
-            continue
-    
+
+    print(f"🔍 Analizando archivos en: {RUTA_ARCHIVE}")
+    reporte = perfilar_archive(ARCHIVOS, n_procesos=n_procesos)
+    for perfil in reporte:
+        _mostrar_perfil(perfil)
+
     print(f"\n{'='*90}")
     print("🎯 RESUMEN FINAL")
     print(f"{'='*90}")
-    print("✅ Análisis descriptivo completado para todos los archivos")
-    print("📊 Se aplicó .describe() a columnas numéricas y de texto")
-    print("🔍 Se analizaron tipos de datos, valores nulos y duplicados")
-    print("📈 Se proporcionaron estadísticas adicionales relevantes")
+    presentes = [p for p in reporte if p['existe']]
+    print(f"✅ Análisis descriptivo completado: {len(presentes)} de {len(reporte)} archivos")
+    print(f"📊 Filas analizadas: {sum(p['filas'] for p in presentes):,}")
+    print("🔍 Conteos, nulos, media y desvío, extremos, cuantiles, únicos y duplicados en una pasada")
+    return reporte
 
 if __name__ == "__main__":
-    analizar_archivos_con_describe()
\ No newline at end of file
+    analizar_archivos_con_describe()
@@ -0,0 +1,206 @@
+import pandas as pd
+import numpy as np
+import os
+from multiprocessing import Pool
+from cargador_datos import cargar_tabla, cargar_derivada
+from tabla_hechos import cargar_hechos, FUENTES_HECHOS
+from clasificacion_final import cargar_clasificacion_final
+from prediccion_2026 import (FACTOR_EXPERIENCIA, REPARTO_PRIMER_PILOTO, factor_edad,
+                             proyectar_puntos_constructor)
+from prediccion_2026_avanzada import (FACTOR_CONTRATO, factor_edad_avanzado, factor_adaptacion,
+                                      momentum_equipo)
+
+# Versión de las features por temporada objetivo: incrementarla al cambiar columnas
+VERSION_FEATURES = 2
+FUENTES_FEATURES = FUENTES_HECHOS + ["qualifying", "driver_standings", "constructor_standings"]
+
+# Años de historia usados por cada modelo (los scripts 2026 usan 2022-2024 con datos hasta 2024)
+VENTANA_AÑOS = 3
+MIN_CARRERAS_VENTANA = 10       # Filtro de pilotos relevantes del modelo avanzado
+PUNTOS_EQUIPO_DESCONOCIDO = 100  # Equipo sin 3 temporadas de historia (mismo valor que prediccion_2026)
+
+# Nivel de experiencia del modelo base según carreras disputadas antes de la temporada
+UMBRALES_EXPERIENCIA = [0, 22, 100, 250, np.inf]
+NIVELES_EXPERIENCIA = ['Baja', 'Media', 'Alta', 'Máxima']
+
+COLUMNAS_HECHOS = ['raceId', 'year', 'driverId', 'constructorId', 'dob', 'points', 'position']
+
+
+def construir_features(año, hechos=None):
+    """
+    Entradas de ambos modelos para predecir la temporada 'año' usando solo datos
+    de temporadas anteriores. La alineación (equipo principal de cada piloto) y la
+    cantidad de carreras del calendario se toman de 'año', como se conocen antes de empezar.
+    """
+    if hechos is None:
+        hechos = cargar_hechos(COLUMNAS_HECHOS)
+    ultimo = año - 1
+    previos = hechos[hechos['year'] < año]
+    ventana = previos[previos['year'] > ultimo - VENTANA_AÑOS]
+
+    # Alineación: equipo con más carreras de cada piloto en la temporada objetivo
+    temporada = hechos[hechos['year'] == año]
+    alineacion = temporada.groupby(['driverId', 'constructorId']).size().rename('n').reset_index() \
+        .sort_values(['driverId', 'n'], ascending=[True, False]).drop_duplicates('driverId')
+    features = alineacion[['driverId', 'constructorId']].reset_index(drop=True)
+    features.insert(0, 'year', año)
+    nacimiento = temporada.drop_duplicates('driverId').set_index('driverId')['dob']
+    features['edad'] = año - features['driverId'].map(nacimiento).dt.year
+    features['carreras_temporada'] = temporada['raceId'].nunique()
+
+    # Modelo base: experiencia, rol en el equipo y proyección de puntos del constructor
+    features['carreras_previas'] = features['driverId'].map(previos.groupby('driverId').size()) \
+        .fillna(0).astype(int)
+    features['experiencia'] = pd.cut(features['carreras_previas'], UMBRALES_EXPERIENCIA,
+                                     labels=NIVELES_EXPERIENCIA, right=False).astype(str)
+
+    pilotos_previos = cargar_clasificacion_final('pilotos', ultimo, ultimo).set_index('driverId')['points']
+    features['puntos_previos'] = features['driverId'].map(pilotos_previos).fillna(-1)
+    features['primer_piloto'] = features.sort_values(['puntos_previos', 'carreras_previas'], ascending=False) \
+        .groupby('constructorId').cumcount().reindex(features.index) == 0
+
+    constructores = cargar_clasificacion_final('constructores', ultimo - VENTANA_AÑOS + 1, ultimo) \
+        .sort_values('year')
+    historia = constructores.groupby('constructorId')['points'].agg(list)
+    proyeccion = {equipo: max(0, proyectar_puntos_constructor(puntos, horizonte=año - ultimo)[0])
+                  for equipo, puntos in historia.items() if len(puntos) >= VENTANA_AÑOS}
+    features['puntos_equipo'] = features['constructorId'].map(proyeccion).fillna(PUNTOS_EQUIPO_DESCONOCIDO)
+
+    # Modelo avanzado: rendimiento en la ventana, tasa de Q3 y momentum del equipo
+    por_piloto = ventana.groupby('driverId').agg(
+        carreras_ventana=('raceId', 'count'),
+        puntos_ventana=('points', 'sum'),
+        posicion_media=('position', 'mean')
+    )
+    qualifying = cargar_tabla('qualifying', ['raceId', 'driverId', 'q3'])
+    q3 = qualifying[qualifying['raceId'].isin(ventana['raceId'].unique()) & qualifying['q3'].notna()] \
+        .groupby('driverId').size()
+    features = features.merge(por_piloto, left_on='driverId', right_index=True, how='left')
+    features['carreras_ventana'] = features['carreras_ventana'].fillna(0).astype(int)
+    features['ppr_ventana'] = (features['puntos_ventana'] / features['carreras_ventana']).fillna(0)
+    features['q3_rate'] = (features['driverId'].map(q3).fillna(0) / features['carreras_ventana']).fillna(0)
+    features['race_skill'] = (20 - features['posicion_media'].astype('float64')).fillna(0)
+
+    # Momentum: puntos por temporada de las últimas 3 temporadas vs las 2 anteriores
+    por_temporada = previos.groupby(['constructorId', 'year'])['points'].sum().reset_index()
+    reciente = por_temporada[por_temporada['year'] > ultimo - 3].groupby('constructorId')['points'].mean()
+    anterior = por_temporada[por_temporada['year'].between(ultimo - 4, ultimo - 3)] \
+        .groupby('constructorId')['points'].mean()
+    tiene_ambos = features['constructorId'].isin(reciente.index) & features['constructorId'].isin(anterior.index)
+    reciente = features['constructorId'].map(reciente).fillna(0).to_numpy()
+    anterior = features['constructorId'].map(anterior).fillna(0).to_numpy()
+    features['momentum'] = np.where(tiene_ambos, momentum_equipo(reciente, anterior), 1.0)
+    # Cociente sin limitar (para barrer los límites del momentum en barrido_factores.py)
+    features['momentum_bruto'] = np.where(
+        tiene_ambos & (anterior > 0), reciente / np.where(anterior > 0, anterior, 1), 1.0
+    )
+
+    return features.drop(columns=['puntos_ventana', 'posicion_media'])
+
+
+def cargar_features(año, forzar=False):
+    """
+    Features persistidas de la temporada objetivo 'año' (una entrada de cache por año)
+    """
+    return cargar_derivada(f"features_backtest_{año}", FUENTES_FEATURES, VERSION_FEATURES,
+                           lambda: construir_features(año), forzar=forzar)
+
+
+def predecir_modelo_base(features):
+    """
+    Modelo de prediccion_2026.py: puntos proyectados del equipo × reparto entre pilotos
+    × factor de edad × factor de experiencia (sin los ajustes manuales por equipo/piloto)
+    """
+    reparto = np.where(features['primer_piloto'], REPARTO_PRIMER_PILOTO, 1 - REPARTO_PRIMER_PILOTO)
+    return features['puntos_equipo'] * reparto * factor_edad(features['edad'].to_numpy()) \
+        * features['experiencia'].map(FACTOR_EXPERIENCIA).to_numpy()
+
+
+def predecir_modelo_avanzado(features):
+    """
+    Modelo de prediccion_2026_avanzada.py: puntos por carrera en la ventana × carreras
+    del calendario × edad × momentum del equipo × contrato × adaptación. Los pilotos con
+    menos de MIN_CARRERAS_VENTANA carreras (rookies) quedan en 0, como en el script.
+    """
+    base = features['ppr_ventana'] * features['carreras_temporada']
+    prediccion = base * factor_edad_avanzado(features['edad'].to_numpy()) * features['momentum'] \
+        * FACTOR_CONTRATO['probable'] * factor_adaptacion(features['q3_rate'], features['race_skill'])
+    return prediccion.where(features['carreras_ventana'] >= MIN_CARRERAS_VENTANA, 0.0)
+
+
+MODELOS = {
+    'base': predecir_modelo_base,
+    'avanzado': predecir_modelo_avanzado
+}
+
+
+def evaluar_prediccion(features, prediccion, real):
+    """
+    Compara puntos predichos con la clasificación final real de la temporada:
+    correlación de Spearman, MAE de puntos y acierto del campeón
+    """
+    comparacion = features[['driverId']].assign(prediccion=np.asarray(prediccion, dtype=np.float64)) \
+        .merge(real[['driverId', 'points', 'position']], on='driverId')
+    return {
+        'pilotos': len(comparacion),
+        'spearman': comparacion['prediccion'].corr(comparacion['points'], method='spearman'),
+        'mae_puntos': (comparacion['prediccion'] - comparacion['points']).abs().mean(),
+        'campeon_ok': comparacion.loc[comparacion['prediccion'].idxmax(), 'position'] == 1
+    }
+
+
+def evaluar_año(año, modelos=None):
+    """
+    Predice la temporada 'año' con cada modelo y devuelve una fila de métricas por modelo
+    """
+    modelos = modelos or MODELOS
+    features = cargar_features(año)
+    real = cargar_clasificacion_final('pilotos', año, año)
+    return [{'year': año, 'modelo': nombre, **evaluar_prediccion(features, predecir(features), real)}
+            for nombre, predecir in modelos.items()]
+
+
+def ejecutar_backtest(desde=2010, hasta=2024, n_procesos=None):
+    """
+    Backtest de los modelos sobre las temporadas [desde, hasta], un año por tarea en un Pool.
+    Devuelve (métricas por año y modelo, resumen por modelo).
+    """
+    años = list(range(desde, hasta + 1))
+    # Las caches compartidas se arman una vez en el proceso principal antes de repartir
+    cargar_hechos(COLUMNAS_HECHOS)
+    for nivel in ('pilotos', 'constructores'):
+        cargar_clasificacion_final(nivel)
+    cargar_tabla('qualifying')
+
+    n_procesos = os.cpu_count() if n_procesos is None else n_procesos
+    if n_procesos <= 1:
+        filas = [fila for año in años for fila in evaluar_año(año)]
+    else:
+        with Pool(min(n_procesos, len(años))) as pool:
+            filas = [fila for resultado in pool.map(evaluar_año, años) for fila in resultado]
+
+    metricas = pd.DataFrame(filas)
+    resumen = metricas.groupby('modelo').agg(
+        spearman=('spearman', 'mean'),
+        mae_puntos=('mae_puntos', 'mean'),
+        campeones_ok=('campeon_ok', 'sum'),
+        temporadas=('year', 'count')
+    ).sort_values('spearman', ascending=False)
+    return metricas, resumen
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    metricas, resumen = ejecutar_backtest()
+    print(f"🧪 Backtest {metricas['year'].min()}-{metricas['year'].max()} de {len(MODELOS)} modelos "
+          f"en {time.perf_counter() - inicio:.2f} s")
+
+    print("\n📅 SPEARMAN POR TEMPORADA:")
+    print(metricas.pivot(index='year', columns='modelo', values='spearman').round(3).to_string())
+
+    print("\n🏁 RESUMEN POR MODELO:")
+    for modelo, fila in resumen.iterrows():
+        print(f"   • {modelo:<9}: Spearman {fila['spearman']:.3f} | MAE {fila['mae_puntos']:6.1f} pts | "
+              f"campeón acertado {fila['campeones_ok']:.0f}/{fila['temporadas']:.0f}")
@@ -0,0 +1,219 @@
+import pandas as pd
+import numpy as np
+from clasificacion_final import cargar_clasificacion_final
+from backtest_prediccion import cargar_features, MIN_CARRERAS_VENTANA, NIVELES_EXPERIENCIA
+from prediccion_2026 import FACTOR_EXPERIENCIA, REPARTO_PRIMER_PILOTO, LIMITES_EDAD, FACTORES_EDAD
+from prediccion_2026_avanzada import (MOMENTUM_MINIMO, MOMENTUM_MAXIMO, ADAPTACION_BASE, ADAPTACION_PENDIENTE,
+                                      LIMITES_EDAD_AVANZADO, FACTORES_EDAD_AVANZADO)
+
+# Valores a barrer por parámetro; cada lista debe incluir el valor actual de los scripts 2026
+# (PARAMETROS_ACTUALES), si no posicion_configuracion lo rechaza
+ESPACIOS = {
+    'base': {
+        'edad_25': [1.0, 1.05, 1.1],        # factor_edad: <= 25 años
+        'edad_32': [1.0, 1.1, 1.2],         # <= 32
+        'edad_38': [0.9, 1.0, 1.1],         # <= 38
+        'edad_mayor': [0.8, 0.9, 1.0],      # > 38
+        'exp_baja': [0.75, 0.85, 0.95],     # FACTOR_EXPERIENCIA
+        'exp_media': [0.85, 0.95, 1.05],
+        'exp_alta': [0.9, 1.0, 1.1],
+        'exp_maxima': [0.95, 1.05, 1.15],
+        'reparto': [0.5, 0.55, 0.6, 0.65, 0.7]  # REPARTO_PRIMER_PILOTO
+    },
+    'avanzado': {
+        'edad_25': [1.0, 1.1, 1.2],         # factor_edad_avanzado: <= 25 años
+        'edad_30': [1.05, 1.15, 1.25],      # <= 30
+        'edad_35': [0.95, 1.05, 1.15],      # <= 35
+        'edad_40': [0.85, 0.95, 1.05],      # <= 40
+        'edad_mayor': [0.75, 0.85, 0.95],   # > 40
+        'adaptacion_base': [0.6, 0.8, 1.0],
+        'adaptacion_pendiente': [0.0, 0.4, 0.8],
+        'momentum_min': [0.3, 0.5, 0.8],
+        'momentum_max': [1.25, 2.0, 3.0]
+    }
+}
+
+EDADES = {'base': ('edad_25', 'edad_32', 'edad_38', 'edad_mayor'),
+          'avanzado': ('edad_25', 'edad_30', 'edad_35', 'edad_40', 'edad_mayor')}
+EXPERIENCIAS = ('exp_baja', 'exp_media', 'exp_alta', 'exp_maxima')
+
+# Configuración actual de los scripts 2026, leída de sus constantes
+PARAMETROS_ACTUALES = {
+    'base': {**dict(zip(EDADES['base'], FACTORES_EDAD)),
+             **dict(zip(EXPERIENCIAS, [FACTOR_EXPERIENCIA[n] for n in NIVELES_EXPERIENCIA])),
+             'reparto': REPARTO_PRIMER_PILOTO},
+    'avanzado': {**dict(zip(EDADES['avanzado'], FACTORES_EDAD_AVANZADO)),
+                 'adaptacion_base': ADAPTACION_BASE, 'adaptacion_pendiente': ADAPTACION_PENDIENTE,
+                 'momentum_min': MOMENTUM_MINIMO, 'momentum_max': MOMENTUM_MAXIMO}
+}
+
+# Combinaciones evaluadas por bloque: acota la memoria a bloque × pilotos-temporada
+TAMAÑO_BLOQUE = 4096
+
+
+def grilla_parametros(espacio):
+    """
+    Producto cartesiano del espacio como un array por parámetro (una entrada por combinación)
+    """
+    mallas = np.meshgrid(*[np.asarray(v, dtype=np.float64) for v in espacio.values()], indexing='ij')
+    return {nombre: malla.ravel() for nombre, malla in zip(espacio, mallas)}
+
+
+def _columna(parametros, nombre):
+    return parametros[nombre][:, None]
+
+
+def predecir_base_grilla(features, parametros):
+    """
+    Modelo base evaluado en todas las combinaciones a la vez: matriz (combinaciones × pilotos)
+    """
+    edad = features['edad'].to_numpy()
+    banda_edad = np.select([edad <= limite for limite in LIMITES_EDAD], range(len(LIMITES_EDAD)), len(LIMITES_EDAD))
+    factores_edad = np.stack([parametros[p] for p in EDADES['base']], axis=1)
+
+    nivel = features['experiencia'].map({n: i for i, n in enumerate(NIVELES_EXPERIENCIA)}).to_numpy()
+    factores_experiencia = np.stack([parametros[p] for p in EXPERIENCIAS], axis=1)
+
+    primer_piloto = features['primer_piloto'].to_numpy(dtype=bool)[None, :]
+    reparto = np.where(primer_piloto, _columna(parametros, 'reparto'), 1 - _columna(parametros, 'reparto'))
+
+    return features['puntos_equipo'].to_numpy()[None, :] * reparto \
+        * factores_edad[:, banda_edad] * factores_experiencia[:, nivel]
+
+
+def predecir_avanzado_grilla(features, parametros):
+    """
+    Modelo avanzado evaluado en todas las combinaciones a la vez: matriz (combinaciones × pilotos)
+    """
+    edad = features['edad'].to_numpy()
+    banda_edad = np.select([edad <= limite for limite in LIMITES_EDAD_AVANZADO], range(len(LIMITES_EDAD_AVANZADO)),
+                           len(LIMITES_EDAD_AVANZADO))
+    factores_edad = np.stack([parametros[p] for p in EDADES['avanzado']], axis=1)
+
+    momentum = np.clip(features['momentum_bruto'].to_numpy()[None, :],
+                       _columna(parametros, 'momentum_min'), _columna(parametros, 'momentum_max'))
+    habilidad = ((features['q3_rate'] + features['race_skill'] / 10) / 2).to_numpy()[None, :]
+    adaptacion = _columna(parametros, 'adaptacion_base') + _columna(parametros, 'adaptacion_pendiente') * habilidad
+
+    base = (features['ppr_ventana'] * features['carreras_temporada']).to_numpy()[None, :]
+    relevante = (features['carreras_ventana'] >= MIN_CARRERAS_VENTANA).to_numpy()[None, :]
+    return np.where(relevante, base * factores_edad[:, banda_edad] * momentum * adaptacion, 0.0)
+
+
+PREDICTORES_GRILLA = {
+    'base': predecir_base_grilla,
+    'avanzado': predecir_avanzado_grilla
+}
+
+
+def rangos_promedio(valores):
+    """
+    Rango de cada columna dentro de su fila (empates con el rango promedio, como pandas.rank)
+    """
+    filas, n = valores.shape
+    orden = np.argsort(valores, axis=1, kind='stable')
+    ordenados = np.take_along_axis(valores, orden, axis=1)
+    nuevo_grupo = np.ones_like(ordenados, dtype=bool)
+    nuevo_grupo[:, 1:] = ordenados[:, 1:] != ordenados[:, :-1]
+    grupo = (np.cumsum(nuevo_grupo, axis=1) - 1) + (np.arange(filas) * n)[:, None]
+
+    posicion = np.broadcast_to(np.arange(1, n + 1, dtype=np.float64), valores.shape)
+    promedio = np.bincount(grupo.ravel(), weights=posicion.ravel(), minlength=filas * n) \
+        / np.maximum(np.bincount(grupo.ravel(), minlength=filas * n), 1)
+    rangos = np.empty_like(valores, dtype=np.float64)
+    np.put_along_axis(rangos, orden, promedio[grupo], axis=1)
+    return rangos
+
+
+def _spearman_filas(predicciones, real):
+    """
+    Correlación de Spearman de cada fila de 'predicciones' contra el vector 'real'
+    """
+    rangos = rangos_promedio(predicciones)
+    rangos_real = rangos_promedio(real[None, :])[0]
+    rangos -= rangos.mean(axis=1, keepdims=True)
+    rangos_real -= rangos_real.mean()
+    denominador = np.sqrt((rangos ** 2).sum(axis=1) * (rangos_real ** 2).sum())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (rangos @ rangos_real) / denominador
+
+
+def cargar_datos_barrido(desde=2010, hasta=2024):
+    """
+    Features de todas las temporadas objetivo unidas con los puntos y posición finales reales
+    """
+    features = pd.concat([cargar_features(año) for año in range(desde, hasta + 1)], ignore_index=True)
+    real = cargar_clasificacion_final('pilotos', desde, hasta)[['year', 'driverId', 'points', 'position']]
+    return features.merge(real, on=['year', 'driverId']).sort_values(['year', 'driverId']).reset_index(drop=True)
+
+
+def barrer_modelo(modelo, datos, espacio=None, tamaño_bloque=TAMAÑO_BLOQUE):
+    """
+    Evalúa el modelo en toda la grilla de parámetros y la puntúa contra las temporadas reales.
+
+    Las predicciones de cada bloque de combinaciones son una sola operación
+    broadcast (combinaciones × pilotos-temporada); las métricas por temporada se
+    calculan sobre cortes de columnas. Devuelve un DataFrame con una fila por
+    combinación: parámetros, Spearman medio, MAE de puntos y campeones acertados.
+    """
+    espacio = espacio or ESPACIOS[modelo]
+    grilla = grilla_parametros(espacio)
+    n_combinaciones = len(next(iter(grilla.values())))
+
+    años = datos['year'].to_numpy()
+    cortes = np.flatnonzero(np.r_[True, años[1:] != años[:-1], True])
+    puntos_reales = datos['points'].to_numpy(dtype=np.float64)
+    campeon = (datos['position'] == 1).to_numpy()
+
+    spearman = np.empty(n_combinaciones)
+    mae = np.empty(n_combinaciones)
+    campeones = np.empty(n_combinaciones, dtype=np.int64)
+    for inicio in range(0, n_combinaciones, tamaño_bloque):
+        bloque = slice(inicio, min(inicio + tamaño_bloque, n_combinaciones))
+        prediccion = PREDICTORES_GRILLA[modelo](datos, {p: v[bloque] for p, v in grilla.items()})
+
+        por_año, errores, aciertos = [], [], 0
+        for a, b in zip(cortes[:-1], cortes[1:]):
+            por_año.append(_spearman_filas(prediccion[:, a:b], puntos_reales[a:b]))
+            errores.append(np.abs(prediccion[:, a:b] - puntos_reales[a:b]).mean(axis=1))
+            aciertos = aciertos + campeon[a:b][np.argmax(prediccion[:, a:b], axis=1)]
+        spearman[bloque] = np.nanmean(np.stack(por_año), axis=0)
+        mae[bloque] = np.mean(np.stack(errores), axis=0)
+        campeones[bloque] = aciertos
+
+    resultado = pd.DataFrame(grilla)
+    resultado['spearman'] = spearman
+    resultado['mae_puntos'] = mae
+    resultado['campeones_ok'] = campeones
+    return resultado.sort_values(['spearman', 'mae_puntos'], ascending=[False, True]).reset_index(drop=True)
+
+
+def posicion_configuracion(resultado, parametros):
+    """
+    Fila y puesto en el ranking de una configuración concreta (por defecto la de los scripts)
+    """
+    coincide = np.logical_and.reduce([np.isclose(resultado[p], v) for p, v in parametros.items()])
+    if not coincide.any():
+        raise ValueError(f"La configuración {parametros} no está en la grilla: agregar sus valores a ESPACIOS")
+    puesto = int(np.flatnonzero(coincide)[0])
+    return puesto + 1, resultado.iloc[puesto]
+
+
+if __name__ == "__main__":
+    import time
+
+    datos = cargar_datos_barrido()
+    for modelo in ESPACIOS:
+        inicio = time.perf_counter()
+        resultado = barrer_modelo(modelo, datos)
+        print(f"\n🔬 Modelo {modelo}: {len(resultado):,} combinaciones × {len(datos)} pilotos-temporada "
+              f"evaluadas en {time.perf_counter() - inicio:.2f} s")
+
+        puesto, actual = posicion_configuracion(resultado, PARAMETROS_ACTUALES[modelo])
+        print(f"   • Configuración actual: puesto {puesto:,} | Spearman {actual['spearman']:.3f} | "
+              f"MAE {actual['mae_puntos']:.1f} pts | campeones {actual['campeones_ok']:.0f}")
+        mejor = resultado.iloc[0]
+        print(f"   • Mejor configuración: Spearman {mejor['spearman']:.3f} | MAE {mejor['mae_puntos']:.1f} pts | "
+              f"campeones {mejor['campeones_ok']:.0f}")
+        for parametro in ESPACIOS[modelo]:
+            print(f"      - {parametro:<22}: {mejor[parametro]:.2f} (actual {PARAMETROS_ACTUALES[modelo][parametro]:.2f})")
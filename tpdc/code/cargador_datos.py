@@ -0,0 +1,222 @@
+import pandas as pd
+import hashlib
+import json
+import os
+from esquema_archive import leer_csv_tipado, VERSION_ESQUEMA
+
+# Rutas base del proyecto
+RUTA_CODIGO = os.path.dirname(os.path.abspath(__file__))
+RUTA_ARCHIVE = os.path.join(RUTA_CODIGO, "..", "archive")
+RUTA_CACHE = os.path.join(RUTA_ARCHIVE, "cache")
+
+# Versión del formato de la cache: incrementarla invalida todas las copias binarias.
+# Incluye la versión del esquema de tipos para que un cambio de dtypes regenere la cache.
+VERSION_CACHE = f"1.{VERSION_ESQUEMA}"
+
+
+def _formato_cache():
+    """
+    Devuelve el formato binario disponible: Parquet si hay motor instalado,
+    pickle de pandas en caso contrario
+    """
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        try:
+            import fastparquet  # noqa: F401
+            return "parquet"
+        except ImportError:
+            return "pickle"
+
+
+def _hash_archivo(ruta_archivo):
+    """
+    Calcula el hash SHA-1 del contenido de un archivo leyendo por bloques
+    """
+    h = hashlib.sha1()
+    with open(ruta_archivo, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _firma_origen(ruta_archivo):
+    """
+    Firma rápida del archivo fuente (mtime y tamaño) para detectar cambios sin leerlo
+    """
+    st = os.stat(ruta_archivo)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def rutas_cache(nombre, formato=None):
+    """
+    Devuelve las rutas (datos, metadatos) de la copia binaria de una tabla
+    """
+    formato = formato or _formato_cache()
+    extension = "parquet" if formato == "parquet" else "pkl"
+    return (os.path.join(RUTA_CACHE, f"{nombre}.{extension}"),
+            os.path.join(RUTA_CACHE, f"{nombre}.meta.json"))
+
+
+def _leer_meta(ruta_meta):
+    try:
+        with open(ruta_meta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_meta(ruta_meta, meta):
+    with open(ruta_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def guardar_binario(df, ruta_datos):
+    """
+    Guarda un DataFrame en formato columnar binario según la extensión del archivo
+    """
+    os.makedirs(os.path.dirname(ruta_datos), exist_ok=True)
+    ruta_tmp = ruta_datos + ".tmp"
+    if ruta_datos.endswith(".parquet"):
+        df.to_parquet(ruta_tmp, index=False)
+    else:
+        df.to_pickle(ruta_tmp)
+    os.replace(ruta_tmp, ruta_datos)
+
+
+def leer_binario(ruta_datos, columnas=None):
+    """
+    Lee una copia binaria; con Parquet solo se leen las columnas pedidas
+    """
+    if ruta_datos.endswith(".parquet"):
+        return pd.read_parquet(ruta_datos, columns=columnas)
+    df = pd.read_pickle(ruta_datos)
+    return df[columnas] if columnas is not None else df
+
+
+def _parsear_csv(ruta_csv, nombre):
+    return leer_csv_tipado(ruta_csv, nombre)
+
+
+def cargar_tabla(nombre, columnas=None, forzar=False):
+    """
+    Carga una tabla de archive (por ejemplo 'results') usando la cache binaria.
+
+    El CSV se parsea una sola vez con los tipos de esquema_archive y se guarda
+    como snapshot columnar en archive/cache. Las cargas siguientes leen el snapshot y solo lo reconstruyen si cambia el
+    archivo fuente: primero se compara mtime y tamaño, y si difieren se compara
+    el hash del contenido antes de volver a parsear.
+    """
+    ruta_csv = os.path.join(RUTA_ARCHIVE, f"{nombre}.csv")
+    if not os.path.exists(ruta_csv):
+        raise FileNotFoundError(f"No se encontró el archivo {ruta_csv}")
+
+    formato = _formato_cache()
+    ruta_datos, ruta_meta = rutas_cache(nombre, formato)
+    firma = _firma_origen(ruta_csv)
+    meta = _leer_meta(ruta_meta)
+
+    if not forzar and meta is not None and os.path.exists(ruta_datos) \
+            and meta.get("version") == VERSION_CACHE:
+        if meta.get("mtime_ns") == firma["mtime_ns"] and meta.get("size") == firma["size"]:
+            return leer_binario(ruta_datos, columnas)
+
+        # El mtime cambió (checkout, copia): si el contenido es igual se reutiliza la cache
+        hash_actual = _hash_archivo(ruta_csv)
+        if meta.get("sha1") == hash_actual:
+            meta.update(firma)
+            _escribir_meta(ruta_meta, meta)
+            return leer_binario(ruta_datos, columnas)
+
+    df = _parsear_csv(ruta_csv, nombre)
+    try:
+        guardar_binario(df, ruta_datos)
+        _escribir_meta(ruta_meta, {
+            "version": VERSION_CACHE,
+            "fuente": f"{nombre}.csv",
+            "sha1": _hash_archivo(ruta_csv),
+            "filas": len(df),
+            **firma
+        })
+    except OSError as e:
+        # Sin permisos de escritura se trabaja igual, solo que sin cache
+        print(f"⚠️  No se pudo escribir la cache de {nombre}: {e}")
+
+    return df[columnas] if columnas is not None else df
+
+
+def cargar_derivada(nombre, fuentes, version, construir, columnas=None, forzar=False):
+    """
+    Carga una tabla derivada (construida a partir de tablas de archive) desde la cache.
+
+    'construir' es una función sin argumentos que arma el DataFrame. Se vuelve a
+    llamar solo si cambia 'version' (o la del esquema de tipos) o alguno de los CSV
+    listados en 'fuentes'; la comparación es la misma que en cargar_tabla.
+    """
+    version = f"{VERSION_CACHE}/{version}"
+    ruta_datos, ruta_meta = rutas_cache(nombre)
+    firmas = {f: _firma_origen(os.path.join(RUTA_ARCHIVE, f"{f}.csv")) for f in fuentes}
+    meta = _leer_meta(ruta_meta)
+
+    if not forzar and meta is not None and os.path.exists(ruta_datos) \
+            and meta.get("version") == version and set(meta.get("fuentes", {})) == set(fuentes):
+        guardadas = meta["fuentes"]
+        if all(guardadas[f]["mtime_ns"] == firmas[f]["mtime_ns"] and guardadas[f]["size"] == firmas[f]["size"]
+               for f in fuentes):
+            return leer_binario(ruta_datos, columnas)
+
+        hashes = {f: _hash_archivo(os.path.join(RUTA_ARCHIVE, f"{f}.csv")) for f in fuentes}
+        if all(guardadas[f]["sha1"] == hashes[f] for f in fuentes):
+            meta["fuentes"] = {f: {**firmas[f], "sha1": hashes[f]} for f in fuentes}
+            _escribir_meta(ruta_meta, meta)
+            return leer_binario(ruta_datos, columnas)
+
+    df = construir()
+    try:
+        guardar_binario(df, ruta_datos)
+        _escribir_meta(ruta_meta, {
+            "version": version,
+            "filas": len(df),
+            "fuentes": {
+                f: {**firmas[f], "sha1": _hash_archivo(os.path.join(RUTA_ARCHIVE, f"{f}.csv"))}
+                for f in fuentes
+            }
+        })
+    except OSError as e:
+        print(f"⚠️  No se pudo escribir la cache de {nombre}: {e}")
+
+    return df[columnas] if columnas is not None else df
+
+
+def cargar_tablas(*nombres):
+    """
+    Carga varias tablas de archive de una vez y las devuelve en el mismo orden
+    """
+    return tuple(cargar_tabla(nombre) for nombre in nombres)
+
+
+def limpiar_cache():
+    """
+    Elimina todas las copias binarias de la cache de archive
+    """
+    if not os.path.exists(RUTA_CACHE):
+        return 0
+    eliminados = 0
+    for archivo in os.listdir(RUTA_CACHE):
+        os.remove(os.path.join(RUTA_CACHE, archivo))
+        eliminados += 1
+    return eliminados
+
+
+if __name__ == "__main__":
+    import time
+
+    print("📦 Generando cache binaria de archive...")
+    for archivo in sorted(os.listdir(RUTA_ARCHIVE)):
+        if not archivo.endswith(".csv"):
+            continue
+        nombre = archivo[:-4]
+        inicio = time.perf_counter()
+        df = cargar_tabla(nombre)
+        print(f"   • {nombre:<25}: {len(df):7,} filas ({(time.perf_counter() - inicio) * 1000:7.1f} ms)")
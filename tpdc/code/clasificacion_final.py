@@ -0,0 +1,54 @@
+from cargador_datos import cargar_tabla, cargar_derivada
+
+# Versión de la snapshot de fin de temporada: incrementarla al cambiar columnas
+VERSION_CLASIFICACION_FINAL = 1
+
+# Tabla de standings y columna de entidad para cada nivel
+NIVELES = {
+    'pilotos': ('driver_standings', 'driverId'),
+    'constructores': ('constructor_standings', 'constructorId')
+}
+
+
+def construir_clasificacion_final(nivel='pilotos'):
+    """
+    Clasificación al final de cada temporada tomada de la última ronda del año.
+
+    Se usa la última 'round' de cada 'year' de races.csv que tenga standings
+    cargados (en una temporada en curso es la última ronda disputada). Devuelve
+    una fila por (year, entidad) con points, position y wins finales.
+    """
+    tabla, entidad = NIVELES[nivel]
+    standings = cargar_tabla(tabla, ['raceId', entidad, 'points', 'position', 'wins'])
+    races = cargar_tabla('races', ['raceId', 'year', 'round'])
+
+    standings = standings.merge(races, on='raceId')
+    ultima_ronda = standings.groupby('year')['round'].transform('max')
+    final = standings[standings['round'] == ultima_ronda]
+
+    return final[['year', 'round', 'raceId', entidad, 'points', 'position', 'wins']] \
+        .sort_values(['year', 'position', entidad]).reset_index(drop=True)
+
+
+def cargar_clasificacion_final(nivel='pilotos', desde=None, hasta=None, forzar=False):
+    """
+    Devuelve la snapshot persistida de fin de temporada de pilotos o constructores,
+    opcionalmente filtrada al rango de años [desde, hasta]
+    """
+    tabla, _ = NIVELES[nivel]
+    final = cargar_derivada(f"clasificacion_final_{nivel}", [tabla, 'races'],
+                            VERSION_CLASIFICACION_FINAL,
+                            lambda: construir_clasificacion_final(nivel), forzar=forzar)
+    if desde is not None:
+        final = final[final['year'] >= desde]
+    if hasta is not None:
+        final = final[final['year'] <= hasta]
+    return final.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    pilotos = cargar_clasificacion_final('pilotos', forzar=True)
+    constructores = cargar_clasificacion_final('constructores', forzar=True)
+    print(f"🏁 Snapshot de fin de temporada: {len(pilotos):,} filas de pilotos "
+          f"({pilotos['year'].nunique()} temporadas), {len(constructores):,} filas de constructores "
+          f"({constructores['year'].nunique()} temporadas)")
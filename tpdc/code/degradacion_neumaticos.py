@@ -0,0 +1,124 @@
+import pandas as pd
+import numpy as np
+from almacen_vueltas import cargar_almacen_vueltas
+from resumen_sesiones import CLAVES_SESION
+from vueltas_verdes import clasificar_vueltas
+
+# Tiempo que se gana por vuelta al quemar combustible (≈ 1.6 kg/vuelta × 0.035 s/kg)
+EFECTO_COMBUSTIBLE_MS = 55
+
+# Vueltas verdes mínimas de un stint para ajustar su pendiente
+MIN_VUELTAS_STINT = 5
+
+# Vueltas más lentas que este múltiplo de la mediana del stint (tráfico, errores) no entran al ajuste
+LIMITE_VUELTA_LENTA = 1.05
+
+
+def detectar_stints(vueltas):
+    """
+    Numera los stints de cada piloto a partir de compuesto y vida del neumático: empieza
+    uno nuevo en su primera vuelta, cuando cambia el compuesto o cuando la vida del
+    neumático baja respecto de la vuelta anterior. Agrega 'stint_id' (único en la tabla)
+    """
+    vueltas = vueltas.sort_values(CLAVES_SESION + ['Driver', 'LapNumber']).copy()
+    claves = [vueltas[c] for c in CLAVES_SESION + ['Driver']]
+    compuesto = vueltas['Compound'].astype('string').fillna('UNKNOWN')
+    vida = vueltas['TyreLife'].astype('float64')
+    primera = ~vueltas.duplicated(CLAVES_SESION + ['Driver'])
+    cambio_compuesto = compuesto.ne(compuesto.groupby(claves, observed=True).shift())
+    vida_baja = vida.lt(vida.groupby(claves, observed=True).shift())
+    vueltas['stint_id'] = (primera | cambio_compuesto | vida_baja).cumsum().astype(np.int32) - 1
+    return vueltas
+
+
+def vueltas_corregidas(vueltas):
+    """
+    Tiempo de vuelta corregido por combustible: se le suma lo que el auto habría sido más
+    lento con el combustible que ya quemó, para aislar el efecto del neumático
+    """
+    vuelta = vueltas['LapNumber'].astype('float64')
+    return vueltas['LapTime_ms'].astype('float64') + EFECTO_COMBUSTIBLE_MS * (vuelta - 1)
+
+
+def ajustar_stints(vueltas, estado_pista=None):
+    """
+    Pendiente de degradación (ms por vuelta de vida del neumático) de todos los
+    (piloto, stint) a la vez. Usa solo vueltas verdes, corregidas por combustible y sin
+    vueltas lentas, y resuelve todas las rectas tiempo = a + b · vida con un único
+    np.linalg.solve sobre las ecuaciones normales 2×2 apiladas de cada stint.
+
+    Si 'vueltas' ya pasó por clasificar_vueltas (tiene 'verde') se usa tal cual y
+    'estado_pista' no hace falta.
+    """
+    if 'verde' not in vueltas:
+        vueltas = clasificar_vueltas(vueltas, estado_pista)
+    vueltas = detectar_stints(vueltas)
+    vueltas['tiempo_corregido'] = vueltas_corregidas(vueltas)
+    vueltas = vueltas[vueltas['verde'] & vueltas['TyreLife'].notna()]
+    mediana = vueltas.groupby('stint_id')['tiempo_corregido'].transform('median')
+    vueltas = vueltas[vueltas['tiempo_corregido'] <= mediana * LIMITE_VUELTA_LENTA]
+
+    stint, grupo = np.unique(vueltas['stint_id'].to_numpy(), return_inverse=True)
+    x = vueltas['TyreLife'].to_numpy(dtype=np.float64)
+    y = vueltas['tiempo_corregido'].to_numpy(dtype=np.float64)
+    n = np.bincount(grupo, minlength=len(stint)).astype(np.float64)
+    sx, sy = np.bincount(grupo, x, len(stint)), np.bincount(grupo, y, len(stint))
+    sxx, sxy = np.bincount(grupo, x * x, len(stint)), np.bincount(grupo, x * y, len(stint))
+
+    # X'X y X'y de cada stint apilados: (G, 2, 2) y (G, 2)
+    normales = np.stack([np.stack([n, sx], axis=-1), np.stack([sx, sxx], axis=-1)], axis=1)
+    independientes = np.stack([sy, sxy], axis=-1)
+    ajustables = (n >= MIN_VUELTAS_STINT) & (n * sxx - sx * sx > 0)
+    coeficientes = np.full((len(stint), 2), np.nan)
+    if ajustables.any():
+        coeficientes[ajustables] = np.linalg.solve(normales[ajustables], independientes[ajustables][..., None])[..., 0]
+
+    primeras = vueltas.drop_duplicates('stint_id').set_index('stint_id').loc[stint]
+    ajustes = pd.DataFrame({
+        **{c: primeras[c].to_numpy() for c in CLAVES_SESION + ['Driver', 'Team', 'Compound']},
+        'stint_id': stint,
+        'vueltas': n.astype(np.int32),
+        'vida_inicial': primeras['TyreLife'].to_numpy(),
+        'base_ms': coeficientes[:, 0],
+        'degradacion_ms': coeficientes[:, 1]
+    })
+    return ajustes[ajustables].reset_index(drop=True)
+
+
+def tabla_degradacion(ajustes):
+    """
+    Degradación por circuito (evento) y compuesto: media ponderada por vueltas,
+    mediana de los stints, stints y vueltas usadas
+    """
+    ajustes = ajustes.assign(ponderada=ajustes['degradacion_ms'] * ajustes['vueltas'])
+    tabla = ajustes.groupby(['evento', 'Compound'], observed=True).agg(
+        stints=('degradacion_ms', 'size'),
+        vueltas=('vueltas', 'sum'),
+        ponderada=('ponderada', 'sum'),
+        mediana_ms=('degradacion_ms', 'median')
+    )
+    tabla['degradacion_ms'] = tabla.pop('ponderada') / tabla['vueltas']
+    return tabla.reset_index().sort_values(['evento', 'degradacion_ms'])
+
+
+def degradacion_almacen(almacen=None):
+    """
+    Ajustes por stint y tabla por circuito y compuesto de todas las sesiones del almacén
+    """
+    if almacen is None:
+        almacen, _ = cargar_almacen_vueltas(('vueltas', 'estado_pista'))
+    ajustes = ajustar_stints(almacen['vueltas'], almacen['estado_pista'])
+    return ajustes, tabla_degradacion(ajustes)
+
+
+if __name__ == "__main__":
+    import time
+
+    almacen, _ = cargar_almacen_vueltas(('vueltas', 'estado_pista'))
+    inicio = time.perf_counter()
+    ajustes, tabla = degradacion_almacen(almacen)
+    print(f"🛞 {len(ajustes):,} stints ajustados de {len(almacen['vueltas']):,} vueltas "
+          f"en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    for _, fila in tabla.iterrows():
+        print(f"   • {fila['evento']:<28} {fila['Compound']:<13}: {fila['degradacion_ms']:+6.1f} ms/vuelta "
+              f"({fila['stints']} stints, {fila['vueltas']} vueltas)")
@@ -0,0 +1,138 @@
+import pandas as pd
+import numpy as np
+from cargador_datos import cargar_tabla, cargar_derivada
+from tabla_hechos import cargar_hechos, FUENTES_HECHOS
+
+# Versión de la tabla de duelos: incrementarla al cambiar columnas
+VERSION_DUELOS = 1
+
+# Carreras juntos necesarias para usar el reparto de puntos observado y sus límites
+MIN_CARRERAS_DUELO = 10
+REPARTO_MINIMO, REPARTO_MAXIMO = 0.25, 0.75
+
+COLUMNAS_HECHOS = ['raceId', 'year', 'constructorId', 'driverId', 'positionOrder', 'points']
+
+
+def construir_duelos(hechos=None, qualifying=None):
+    """
+    Duelos entre compañeros de equipo de toda la historia con un único self-join
+    de resultados (y su clasificación) sobre (raceId, constructorId).
+
+    Devuelve una fila por par (driverId_a < driverId_b) con carreras juntos, victorias
+    en carrera y en clasificación de cada uno, diferencia media de posición (a − b,
+    negativa = a termina delante), puntos de cada uno y parte de los puntos de a.
+    """
+    if hechos is None:
+        hechos = cargar_hechos(COLUMNAS_HECHOS)
+    if qualifying is None:
+        qualifying = cargar_tabla('qualifying', ['raceId', 'driverId', 'position'])
+
+    qualy = qualifying.rename(columns={'position': 'posicion_qualy'}).drop_duplicates(['raceId', 'driverId'])
+    filas = hechos[COLUMNAS_HECHOS].merge(qualy, on=['raceId', 'driverId'], how='left')
+    filas['posicion_qualy'] = filas['posicion_qualy'].astype('float64')
+    filas['positionOrder'] = filas['positionOrder'].astype('float64')
+
+    pares = filas.merge(filas.drop(columns='year'), on=['raceId', 'constructorId'], suffixes=('_a', '_b'))
+    pares = pares[pares['driverId_a'] < pares['driverId_b']]
+
+    # Autos compartidos de los años 50: un mismo par puede aparecer dos veces en una carrera
+    pares = pares.drop_duplicates(['raceId', 'driverId_a', 'driverId_b'])
+
+    qualy_a, qualy_b = pares['posicion_qualy_a'], pares['posicion_qualy_b']
+    con_qualy = qualy_a.notna() & qualy_b.notna()
+    indicadores = pd.DataFrame({
+        'driverId_a': pares['driverId_a'],
+        'driverId_b': pares['driverId_b'],
+        'year': pares['year'],
+        'constructorId': pares['constructorId'],
+        'carrera_a': (pares['positionOrder_a'] < pares['positionOrder_b']).astype(np.int16),
+        'carrera_b': (pares['positionOrder_a'] > pares['positionOrder_b']).astype(np.int16),
+        'qualy_a': (con_qualy & (qualy_a < qualy_b)).astype(np.int16),
+        'qualy_b': (con_qualy & (qualy_a > qualy_b)).astype(np.int16),
+        'con_qualy': con_qualy.astype(np.int16),
+        'delta_posicion': pares['positionOrder_a'] - pares['positionOrder_b'],
+        'delta_qualy': qualy_a - qualy_b,
+        'puntos_a': pares['points_a'].astype('float64'),
+        'puntos_b': pares['points_b'].astype('float64')
+    })
+
+    duelos = indicadores.groupby(['driverId_a', 'driverId_b']).agg(
+        carreras=('carrera_a', 'size'),
+        desde=('year', 'min'),
+        hasta=('year', 'max'),
+        equipos=('constructorId', 'nunique'),
+        carrera_a=('carrera_a', 'sum'),
+        carrera_b=('carrera_b', 'sum'),
+        clasificaciones=('con_qualy', 'sum'),
+        qualy_a=('qualy_a', 'sum'),
+        qualy_b=('qualy_b', 'sum'),
+        delta_posicion=('delta_posicion', 'mean'),
+        delta_qualy=('delta_qualy', 'mean'),
+        puntos_a=('puntos_a', 'sum'),
+        puntos_b=('puntos_b', 'sum')
+    )
+    total = duelos['puntos_a'] + duelos['puntos_b']
+    duelos['reparto_puntos_a'] = (duelos['puntos_a'] / total).where(total > 0)
+    return duelos.reset_index()
+
+
+def cargar_duelos(forzar=False):
+    """
+    Tabla de duelos persistida e indexada por (driverId_a, driverId_b), con driverId_a < driverId_b
+    """
+    duelos = cargar_derivada("duelos_compañeros", FUENTES_HECHOS + ["qualifying"], VERSION_DUELOS,
+                             construir_duelos, forzar=forzar)
+    return duelos.set_index(['driverId_a', 'driverId_b']).sort_index()
+
+
+def consultar_duelo(duelos, piloto, rival):
+    """
+    Duelo visto desde 'piloto' (columnas *_a = piloto, *_b = rival); None si nunca fueron compañeros
+    """
+    a, b = sorted((piloto, rival))
+    if (a, b) not in duelos.index:
+        return None
+    fila = duelos.loc[(a, b)].to_dict()
+    if piloto == a:
+        return fila
+    invertido = dict(fila)
+    for campo in ('carrera', 'qualy', 'puntos'):
+        invertido[f'{campo}_a'], invertido[f'{campo}_b'] = fila[f'{campo}_b'], fila[f'{campo}_a']
+    invertido['delta_posicion'] = -fila['delta_posicion']
+    invertido['delta_qualy'] = -fila['delta_qualy']
+    invertido['reparto_puntos_a'] = 1 - fila['reparto_puntos_a'] if pd.notna(fila['reparto_puntos_a']) else np.nan
+    return invertido
+
+
+def reparto_observado(duelos, piloto, rival):
+    """
+    Parte de los puntos del equipo que corresponde a 'piloto' según su historial con 'rival',
+    limitada a [REPARTO_MINIMO, REPARTO_MAXIMO]; None si corrieron juntos menos de
+    MIN_CARRERAS_DUELO carreras o sin puntos
+    """
+    if piloto is None or rival is None:
+        return None
+    duelo = consultar_duelo(duelos, piloto, rival)
+    if duelo is None or duelo['carreras'] < MIN_CARRERAS_DUELO or pd.isna(duelo['reparto_puntos_a']):
+        return None
+    return float(np.clip(duelo['reparto_puntos_a'], REPARTO_MINIMO, REPARTO_MAXIMO))
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    duelos = cargar_duelos(forzar=True)
+    print(f"🤼 {len(duelos):,} duelos entre compañeros calculados en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    inicio = time.perf_counter()
+    duelos = cargar_duelos()
+    print(f"⚡ Carga desde cache: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    nombres = cargar_hechos(['driverId', 'driver_name']).drop_duplicates('driverId') \
+        .set_index('driverId')['driver_name']
+    print("\n🔝 DUELOS MÁS LARGOS (carrera | clasificación):")
+    for (a, b), fila in duelos.nlargest(10, 'carreras').iterrows():
+        print(f"   • {nombres[a]:<20} vs {nombres[b]:<20}: {fila['carreras']:3.0f} carreras | "
+              f"{fila['carrera_a']:3.0f}-{fila['carrera_b']:<3.0f} | {fila['qualy_a']:3.0f}-{fila['qualy_b']:<3.0f} | "
+              f"puntos {fila['reparto_puntos_a']:.0%}")
@@ -0,0 +1,143 @@
+import pandas as pd
+import os
+
+# Valores que el export de Ergast usa como nulo
+VALORES_NULOS = ["\\N", ""]
+
+# Tipo especial para columnas de fecha (se parsean después de leer el CSV)
+FECHA = "fecha"
+
+# Versión del esquema: cambiarla invalida la cache binaria de archive
+VERSION_ESQUEMA = 1
+
+# Registro central de tipos por tabla y columna.
+# - Enteros sin nulos: int16/int32 de NumPy
+# - Enteros con '\N': enteros nullable de pandas (Int16, Int32, Int64)
+# - Texto de baja cardinalidad: category; resto: string
+ESQUEMAS = {
+    "circuits": {
+        "circuitId": "int32", "circuitRef": "string", "name": "string",
+        "location": "string", "country": "category", "lat": "float64",
+        "lng": "float64", "alt": "Int32", "url": "string"
+    },
+    "constructor_results": {
+        "constructorResultsId": "int32", "raceId": "int32", "constructorId": "int32",
+        "points": "float64", "status": "category"
+    },
+    "constructor_standings": {
+        "constructorStandingsId": "int32", "raceId": "int32", "constructorId": "int32",
+        "points": "float64", "position": "Int16", "positionText": "category", "wins": "int16"
+    },
+    "constructors": {
+        "constructorId": "int32", "constructorRef": "string", "name": "string",
+        "nationality": "category", "url": "string"
+    },
+    "driver_standings": {
+        "driverStandingsId": "int32", "raceId": "int32", "driverId": "int32",
+        "points": "float64", "position": "Int16", "positionText": "category", "wins": "int16"
+    },
+    "drivers": {
+        "driverId": "int32", "driverRef": "string", "number": "Int16", "code": "string",
+        "forename": "string", "surname": "string", "dob": FECHA,
+        "nationality": "category", "url": "string"
+    },
+    "lap_times": {
+        "raceId": "int32", "driverId": "int32", "lap": "int16", "position": "Int16",
+        "time": "string", "milliseconds": "Int64"
+    },
+    "pit_stops": {
+        "raceId": "int32", "driverId": "int32", "stop": "int16", "lap": "int16",
+        "time": "string", "duration": "string", "milliseconds": "Int64"
+    },
+    "qualifying": {
+        "qualifyId": "int32", "raceId": "int32", "driverId": "int32", "constructorId": "int32",
+        "number": "Int16", "position": "Int16", "q1": "string", "q2": "string", "q3": "string"
+    },
+    "races": {
+        "raceId": "int32", "year": "int16", "round": "int16", "circuitId": "int32",
+        "name": "category", "date": FECHA, "time": "string", "url": "string",
+        "fp1_date": FECHA, "fp1_time": "string", "fp2_date": FECHA, "fp2_time": "string",
+        "fp3_date": FECHA, "fp3_time": "string", "quali_date": FECHA, "quali_time": "string",
+        "sprint_date": FECHA, "sprint_time": "string"
+    },
+    "results": {
+        "resultId": "int32", "raceId": "int32", "driverId": "int32", "constructorId": "int32",
+        "number": "Int16", "grid": "int16", "position": "Int16", "positionText": "category",
+        "positionOrder": "int16", "points": "float64", "laps": "int16", "time": "string",
+        "milliseconds": "Int64", "fastestLap": "Int16", "rank": "Int16",
+        "fastestLapTime": "string", "fastestLapSpeed": "float64", "statusId": "int32"
+    },
+    "seasons": {
+        "year": "int16", "url": "string"
+    },
+    "sprint_results": {
+        "resultId": "int32", "raceId": "int32", "driverId": "int32", "constructorId": "int32",
+        "number": "Int16", "grid": "int16", "position": "Int16", "positionText": "category",
+        "positionOrder": "int16", "points": "float64", "laps": "int16", "time": "string",
+        "milliseconds": "Int64", "fastestLap": "Int16", "fastestLapTime": "string",
+        "statusId": "int32"
+    },
+    "status": {
+        "statusId": "int32", "status": "string"
+    }
+}
+
+
+def leer_csv_tipado(ruta_csv, nombre, **kwargs):
+    """
+    Lee un CSV de archive aplicando el esquema registrado: '\\N' se trata como NA,
+    los enteros quedan como enteros (nullable si hay nulos) y las fechas como datetime64.
+    Los argumentos extra se pasan a pd.read_csv (por ejemplo chunksize).
+    """
+    esquema = ESQUEMAS.get(nombre)
+    if esquema is None:
+        return pd.read_csv(ruta_csv, na_values=VALORES_NULOS, keep_default_na=False, **kwargs)
+
+    dtypes = {col: tipo for col, tipo in esquema.items() if tipo != FECHA}
+    lector = pd.read_csv(ruta_csv, dtype=dtypes, na_values=VALORES_NULOS,
+                         keep_default_na=False, **kwargs)
+    if "chunksize" in kwargs or kwargs.get("iterator"):
+        return (_convertir_fechas(chunk, esquema) for chunk in lector)
+    return _convertir_fechas(lector, esquema)
+
+
+def _convertir_fechas(df, esquema):
+    for col, tipo in esquema.items():
+        if tipo == FECHA and col in df.columns:
+            df[col] = pd.to_datetime(df[col], format="%Y-%m-%d", errors="coerce")
+    return df
+
+
+def reporte_memoria(nombres=None):
+    """
+    Compara la memoria de cada tabla leída con pd.read_csv plano contra la
+    versión tipada según el esquema, y devuelve el ahorro por tabla
+    """
+    from cargador_datos import RUTA_ARCHIVE
+
+    filas = []
+    for nombre in nombres or ESQUEMAS:
+        ruta_csv = os.path.join(RUTA_ARCHIVE, f"{nombre}.csv")
+        if not os.path.exists(ruta_csv):
+            continue
+        sin_tipar = pd.read_csv(ruta_csv).memory_usage(deep=True).sum()
+        tipado = leer_csv_tipado(ruta_csv, nombre).memory_usage(deep=True).sum()
+        filas.append({
+            'tabla': nombre,
+            'mb_sin_tipar': sin_tipar / 1024**2,
+            'mb_tipado': tipado / 1024**2,
+            'mb_ahorrados': (sin_tipar - tipado) / 1024**2,
+            'ahorro_pct': (1 - tipado / sin_tipar) * 100 if sin_tipar > 0 else 0.0
+        })
+
+    return pd.DataFrame(filas).sort_values('mb_ahorrados', ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print("💾 MEMORIA AHORRADA POR TABLA CON EL ESQUEMA TIPADO")
+    print("-" * 70)
+    reporte = reporte_memoria()
+    for _, fila in reporte.iterrows():
+        print(f"   • {fila['tabla']:<22}: {fila['mb_sin_tipar']:6.2f} MB → {fila['mb_tipado']:6.2f} MB "
+              f"(-{fila['ahorro_pct']:4.1f}%)")
+    print(f"\n   Total ahorrado: {reporte['mb_ahorrados'].sum():.2f} MB")
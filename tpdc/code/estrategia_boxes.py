@@ -0,0 +1,190 @@
+import pandas as pd
+import numpy as np
+from cargador_datos import cargar_tabla, cargar_derivada
+from tabla_hechos import cargar_hechos, FUENTES_HECHOS
+from tiempos import tiempo_a_ms
+
+# Versión de las tablas de estrategia: incrementarla al cambiar columnas o métricas
+VERSION_BOXES = 1
+
+FUENTES_BOXES = FUENTES_HECHOS + ["pit_stops"]
+
+# Paradas más largas que esto son banderas rojas o reparaciones, no paradas de estrategia
+LIMITE_PARADA_MS = 60_000
+
+# Paradas mínimas de un equipo en la temporada para entrar en el ranking de boxes
+MIN_PARADAS_EQUIPO = 10
+
+COLUMNAS_HECHOS = ['raceId', 'year', 'circuitId', 'circuit_name', 'driverId', 'constructorId',
+                   'constructor_name', 'laps']
+
+
+def construir_paradas(pit_stops=None, hechos=None):
+    """
+    Una fila por parada de pit_stops.csv con carrera, circuito y constructor unidos,
+    duración en milisegundos y largo del stint que termina en esa parada.
+
+    La duración sale de 'milliseconds'; si falta, se parsea 'duration'. 'valida' marca
+    las paradas por debajo de LIMITE_PARADA_MS (las que cuentan como pérdida en boxes).
+    """
+    if pit_stops is None:
+        pit_stops = cargar_tabla('pit_stops', ['raceId', 'driverId', 'stop', 'lap', 'duration', 'milliseconds'])
+    if hechos is None:
+        hechos = cargar_hechos(COLUMNAS_HECHOS)
+
+    paradas = pit_stops.drop(columns=['duration', 'milliseconds']).copy()
+    paradas['duracion_ms'] = pit_stops['milliseconds'].fillna(tiempo_a_ms(pit_stops['duration'])).astype('Int64')
+    paradas = paradas.merge(hechos[COLUMNAS_HECHOS].drop_duplicates(['raceId', 'driverId']),
+                            on=['raceId', 'driverId'], how='left')
+    paradas = paradas.sort_values(['raceId', 'driverId', 'stop']).reset_index(drop=True)
+
+    # Stint = vueltas desde la parada anterior (o desde la largada en la primera)
+    vuelta_anterior = paradas.groupby(['raceId', 'driverId'])['lap'].shift(fill_value=0)
+    paradas['stint'] = (paradas['lap'] - vuelta_anterior).astype(np.int16)
+    paradas['valida'] = paradas['duracion_ms'].lt(LIMITE_PARADA_MS).fillna(False)
+    return paradas
+
+
+def construir_estrategias(paradas):
+    """
+    Una fila por (raceId, driverId) con paradas: cantidad, vuelta de la primera,
+    stint más largo (incluido el último, hasta las vueltas completadas), vueltas de la
+    carrera (las del ganador) y tiempo total en boxes de las paradas válidas
+    """
+    grupo = paradas.groupby(['raceId', 'driverId'], sort=False)
+    estrategias = grupo.agg(
+        year=('year', 'first'),
+        circuitId=('circuitId', 'first'),
+        constructorId=('constructorId', 'first'),
+        paradas=('stop', 'size'),
+        primera_parada=('lap', 'min'),
+        ultima_parada=('lap', 'max'),
+        stint_maximo=('stint', 'max'),
+        vueltas=('laps', 'first')
+    ).reset_index()
+    estrategias['tiempo_boxes_ms'] = paradas['duracion_ms'].where(paradas['valida']) \
+        .groupby([paradas['raceId'], paradas['driverId']], sort=False).sum(min_count=1).to_numpy()
+
+    ultimo_stint = (estrategias['vueltas'] - estrategias['ultima_parada']).clip(lower=0)
+    estrategias['stint_final'] = ultimo_stint
+    estrategias['stint_maximo'] = np.fmax(estrategias['stint_maximo'].astype('float64'),
+                                          ultimo_stint.astype('float64'))
+    estrategias['vueltas_carrera'] = estrategias.groupby('raceId')['vueltas'].transform('max')
+    return estrategias
+
+
+def construir_equipos(paradas):
+    """
+    Ranking de boxes por (year, constructorId): paradas válidas, mediana, percentil 25
+    y mejor parada; 'puesto' ordena por mediana dentro de la temporada entre los equipos
+    con al menos MIN_PARADAS_EQUIPO paradas
+    """
+    validas = paradas[paradas['valida']]
+    duracion = validas['duracion_ms'].astype('float64')
+    grupo = duracion.groupby([validas['year'], validas['constructorId'], validas['constructor_name']],
+                             observed=True)
+    equipos = pd.DataFrame({
+        'paradas': grupo.size(),
+        'mediana_ms': grupo.median(),
+        'p25_ms': grupo.quantile(0.25),
+        'mejor_ms': grupo.min()
+    }).reset_index()
+    elegibles = equipos['paradas'] >= MIN_PARADAS_EQUIPO
+    equipos['puesto'] = equipos['mediana_ms'].where(elegibles) \
+        .groupby(equipos['year']).rank(method='min').astype('Int16')
+    return equipos.sort_values(['year', 'puesto']).reset_index(drop=True)
+
+
+def construir_circuitos(paradas):
+    """
+    Distribución de la pérdida en boxes por circuito (paradas válidas): media,
+    mediana, percentiles 10 y 90, y paradas medias por piloto y carrera
+    """
+    validas = paradas[paradas['valida']]
+    duracion = validas['duracion_ms'].astype('float64')
+    grupo = duracion.groupby([validas['circuitId'], validas['circuit_name']], observed=True)
+    circuitos = pd.DataFrame({
+        'paradas': grupo.size(),
+        'carreras': validas.groupby(['circuitId', 'circuit_name'], observed=True)['raceId'].nunique(),
+        'media_ms': grupo.mean(),
+        'mediana_ms': grupo.median(),
+        'p10_ms': grupo.quantile(0.10),
+        'p90_ms': grupo.quantile(0.90)
+    }).reset_index()
+    por_piloto = paradas.groupby(['circuitId', 'raceId', 'driverId'])['stop'].max() \
+        .groupby(level='circuitId').mean()
+    circuitos['paradas_por_piloto'] = circuitos['circuitId'].map(por_piloto)
+    return circuitos.sort_values('media_ms').reset_index(drop=True)
+
+
+def generar_tablas_boxes():
+    """
+    Calcula todas las tablas de estrategia de boxes a partir de una única tabla de paradas
+    """
+    paradas = construir_paradas()
+    return {
+        'paradas': paradas,
+        'estrategias': construir_estrategias(paradas),
+        'equipos': construir_equipos(paradas),
+        'circuitos': construir_circuitos(paradas)
+    }
+
+
+def cargar_boxes(forzar=False):
+    """
+    Devuelve las tablas de boxes persistidas en la cache de archive.
+    Se recalculan todas juntas solo si cambian las tablas fuente o VERSION_BOXES.
+    """
+    calculadas = {}
+
+    def construir(clave):
+        def _construir():
+            if not calculadas:
+                calculadas.update(generar_tablas_boxes())
+            return calculadas[clave]
+        return _construir
+
+    return {
+        clave: cargar_derivada(f"boxes_{clave}", FUENTES_BOXES, VERSION_BOXES,
+                               construir(clave), forzar=forzar)
+        for clave in ('paradas', 'estrategias', 'equipos', 'circuitos')
+    }
+
+
+def equipo_mas_rapido(tablas):
+    """
+    Equipo con la menor mediana de parada de cada temporada
+    """
+    equipos = tablas['equipos']
+    return equipos[equipos['puesto'] == 1].set_index('year')[['constructor_name', 'paradas', 'mediana_ms']]
+
+
+def perdida_por_circuito(tablas):
+    """
+    Pérdida media en boxes por circuito, de menor a mayor
+    """
+    return tablas['circuitos'].set_index('circuit_name')[['carreras', 'media_ms', 'mediana_ms', 'paradas_por_piloto']]
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    tablas = cargar_boxes(forzar=True)
+    print(f"🔧 {len(tablas['paradas']):,} paradas procesadas en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    inicio = time.perf_counter()
+    tablas = cargar_boxes()
+    rapidos = equipo_mas_rapido(tablas)
+    circuitos = perdida_por_circuito(tablas)
+    print(f"⚡ Carga desde cache y consultas: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    print("\n🏆 BOXES MÁS RÁPIDOS POR TEMPORADA (mediana):")
+    for year, fila in rapidos.iterrows():
+        print(f"   • {year}: {fila['constructor_name']:<15} {fila['mediana_ms'] / 1000:6.3f} s "
+              f"({fila['paradas']} paradas)")
+
+    print("\n⏱️ PÉRDIDA EN BOXES POR CIRCUITO (media):")
+    for circuito, fila in pd.concat([circuitos.head(5), circuitos.tail(5)]).iterrows():
+        print(f"   • {circuito:<40}: {fila['media_ms'] / 1000:6.3f} s | "
+              f"{fila['paradas_por_piloto']:.2f} paradas por piloto")
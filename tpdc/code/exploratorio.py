@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import os
 from datetime import datetime
+from cargador_datos import cargar_tabla
+from clasificacion_final import cargar_clasificacion_final
 
 def analizar_tendencias_escuderias_ultimos_20_años():
     """
@@ -24,11 +26,8 @@ def analizar_tendencias_escuderias_ultimos_20_años():
     try:
         # Cargar datos necesarios
         print("📂 Cargando datos...")
-        constructors = pd.read_csv(ruta + "constructors.csv")
-        constructor_standings = pd.read_csv(ruta + "constructor_standings.csv")
-        constructor_results = pd.read_csv(ruta + "constructor_results.csv")
-        races = pd.read_csv(ruta + "races.csv")
-        results = pd.read_csv(ruta + "results.csv")
+        constructors = cargar_tabla("constructors")
+        races = cargar_tabla("races")
         
         print(f"✅ Datos cargados: {len(constructors)} constructores, {len(races)} carreras")
         
@@ -44,17 +43,10 @@ def analizar_tendencias_escuderias_ultimos_20_años():
         print("📈 EVOLUCIÓN DE PUNTOS POR ESCUDERÍA (2004-2024)")
         print(f"{'='*80}")
         
-        # Unir datos para obtener puntos por constructor por año
-        constructor_standings_periodo = constructor_standings.merge(
-            races_periodo[['raceId', 'year']], on='raceId'
-        )
-        
-        # Agrupar por año y constructor para obtener puntos máximos (final de temporada)
-        puntos_por_año = constructor_standings_periodo.groupby(['year', 'constructorId']).agg({
-            'points': 'max',
-            'position': 'min',
-            'wins': 'max'
-        }).reset_index()
+        # Clasificación de constructores al final de cada temporada (última ronda del año)
+        puntos_por_año = cargar_clasificacion_final('constructores', año_inicio, año_fin)[
+            ['year', 'constructorId', 'points', 'position', 'wins']
+        ]
         
         # Agregar nombres de constructores
         puntos_por_año = puntos_por_año.merge(
@@ -0,0 +1,122 @@
+import numpy as np
+from cargador_datos import cargar_derivada
+from tabla_hechos import cargar_hechos, FUENTES_HECHOS
+from rachas import rachas_rle
+
+# Versión de los informes: incrementarla al cambiar columnas o métricas
+VERSION_INFORMES = 1
+
+# Cantidad de circuitos favoritos que se guardan por piloto
+TOP_CIRCUITOS = 3
+
+COLUMNAS_HECHOS = ['driverId', 'driverRef', 'driver_name', 'raceId', 'year', 'race_name',
+                   'points', 'position']
+
+
+def generar_informes_carrera(hechos=None):
+    """
+    Calcula los informes de carrera de todos los pilotos en una sola pasada agrupada.
+
+    Devuelve un diccionario con tres tablas:
+    - 'temporadas': evolución por (driverId, year) con puntos, carreras y victorias
+    - 'circuitos': los TOP_CIRCUITOS circuitos con más puntos de cada piloto
+    - 'resumen': una fila por piloto con mejor temporada, podios y racha actual
+    """
+    if hechos is None:
+        hechos = cargar_hechos(COLUMNAS_HECHOS)
+
+    # La tabla de hechos está en orden cronológico; el sort estable lo conserva por piloto
+    hechos = hechos.sort_values('driverId', kind='stable').reset_index(drop=True)
+    posicion = hechos['position']
+    hechos['victoria'] = (posicion == 1).fillna(False).astype(np.int16)
+    hechos['p2'] = (posicion == 2).fillna(False).astype(np.int16)
+    hechos['p3'] = (posicion == 3).fillna(False).astype(np.int16)
+
+    # Evolución por temporada
+    temporadas = hechos.groupby(['driverId', 'year'], observed=True).agg(
+        puntos=('points', 'sum'),
+        carreras=('raceId', 'count'),
+        victorias=('victoria', 'sum')
+    ).reset_index()
+
+    # Mejor temporada: primera fila del máximo de puntos de cada piloto
+    idx_mejor = temporadas.groupby('driverId')['puntos'].idxmax()
+    mejor = temporadas.loc[idx_mejor, ['driverId', 'year', 'puntos']].rename(
+        columns={'year': 'mejor_temporada', 'puntos': 'puntos_mejor_temporada'}
+    )
+
+    # Totales y desglose de podios
+    resumen = hechos.groupby('driverId').agg(
+        driverRef=('driverRef', 'first'),
+        piloto=('driver_name', 'first'),
+        carreras=('raceId', 'count'),
+        puntos=('points', 'sum'),
+        victorias=('victoria', 'sum'),
+        segundos=('p2', 'sum'),
+        terceros=('p3', 'sum')
+    ).reset_index()
+    resumen['podios'] = resumen['victorias'] + resumen['segundos'] + resumen['terceros']
+    resumen = resumen.merge(mejor, on='driverId', how='left')
+
+    # Racha actual de carreras sumando puntos (run-length encoding sobre el orden cronológico)
+    rachas = rachas_rle(hechos['driverId'].to_numpy(), (hechos['points'] > 0).to_numpy())
+    resumen['racha_puntos_actual'] = rachas['actual'].reindex(resumen['driverId']).to_numpy()
+
+    # Circuitos favoritos (más puntos), desempate por nombre para un orden estable
+    circuitos = hechos.groupby(['driverId', 'race_name'], observed=True)['points'].sum().reset_index()
+    circuitos = circuitos.sort_values(['driverId', 'points', 'race_name'], ascending=[True, False, True])
+    circuitos['ranking'] = circuitos.groupby('driverId').cumcount() + 1
+    circuitos = circuitos[circuitos['ranking'] <= TOP_CIRCUITOS].rename(columns={'points': 'puntos'})
+    circuitos['race_name'] = circuitos['race_name'].astype(str)
+
+    return {
+        'temporadas': temporadas,
+        'circuitos': circuitos.reset_index(drop=True),
+        'resumen': resumen
+    }
+
+
+def cargar_informes_carrera(forzar=False):
+    """
+    Devuelve los informes de carrera persistidos en la cache de archive.
+    Se recalculan todos juntos solo si cambia la tabla de hechos o VERSION_INFORMES.
+    """
+    calculados = {}
+
+    def construir(clave):
+        def _construir():
+            if not calculados:
+                calculados.update(generar_informes_carrera())
+            return calculados[clave]
+        return _construir
+
+    return {
+        clave: cargar_derivada(f"informe_{clave}", FUENTES_HECHOS, VERSION_INFORMES,
+                               construir(clave), forzar=forzar)
+        for clave in ('temporadas', 'circuitos', 'resumen')
+    }
+
+
+def informe_piloto(informes, driver_id):
+    """
+    Extrae el informe de un piloto de las tablas batch (consulta por driverId)
+    """
+    resumen = informes['resumen']
+    return {
+        'resumen': resumen[resumen['driverId'] == driver_id].iloc[0],
+        'temporadas': informes['temporadas'][informes['temporadas']['driverId'] == driver_id],
+        'circuitos': informes['circuitos'][informes['circuitos']['driverId'] == driver_id]
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    informes = generar_informes_carrera()
+    print(f"📋 Informes de carrera de {len(informes['resumen']):,} pilotos "
+          f"en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    print("\n⚡ RACHAS ACTUALES MÁS LARGAS SUMANDO PUNTOS:")
+    for _, fila in informes['resumen'].nlargest(5, 'racha_puntos_actual').iterrows():
+        print(f"   • {fila['piloto']:<22}: {fila['racha_puntos_actual']} carreras")
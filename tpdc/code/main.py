@@ -1,130 +1,106 @@
-import pandas as pd
 import os
+from cargador_datos import cargar_tabla
+from informes_carrera import cargar_informes_carrera, informe_piloto
+from matriz_circuitos import cargar_matriz_circuitos, estadisticas_piloto
+from puntuacion_alternativa import reescalar_temporadas
 
-def analizar_pilotos_especificos(tabla_historica, results, races, drivers):
+def analizar_pilotos_especificos(tabla_historica, informes, drivers, codigos=('perez', 'bottas')):
     """
-    Análisis histórico detallado de Sergio Pérez y Valtteri Bottas
+    Análisis histórico detallado de pilotos específicos (por defecto Sergio Pérez y
+    Valtteri Bottas) a partir de los informes de carrera batch de todos los pilotos
     """
     print("\n" + "="*80)
     print("🔍 ANÁLISIS HISTÓRICO DETALLADO DE PILOTOS ESPECÍFICOS")
     print("="*80)
     
-    # Buscar los IDs de los pilotos
-    perez_id = drivers[drivers['surname'] == 'Pérez']['driverId'].iloc[0]
-    bottas_id = drivers[drivers['surname'] == 'Bottas']['driverId'].iloc[0]
-    
-    # Función auxiliar para analizar un piloto
-    def analizar_piloto(driver_id, nombre_piloto):
-        print(f"\n🏎️  {nombre_piloto.upper()}")
-        print("-" * 50)
-        
+    # Función auxiliar para mostrar el informe de un piloto
+    def analizar_piloto(driver_id):
         # Datos básicos del piloto
         piloto_info = drivers[drivers['driverId'] == driver_id].iloc[0]
         datos_tabla = tabla_historica[tabla_historica['Código'] == piloto_info['driverRef']].iloc[0]
+        informe = informe_piloto(informes, driver_id)
+        resumen = informe['resumen']
+        
+        print(f"\n🏎️  {(piloto_info['forename'] + ' ' + piloto_info['surname']).upper()}")
+        print("-" * 50)
         
         print(f"📊 ESTADÍSTICAS GENERALES:")
         print(f"   • Nombre completo: {piloto_info['forename']} {piloto_info['surname']}")
         print(f"   • Nacionalidad: {piloto_info['nationality']}")
-        print(f"   • Fecha de nacimiento: {piloto_info['dob']}")
+        print(f"   • Fecha de nacimiento: {piloto_info['dob']:%Y-%m-%d}")
         print(f"   • Puntos totales carrera: {datos_tabla['Puntos Totales']:,.1f}")
         print(f"   • Carreras disputadas: {datos_tabla['Carreras']}")
         print(f"   • Victorias: {int(datos_tabla['Victorias'])}")
         print(f"   • Promedio puntos/carrera: {datos_tabla['Puntos/Carrera']}")
         
-        # Análisis por temporadas
-        resultados_piloto = results[results['driverId'] == driver_id].copy()
-        resultados_con_carreras = resultados_piloto.merge(races[['raceId', 'year', 'name']], on='raceId')
-        
         # Estadísticas por año
-        stats_por_año = resultados_con_carreras.groupby('year').agg({
-            'points': 'sum',
-            'raceId': 'count',
-            'position': lambda x: sum(1 for pos in x if pos == '1')  # Victorias
-        }).reset_index()
+        stats_por_año = informe['temporadas'][['year', 'puntos', 'carreras', 'victorias']].copy()
         stats_por_año.columns = ['Año', 'Puntos', 'Carreras', 'Victorias']
         
         print(f"\n📈 EVOLUCIÓN POR TEMPORADAS:")
-        # Mostrar solo años con carreras
-        stats_filtrado = stats_por_año[stats_por_año['Carreras'] > 0].sort_values('Año', ascending=False)
+        stats_filtrado = stats_por_año.sort_values('Año', ascending=False)
         for _, row in stats_filtrado.head(10).iterrows():
             print(f"   {int(row['Año'])}: {row['Puntos']:6.1f} puntos, {int(row['Carreras']):2d} carreras, {int(row['Victorias']):2d} victorias")
         
-        # Mejores temporadas
-        mejor_temporada = stats_filtrado.loc[stats_filtrado['Puntos'].idxmax()]
-        print(f"\n🏆 MEJOR TEMPORADA: {int(mejor_temporada['Año'])} ({mejor_temporada['Puntos']:.1f} puntos)")
+        # Mejor temporada
+        print(f"\n🏆 MEJOR TEMPORADA: {int(resumen['mejor_temporada'])} ({resumen['puntos_mejor_temporada']:.1f} puntos)")
         
         # Análisis de podios
-        podios = resultados_con_carreras[
-            (resultados_con_carreras['position'].isin(['1', '2', '3'])) & 
-            (resultados_con_carreras['position'] != '\\N')
-        ]
-        total_podios = len(podios)
-        
-        if total_podios > 0:
-            print(f"🥇 PODIOS: {total_podios} totales")
-            podios_por_pos = podios['position'].value_counts().sort_index()
-            for pos, count in podios_por_pos.items():
-                pos_names = {'1': '1° lugar', '2': '2° lugar', '3': '3° lugar'}
-                print(f"   • {pos_names[pos]}: {count}")
+        if resumen['podios'] > 0:
+            print(f"🥇 PODIOS: {resumen['podios']} totales")
+            for etiqueta, columna in [('1° lugar', 'victorias'), ('2° lugar', 'segundos'), ('3° lugar', 'terceros')]:
+                if resumen[columna] > 0:
+                    print(f"   • {etiqueta}: {resumen[columna]}")
         
         # Circuitos favoritos (más puntos)
-        puntos_por_circuito = resultados_con_carreras.groupby('name')['points'].sum().sort_values(ascending=False)
         print(f"\n🏁 TOP 3 CIRCUITOS (más puntos):")
-        for i, (circuito, puntos) in enumerate(puntos_por_circuito.head(3).items(), 1):
-            print(f"   {i}. {circuito}: {puntos:.1f} puntos")
-        
-        # Racha de puntos
-        resultados_ordenados = resultados_con_carreras.sort_values(['year', 'raceId'])
-        resultados_ordenados['puntos_conseguidos'] = resultados_ordenados['points'] > 0
-        
-        # Calcular racha actual
-        racha_actual = 0
-        for puntos in reversed(resultados_ordenados['puntos_conseguidos'].tolist()):
-            if puntos:
-                racha_actual += 1
-            else:
-                break
+        for _, circuito in informe['circuitos'].iterrows():
+            print(f"   {circuito['ranking']}. {circuito['race_name']}: {circuito['puntos']:.1f} puntos")
         
+        # Racha actual de puntos
+        racha_actual = resumen['racha_puntos_actual']
         if racha_actual > 0:
             print(f"\n⚡ RACHA ACTUAL: {racha_actual} carreras consecutivas sumando puntos")
         
         return stats_por_año
     
-    # Analizar ambos pilotos
-    stats_perez = analizar_piloto(perez_id, "SERGIO PÉREZ")
-    stats_bottas = analizar_piloto(bottas_id, "VALTTERI BOTTAS")
+    # Buscar los IDs de los pilotos y analizarlos
+    pilotos = drivers[drivers['driverRef'].isin(codigos)].set_index('driverRef').loc[list(codigos)]
+    for driver_id in pilotos['driverId']:
+        analizar_piloto(driver_id)
     
     # Comparación directa
     print(f"\n⚖️  COMPARACIÓN DIRECTA")
     print("-" * 50)
     
-    perez_datos = tabla_historica[tabla_historica['Código'] == 'perez'].iloc[0]
-    bottas_datos = tabla_historica[tabla_historica['Código'] == 'bottas'].iloc[0]
+    datos = {codigo: tabla_historica[tabla_historica['Código'] == codigo].iloc[0] for codigo in codigos}
+    apellidos = dict(zip(pilotos.index, pilotos['surname']))
     
     print(f"Puntos totales:")
-    print(f"   • Pérez: {perez_datos['Puntos Totales']:,.1f}")
-    print(f"   • Bottas: {bottas_datos['Puntos Totales']:,.1f}")
-    print(f"   • Diferencia: {abs(perez_datos['Puntos Totales'] - bottas_datos['Puntos Totales']):.1f} puntos")
+    for codigo in codigos:
+        print(f"   • {apellidos[codigo]}: {datos[codigo]['Puntos Totales']:,.1f}")
+    if len(codigos) == 2:
+        diferencia = abs(datos[codigos[0]]['Puntos Totales'] - datos[codigos[1]]['Puntos Totales'])
+        print(f"   • Diferencia: {diferencia:.1f} puntos")
     
     print(f"\nVictorias:")
-    print(f"   • Pérez: {int(perez_datos['Victorias'])}")
-    print(f"   • Bottas: {int(bottas_datos['Victorias'])}")
+    for codigo in codigos:
+        print(f"   • {apellidos[codigo]}: {int(datos[codigo]['Victorias'])}")
     
     print(f"\nPromedio puntos/carrera:")
-    print(f"   • Pérez: {perez_datos['Puntos/Carrera']:.2f}")
-    print(f"   • Bottas: {bottas_datos['Puntos/Carrera']:.2f}")
+    for codigo in codigos:
+        print(f"   • {apellidos[codigo]}: {datos[codigo]['Puntos/Carrera']:.2f}")
     
     # Posiciones en el ranking histórico
-    pos_perez = tabla_historica[tabla_historica['Código'] == 'perez'].index[0] + 1
-    pos_bottas = tabla_historica[tabla_historica['Código'] == 'bottas'].index[0] + 1
-    
     print(f"\nPosición en ranking histórico:")
-    print(f"   • Pérez: #{pos_perez}")
-    print(f"   • Bottas: #{pos_bottas}")
+    for codigo in codigos:
+        posicion = tabla_historica[tabla_historica['Código'] == codigo].index[0] + 1
+        print(f"   • {apellidos[codigo]}: #{posicion}")
 
-def analizar_rendimiento_perez_por_circuito(results, races, drivers):
+def analizar_rendimiento_perez_por_circuito(matriz, drivers):
     """
-    Análisis detallado del rendimiento de Sergio Pérez en cada circuito
+    Análisis detallado del rendimiento de Sergio Pérez en cada circuito,
+    leído de la matriz precalculada piloto × circuito
     """
     print("\n" + "="*90)
     print("🏁 ANÁLISIS DE RENDIMIENTO DE SERGIO PÉREZ POR CIRCUITO")
@@ -133,80 +109,21 @@ def analizar_rendimiento_perez_por_circuito(results, races, drivers):
     # Obtener ID de Sergio Pérez
     perez_id = drivers[drivers['surname'] == 'Pérez']['driverId'].iloc[0]
     
-    # Obtener todos los resultados de Pérez
-    resultados_perez = results[results['driverId'] == perez_id].copy()
-    
-    # Unir con información de carreras para obtener nombres de circuitos
-    resultados_con_carreras = resultados_perez.merge(
-        races[['raceId', 'name', 'year', 'circuitId']], 
-        on='raceId'
-    )
-    
-    # Cargar información de circuitos
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    ruta = os.path.join(script_dir, "..", "archive") + os.sep
-    circuits = pd.read_csv(ruta + "circuits.csv")
-    
-    # Unir con información de circuitos para obtener ubicación
-    resultados_completos = resultados_con_carreras.merge(
-        circuits[['circuitId', 'location', 'country']], 
-        on='circuitId'
+    # Fila de Pérez en la matriz: un registro por circuito disputado
+    df_estadisticas = estadisticas_piloto(matriz, perez_id).rename(columns={
+        'circuit_name': 'Circuito', 'location': 'Ubicacion', 'country': 'Pais', 'carreras': 'Carreras',
+        'puntos_total': 'Puntos_Total', 'puntos_promedio': 'Puntos_Promedio',
+        'mejor_posicion': 'Mejor_Posicion', 'posicion_promedio': 'Posicion_Promedio',
+        'victorias': 'Victorias', 'podios': 'Podios', 'top5': 'Top5', 'top10': 'Top10'
+    })
+    
+    df_estadisticas['Puntos_Promedio'] = df_estadisticas['Puntos_Promedio'].astype(float).round(2)
+    df_estadisticas['Posicion_Promedio'] = df_estadisticas['Posicion_Promedio'].astype(float).round(1)
+    # Sin posiciones clasificadas en el circuito se muestra 'N/A'
+    df_estadisticas['Mejor_Posicion'] = df_estadisticas['Mejor_Posicion'].astype('Int16').astype(object).where(
+        df_estadisticas['Mejor_Posicion'].notna(), 'N/A'
     )
     
-    # Análisis por circuito
-    stats_por_circuito = resultados_completos.groupby(['name', 'location', 'country']).agg({
-        'points': ['sum', 'mean', 'count'],
-        'position': lambda x: [pos for pos in x if pos not in ['\\N', None]],
-        'raceId': 'count'
-    }).reset_index()
-    
-    # Aplanar columnas
-    stats_por_circuito.columns = ['Circuito', 'Ubicacion', 'Pais', 'Puntos_Total', 'Puntos_Promedio', 
-                                 'Carreras_Puntos', 'Posiciones', 'Total_Carreras']
-    
-    # Calcular estadísticas adicionales
-    def calcular_estadisticas_posicion(posiciones):
-        posiciones_validas = [int(pos) for pos in posiciones if pos not in ['\\N', None]]
-        if not posiciones_validas:
-            return {
-                'mejor_posicion': 'N/A',
-                'posicion_promedio': 'N/A',
-                'podios': 0,
-                'victorias': 0,
-                'top5': 0,
-                'top10': 0
-            }
-        
-        return {
-            'mejor_posicion': min(posiciones_validas),
-            'posicion_promedio': sum(posiciones_validas) / len(posiciones_validas),
-            'podios': sum(1 for pos in posiciones_validas if pos <= 3),
-            'victorias': sum(1 for pos in posiciones_validas if pos == 1),
-            'top5': sum(1 for pos in posiciones_validas if pos <= 5),
-            'top10': sum(1 for pos in posiciones_validas if pos <= 10)
-        }
-    
-    # Aplicar cálculos a cada circuito
-    estadisticas_detalladas = []
-    for _, row in stats_por_circuito.iterrows():
-        stats = calcular_estadisticas_posicion(row['Posiciones'])
-        estadisticas_detalladas.append({
-            'Circuito': row['Circuito'],
-            'Ubicacion': row['Ubicacion'],
-            'Pais': row['Pais'],
-            'Carreras': row['Total_Carreras'],
-            'Puntos_Total': row['Puntos_Total'],
-            'Puntos_Promedio': round(row['Puntos_Promedio'], 2),
-            'Mejor_Posicion': stats['mejor_posicion'],
-            'Posicion_Promedio': round(stats['posicion_promedio'], 1) if stats['posicion_promedio'] != 'N/A' else 'N/A',
-            'Victorias': stats['victorias'],
-            'Podios': stats['podios'],
-            'Top5': stats['top5'],
-            'Top10': stats['top10']
-        })
-    
-    df_estadisticas = pd.DataFrame(estadisticas_detalladas)
-    
     # Ordenar por puntos totales
     df_estadisticas = df_estadisticas.sort_values('Puntos_Total', ascending=False)
     
@@ -250,7 +167,7 @@ def analizar_rendimiento_perez_por_circuito(results, races, drivers):
     # Análisis por región/país
     print(f"\n🌍 ANÁLISIS POR REGIÓN:")
     print("-" * 50)
-    por_pais = df_estadisticas.groupby('Pais').agg({
+    por_pais = df_estadisticas.groupby('Pais', observed=True).agg({
         'Carreras': 'sum',
         'Puntos_Total': 'sum',
         'Puntos_Promedio': 'mean',
@@ -284,9 +201,9 @@ def crear_tabla_historica_pilotos():
     # Cargar los datos necesarios
     print("📂 Cargando datos...")
     try:
-        drivers = pd.read_csv(ruta + "drivers.csv")
-        results = pd.read_csv(ruta + "results.csv")
-        races = pd.read_csv(ruta + "races.csv")
+        drivers = cargar_tabla("drivers")
+        results = cargar_tabla("results")
+        races = cargar_tabla("races")
         print(f"✅ Archivos cargados exitosamente!")
         print(f"   • Pilotos: {len(drivers)} registros")
         print(f"   • Resultados: {len(results)} registros")
@@ -311,7 +228,7 @@ def crear_tabla_historica_pilotos():
     tabla_historica = tabla_historica.merge(carreras_por_piloto, on='driverId', how='left')
     
     # Contar victorias (posición = 1)
-    victorias = results[results['position'] == '1'].groupby('driverId').size().reset_index(name='victorias')
+    victorias = results[results['position'] == 1].groupby('driverId').size().reset_index(name='victorias')
     tabla_historica = tabla_historica.merge(victorias, on='driverId', how='left')
     tabla_historica['victorias'] = tabla_historica['victorias'].fillna(0)
     
@@ -364,12 +281,25 @@ if __name__ == "__main__":
         print(f"• Promedio de carreras por piloto: {tabla['Carreras'].mean():.1f}")
         print(f"• Piloto con más victorias: {tabla.loc[tabla['Victorias'].idxmax(), 'Piloto']} ({tabla['Victorias'].max():.0f} victorias)")
         
+        # Comparación entre épocas: todas las temporadas reescaladas con el sistema actual
+        reescalado = reescalar_temporadas()['carrera']
+        tabla_normalizada = reescalado[['driverId', '2010']].merge(
+            drivers[['driverId', 'driverRef']], on='driverId'
+        ).rename(columns={'driverRef': 'Código', '2010': 'Puntos (sistema 2010)'})
+        tabla_normalizada = tabla.merge(tabla_normalizada.drop(columns='driverId'), on='Código')
+        tabla_normalizada = tabla_normalizada.sort_values('Puntos (sistema 2010)', ascending=False)
+        print("\n⚖️ TOP 20 CON TODAS LAS TEMPORADAS PUNTUADAS CON EL SISTEMA 2010 (25-18-15-...):")
+        print(tabla_normalizada.head(20)[['Piloto', 'Nacionalidad', 'Puntos (sistema 2010)', 'Puntos Totales',
+                                          'Carreras', 'Victorias']].to_string(index=False))
+        
         # Guardar en CSV si se desea
         # tabla.to_csv("tabla_historica_pilotos_f1.csv", index=False, encoding='utf-8')
         # print("\n💾 Tabla guardada como 'tabla_historica_pilotos_f1.csv'")
         
-        # Análisis histórico detallado de pilotos específicos
-        analizar_pilotos_especificos(tabla, results, races, drivers)
+        # Análisis histórico detallado de pilotos específicos (informes batch de todos los pilotos)
+        informes = cargar_informes_carrera()
+        analizar_pilotos_especificos(tabla, informes, drivers)
         
         # Análisis de rendimiento de Pérez por circuito
-        estadisticas_circuitos = analizar_rendimiento_perez_por_circuito(results, races, drivers)
+        matriz = cargar_matriz_circuitos()
+        estadisticas_circuitos = analizar_rendimiento_perez_por_circuito(matriz, drivers)
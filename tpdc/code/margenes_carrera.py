@@ -0,0 +1,71 @@
+from tabla_hechos import cargar_hechos
+
+COLUMNAS_HECHOS = ['raceId', 'year', 'race_name', 'race_date', 'driverId', 'driver_name',
+                   'dob', 'driver_nationality', 'position', 'milliseconds']
+
+
+def edad_en_fecha(nacimiento, fecha):
+    """
+    Edad exacta en años cumplidos a una fecha, vectorizada sobre Series datetime64
+    """
+    cumplio = (fecha.dt.month > nacimiento.dt.month) | (
+        (fecha.dt.month == nacimiento.dt.month) & (fecha.dt.day >= nacimiento.dt.day)
+    )
+    return (fecha.dt.year - nacimiento.dt.year - (~cumplio).astype(int)).astype('Int16')
+
+
+def calcular_margenes(hechos=None, posiciones=(2,)):
+    """
+    Margen del ganador en todas las carreras (1950 a hoy) en una sola pasada.
+
+    Devuelve una fila por carrera con al menos dos clasificados: ganador y segundo
+    (nombre, edad en la carrera y nacionalidad), diferencia de edad y, para cada n
+    en 'posiciones', la diferencia P1–Pn en segundos ('diferencia_p{n}') calculada
+    con milliseconds. Si Pn no tiene tiempo (doblado o sin dato) la diferencia es NA.
+    """
+    if hechos is None:
+        hechos = cargar_hechos(COLUMNAS_HECHOS)
+
+    max_pos = max(max(posiciones), 2)
+    clasificados = hechos[(hechos['position'] <= max_pos).fillna(False)].copy()
+    # Autos compartidos de los años 50 pueden repetir posición: se toma el primer registro
+    clasificados = clasificados.drop_duplicates(['raceId', 'position'])
+    clasificados['edad'] = edad_en_fecha(clasificados['dob'], clasificados['race_date'])
+
+    datos_piloto = ['raceId', 'driver_name', 'edad', 'driver_nationality']
+    primero = clasificados[clasificados['position'] == 1]
+    segundo = clasificados[clasificados['position'] == 2]
+
+    margenes = primero[['raceId', 'year', 'race_name', 'race_date'] + datos_piloto[1:]].rename(
+        columns={'driver_name': 'piloto_1', 'edad': 'edad_1', 'driver_nationality': 'pais_1'}
+    ).merge(
+        segundo[datos_piloto].rename(
+            columns={'driver_name': 'piloto_2', 'edad': 'edad_2', 'driver_nationality': 'pais_2'}
+        ),
+        on='raceId'
+    )
+    margenes['diferencia_edad'] = (margenes['edad_1'] - margenes['edad_2']).abs()
+
+    # Tiempos por posición en formato ancho: una columna por posición
+    tiempos = clasificados.pivot(index='raceId', columns='position', values='milliseconds')
+    tiempos = tiempos.reindex(columns=range(1, max_pos + 1)).astype('Float64')
+    for n in posiciones:
+        diferencia = (tiempos[n] - tiempos[1]) / 1000  # Convertir a segundos
+        margenes[f'diferencia_p{n}'] = margenes['raceId'].map(diferencia).astype('Float64')
+
+    return margenes.sort_values(['race_date', 'raceId']).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    margenes = calcular_margenes(posiciones=(2, 3, 10))
+    print(f"⏱️ Márgenes de {len(margenes):,} carreras ({margenes['year'].min()}-{margenes['year'].max()}) "
+          f"en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    por_año = margenes.groupby('year')['diferencia_p2'].agg(['mean', 'median', 'count'])
+    print("\n📉 MARGEN PROMEDIO 1º-2º POR DÉCADA (segundos):")
+    decadas = por_año.groupby((por_año.index // 10) * 10)['mean'].mean()
+    for decada, valor in decadas.items():
+        print(f"   • {decada}s: {valor:7.3f}")
@@ -0,0 +1,152 @@
+import pandas as pd
+import numpy as np
+from cargador_datos import cargar_derivada
+from tabla_hechos import cargar_hechos, FUENTES_HECHOS
+
+# Versión de la matriz piloto × circuito: incrementarla al cambiar métricas
+VERSION_MATRIZ = 1
+
+# Métricas guardadas por celda (driverId, circuitId) y su tipo en la matriz densa
+METRICAS = {
+    'carreras': np.int16,
+    'puntos_total': np.float32,
+    'puntos_promedio': np.float32,
+    'mejor_posicion': np.float32,
+    'posicion_promedio': np.float32,
+    'victorias': np.int16,
+    'podios': np.int16,
+    'top5': np.int16,
+    'top10': np.int16
+}
+
+
+def construir_celdas_piloto_circuito(hechos=None):
+    """
+    Calcula las métricas de todas las combinaciones (piloto, circuito) con resultados
+    en un solo groupby. Es la forma dispersa (una fila por celda no vacía) de la matriz.
+    """
+    if hechos is None:
+        hechos = cargar_hechos(['driverId', 'circuitId', 'raceId', 'points', 'position'])
+
+    posicion = hechos['position']
+    indicadores = pd.DataFrame({
+        'driverId': hechos['driverId'],
+        'circuitId': hechos['circuitId'],
+        'raceId': hechos['raceId'],
+        'points': hechos['points'],
+        'position': posicion.astype('float64'),
+        'victoria': (posicion == 1).fillna(False).astype(np.int16),
+        'podio': (posicion <= 3).fillna(False).astype(np.int16),
+        'top5': (posicion <= 5).fillna(False).astype(np.int16),
+        'top10': (posicion <= 10).fillna(False).astype(np.int16)
+    })
+
+    return indicadores.groupby(['driverId', 'circuitId']).agg(
+        carreras=('raceId', 'count'),
+        puntos_total=('points', 'sum'),
+        puntos_promedio=('points', 'mean'),
+        mejor_posicion=('position', 'min'),
+        posicion_promedio=('position', 'mean'),
+        victorias=('victoria', 'sum'),
+        podios=('podio', 'sum'),
+        top5=('top5', 'sum'),
+        top10=('top10', 'sum')
+    ).reset_index()
+
+
+def _construir_circuitos():
+    hechos = cargar_hechos(['circuitId', 'circuit_name', 'location', 'country'])
+    circuitos = hechos.drop_duplicates('circuitId').sort_values('circuitId').reset_index(drop=True)
+    for col in ('circuit_name', 'location', 'country'):
+        circuitos[col] = circuitos[col].astype(str)
+    return circuitos
+
+
+def cargar_matriz_circuitos(forzar=False):
+    """
+    Devuelve la matriz piloto × circuito como arrays densos (una matriz por métrica)
+    más los índices directos driverId → fila y circuitId → columna.
+
+    Las celdas se persisten en forma dispersa en la cache de archive y la matriz
+    densa se arma al cargar; cualquier consulta (piloto, circuito) es O(1).
+    """
+    celdas = cargar_derivada("matriz_piloto_circuito", FUENTES_HECHOS, VERSION_MATRIZ,
+                             construir_celdas_piloto_circuito, forzar=forzar)
+    circuitos = cargar_derivada("circuitos_matriz", FUENTES_HECHOS, VERSION_MATRIZ,
+                                _construir_circuitos, forzar=forzar)
+
+    driver_ids = np.unique(celdas['driverId'].to_numpy())
+    circuit_ids = circuitos['circuitId'].to_numpy()
+
+    # Índices directos por id (los ids de Ergast son enteros chicos y densos)
+    fila_de_piloto = np.full(driver_ids.max() + 1, -1, dtype=np.int32)
+    fila_de_piloto[driver_ids] = np.arange(len(driver_ids))
+    columna_de_circuito = np.full(circuit_ids.max() + 1, -1, dtype=np.int32)
+    columna_de_circuito[circuit_ids] = np.arange(len(circuit_ids))
+
+    filas = fila_de_piloto[celdas['driverId'].to_numpy()]
+    columnas = columna_de_circuito[celdas['circuitId'].to_numpy()]
+
+    matriz = {
+        'driver_ids': driver_ids,
+        'circuit_ids': circuit_ids,
+        'fila_de_piloto': fila_de_piloto,
+        'columna_de_circuito': columna_de_circuito,
+        'circuitos': circuitos
+    }
+    forma = (len(driver_ids), len(circuit_ids))
+    for metrica, tipo in METRICAS.items():
+        # Celdas vacías: 0 en los conteos y NaN en promedios/posiciones
+        relleno = np.nan if np.issubdtype(tipo, np.floating) and metrica != 'puntos_total' else 0
+        valores = np.full(forma, relleno, dtype=tipo)
+        valores[filas, columnas] = celdas[metrica].to_numpy(dtype=tipo)
+        matriz[metrica] = valores
+
+    return matriz
+
+
+def consultar_celda(matriz, driver_id, circuit_id):
+    """
+    Métricas de un piloto en un circuito (O(1)); None si nunca corrió allí
+    """
+    if driver_id >= len(matriz['fila_de_piloto']) or circuit_id >= len(matriz['columna_de_circuito']):
+        return None
+    fila = matriz['fila_de_piloto'][driver_id]
+    columna = matriz['columna_de_circuito'][circuit_id]
+    if fila < 0 or columna < 0 or matriz['carreras'][fila, columna] == 0:
+        return None
+    return {metrica: matriz[metrica][fila, columna].item() for metrica in METRICAS}
+
+
+def estadisticas_piloto(matriz, driver_id):
+    """
+    Fila completa de la matriz para un piloto: un registro por circuito disputado
+    (tabla vacía si el piloto no tiene resultados o el id está fuera de la matriz)
+    """
+    fila = matriz['fila_de_piloto'][driver_id] if 0 <= driver_id < len(matriz['fila_de_piloto']) else -1
+    if fila < 0:
+        circuitos = matriz['circuitos'].iloc[:0].reset_index(drop=True)
+        for metrica in METRICAS:
+            circuitos[metrica] = matriz[metrica][:0, 0]
+        return circuitos
+    disputados = matriz['carreras'][fila] > 0
+    circuitos = matriz['circuitos'][disputados].reset_index(drop=True)
+    for metrica in METRICAS:
+        circuitos[metrica] = matriz[metrica][fila, disputados]
+    return circuitos
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    matriz = cargar_matriz_circuitos(forzar=True)
+    print(f"🗺️ Matriz piloto × circuito {matriz['carreras'].shape} construida en "
+          f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    inicio = time.perf_counter()
+    matriz = cargar_matriz_circuitos()
+    print(f"⚡ Carga desde cache: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    # Hamilton (1) en Silverstone (9)
+    print(f"   • Ejemplo (driverId=1, circuitId=9): {consultar_celda(matriz, 1, 9)}")
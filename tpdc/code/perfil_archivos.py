@@ -0,0 +1,247 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+from multiprocessing import Pool
+from cargador_datos import RUTA_ARCHIVE, RUTA_CACHE
+from esquema_archive import leer_csv_tipado
+
+# Filas por bloque de lectura: la memoria queda acotada por este tamaño, no por el del CSV
+TAMAÑO_BLOQUE = 50_000
+
+# Precisión de HyperLogLog: 2^14 registros, error estándar ≈ 1.04 / sqrt(2^14) ≈ 0.8%
+BITS_HLL = 14
+
+# Tamaño de la muestra uniforme por columna numérica para los cuantiles aproximados
+TAMAÑO_MUESTRA = 20_000
+CUANTILES = [0.25, 0.5, 0.75]
+
+# Hashes de fila guardados para contar duplicados exactos (8 bytes cada uno); por encima
+# de este límite los duplicados se estiman con HyperLogLog
+LIMITE_HASHES_FILA = 2_000_000
+
+# Valores más frecuentes que se muestran para columnas con pocos valores distintos
+MAX_VALORES_FRECUENTES = 20
+
+
+class HyperLogLog:
+    """
+    Contador aproximado de valores distintos con memoria fija (2^bits registros de un byte).
+    Recibe hashes de 64 bits ya calculados; dos contadores se combinan con el máximo.
+    """
+
+    def __init__(self, bits=BITS_HLL):
+        self.bits = bits
+        self.registros = np.zeros(1 << bits, dtype=np.uint8)
+
+    def agregar(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        indices = (hashes >> np.uint64(64 - self.bits)).astype(np.int64)
+        # Rango = posición del primer 1 en los 32 bits bajos (33 si son todos ceros);
+        # frexp es exacto porque el valor entra en la mantisa de un float64
+        resto = (hashes & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        rangos = (33 - np.frexp(resto)[1]).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rangos)
+
+    def combinar(self, otro):
+        np.maximum(self.registros, otro.registros, out=self.registros)
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimacion = alfa * m * m / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        vacios = np.count_nonzero(self.registros == 0)
+        if estimacion <= 2.5 * m and vacios > 0:
+            # Rango chico: conteo lineal de registros vacíos
+            estimacion = m * np.log(m / vacios)
+        return int(round(estimacion))
+
+
+class PerfilColumna:
+    """
+    Estadísticos de una columna acumulados bloque a bloque en una sola pasada:
+    conteo, nulos, media y varianza (Welford/Chan), mínimo, máximo, distintos (HLL),
+    cuantiles sobre una muestra uniforme y frecuencias mientras haya pocos valores
+    """
+
+    def __init__(self, nombre, rng):
+        self.nombre = nombre
+        self.tipo = None
+        self.filas = 0
+        self.nulos = 0
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = None
+        self.maximo = None
+        self.hll = HyperLogLog()
+        self.rng = rng
+        self.muestra = np.empty(0)
+        self.claves_muestra = np.empty(0)
+        self.frecuencias = {}
+
+    def agregar(self, serie):
+        self.tipo = self.tipo or str(serie.dtype)
+        self.filas += len(serie)
+        valores = serie.dropna()
+        self.nulos += len(serie) - len(valores)
+        if len(valores) == 0:
+            return
+
+        if pd.api.types.is_numeric_dtype(valores) or pd.api.types.is_bool_dtype(valores):
+            self._agregar_numericos(valores.to_numpy(dtype=np.float64))
+        elif pd.api.types.is_datetime64_any_dtype(valores):
+            self._agregar_extremos(valores.min(), valores.max())
+        else:
+            valores = valores.astype('string')
+            self._agregar_extremos(valores.min(), valores.max())
+
+        self.hll.agregar(pd.util.hash_pandas_object(valores, index=False).to_numpy())
+        if self.frecuencias is not None:
+            for valor, cantidad in valores.value_counts().items():
+                self.frecuencias[valor] = self.frecuencias.get(valor, 0) + int(cantidad)
+            if len(self.frecuencias) > MAX_VALORES_FRECUENTES:
+                self.frecuencias = None
+
+    def _agregar_extremos(self, minimo, maximo):
+        self.minimo = minimo if self.minimo is None else min(self.minimo, minimo)
+        self.maximo = maximo if self.maximo is None else max(self.maximo, maximo)
+
+    def _agregar_numericos(self, x):
+        # Combinación de Chan: el bloque aporta (n, media, M2) y se une al acumulado
+        n_b, media_b = len(x), x.mean()
+        m2_b = np.square(x - media_b).sum()
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.media += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+        self._agregar_extremos(x.min(), x.max())
+
+        # Muestra uniforme por prioridades: se conservan los valores con las claves más chicas
+        claves = np.concatenate([self.claves_muestra, self.rng.random(n_b)])
+        valores = np.concatenate([self.muestra, x])
+        if len(claves) > TAMAÑO_MUESTRA:
+            elegidos = np.argpartition(claves, TAMAÑO_MUESTRA)[:TAMAÑO_MUESTRA]
+            claves, valores = claves[elegidos], valores[elegidos]
+        self.claves_muestra, self.muestra = claves, valores
+
+    def resumen(self):
+        perfil = {
+            'tipo': self.tipo,
+            'conteo': self.filas - self.nulos,
+            'nulos': self.nulos,
+            'distintos_aprox': len(self.frecuencias) if self.frecuencias is not None
+            else min(self.hll.estimar(), self.filas - self.nulos),
+            'minimo': _a_json(self.minimo),
+            'maximo': _a_json(self.maximo)
+        }
+        if self.n > 0:
+            perfil['media'] = self.media
+            perfil['desvio'] = float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else 0.0
+            perfil['cuantiles'] = {str(q): float(v) for q, v in
+                                   zip(CUANTILES, np.quantile(self.muestra, CUANTILES))}
+        if self.frecuencias:
+            perfil['frecuencias'] = {str(_a_json(k)): v for k, v in
+                                     sorted(self.frecuencias.items(), key=lambda kv: -kv[1])}
+        return perfil
+
+
+def _a_json(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.strftime('%Y-%m-%d')
+    if isinstance(valor, (np.integer, np.floating)):
+        return valor.item()
+    return valor
+
+
+def perfilar_archivo(nombre, tamaño_bloque=TAMAÑO_BLOQUE, semilla=0):
+    """
+    Perfil de un CSV de archive leído en bloques de 'tamaño_bloque' filas con los tipos
+    de esquema_archive. Los duplicados son filas − filas distintas según el hash de la fila
+    completa: exactos mientras haya hasta LIMITE_HASHES_FILA filas distintas y estimados
+    con HyperLogLog a partir de ahí. Si el archivo no existe se informa en vez de fallar.
+    """
+    ruta_csv = os.path.join(RUTA_ARCHIVE, f"{nombre}.csv")
+    if not os.path.exists(ruta_csv):
+        return {'archivo': f"{nombre}.csv", 'existe': False}
+
+    rng = np.random.default_rng(semilla)
+    columnas = {}
+    filas_hll = HyperLogLog()
+    hashes_fila = np.empty(0, dtype=np.uint64)
+    filas = 0
+    for bloque in leer_csv_tipado(ruta_csv, nombre, chunksize=tamaño_bloque):
+        filas += len(bloque)
+        for columna in bloque.columns:
+            if columna not in columnas:
+                columnas[columna] = PerfilColumna(columna, rng)
+            columnas[columna].agregar(bloque[columna])
+        hashes = pd.util.hash_pandas_object(bloque, index=False).to_numpy()
+        filas_hll.agregar(hashes)
+        if hashes_fila is not None:
+            hashes_fila = np.union1d(hashes_fila, hashes)
+            if len(hashes_fila) > LIMITE_HASHES_FILA:
+                hashes_fila = None
+
+    distintas = len(hashes_fila) if hashes_fila is not None else min(filas_hll.estimar(), filas)
+    return {
+        'archivo': f"{nombre}.csv",
+        'existe': True,
+        'bytes': os.path.getsize(ruta_csv),
+        'filas': filas,
+        'columnas': len(columnas),
+        'nulos': sum(c.nulos for c in columnas.values()),
+        'duplicados': filas - distintas,
+        'duplicados_exactos': hashes_fila is not None,
+        'perfil_columnas': {nombre_columna: c.resumen() for nombre_columna, c in columnas.items()}
+    }
+
+
+def archivos_archive():
+    """
+    Nombres (sin extensión) de todos los CSV presentes en archive
+    """
+    return sorted(f[:-len(".csv")] for f in os.listdir(RUTA_ARCHIVE) if f.endswith(".csv"))
+
+
+def perfilar_archive(nombres=None, n_procesos=None, ruta_json=None):
+    """
+    Perfila varios CSV de archive (por defecto todos los presentes), un archivo por
+    tarea en un Pool, y guarda el reporte en JSON (por defecto en archive/cache).
+    Devuelve el reporte como lista de diccionarios, en el orden de 'nombres'.
+    """
+    nombres = list(nombres) if nombres is not None else archivos_archive()
+    n_procesos = os.cpu_count() if n_procesos is None else n_procesos
+    if n_procesos <= 1 or len(nombres) <= 1:
+        reporte = [perfilar_archivo(nombre) for nombre in nombres]
+    else:
+        with Pool(min(n_procesos, len(nombres))) as pool:
+            reporte = pool.map(perfilar_archivo, nombres)
+
+    ruta_json = ruta_json or os.path.join(RUTA_CACHE, "perfil_archive.json")
+    try:
+        os.makedirs(os.path.dirname(ruta_json), exist_ok=True)
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False, default=str)
+    except OSError as e:
+        print(f"⚠️  No se pudo escribir el reporte {ruta_json}: {e}")
+    return reporte
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    reporte = perfilar_archive()
+    print(f"🧮 {len(reporte)} archivos perfilados en {time.perf_counter() - inicio:.2f} s")
+    for perfil in reporte:
+        if not perfil['existe']:
+            print(f"   • {perfil['archivo']:<26}: ❌ no encontrado")
+            continue
+        print(f"   • {perfil['archivo']:<26}: {perfil['filas']:9,} filas | {perfil['nulos']:8,} nulos | "
+              f"{perfil['duplicados']:,} duplicados")
@@ -1,17 +1,47 @@
 import pandas as pd
 import numpy as np
-import os
 from datetime import datetime
+from cargador_datos import cargar_tabla
+from clasificacion_final import cargar_clasificacion_final
+from simulador_montecarlo import simular_temporadas, fuerzas_desde_puntos, N_CARRERAS
+from ratings_elo import cargar_elo, ids_por_nombre, factores_elo
+from duelos_compañeros import cargar_duelos, reparto_observado
+
+# Factores del modelo base (compartidos con el backtest en backtest_prediccion.py)
+FACTOR_EXPERIENCIA = {
+    'Baja': 0.85,
+    'Media': 0.95,
+    'Alta': 1.0,
+    'Máxima': 1.05
+}
+REPARTO_PRIMER_PILOTO = 0.6  # El segundo piloto se lleva el resto de los puntos del equipo
+# Curva de edad: un factor por banda (edad <= cada límite) y el último para los mayores
+LIMITES_EDAD = [25, 32, 38]
+FACTORES_EDAD = [1.05, 1.1, 1.0, 0.9]
+
+
+def factor_edad(edad):
+    """
+    Curva de performance por edad, vectorizada (escalar o array de edades)
+    """
+    edad = np.asarray(edad)
+    return np.select([edad <= limite for limite in LIMITES_EDAD], FACTORES_EDAD[:-1], FACTORES_EDAD[-1])[()]
+
+
+def proyectar_puntos_constructor(puntos, horizonte=2):
+    """
+    Proyecta los puntos de un equipo 'horizonte' temporadas hacia adelante con la
+    pendiente de una regresión lineal sobre sus últimas temporadas (ordenadas por año)
+    """
+    puntos = np.asarray(puntos, dtype=np.float64)
+    pendiente = np.polyfit(np.arange(len(puntos)), puntos, 1)[0] if len(puntos) > 1 else 0
+    return puntos[-1] + pendiente * horizonte, pendiente
 
 def predecir_temporada_2026():
     """
     Predicción de clasificación de pilotos y constructores para la temporada 2026
     basada en análisis de tendencias históricas, performance reciente y factores técnicos
     """
-    # Obtener la ruta a los archivos
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    ruta = os.path.join(script_dir, "..", "archive") + os.sep
-    
     print("="*90)
     print("🔮 PREDICCIÓN FÓRMULA 1 - TEMPORADA 2026")
     print("="*90)
@@ -19,47 +49,27 @@ def predecir_temporada_2026():
     try:
         # Cargar datos necesarios
         print("📂 Cargando datos para análisis predictivo...")
-        constructors = pd.read_csv(ruta + "constructors.csv")
-        constructor_standings = pd.read_csv(ruta + "constructor_standings.csv")
-        races = pd.read_csv(ruta + "races.csv")
-        drivers = pd.read_csv(ruta + "drivers.csv")
-        driver_standings = pd.read_csv(ruta + "driver_standings.csv")
-        results = pd.read_csv(ruta + "results.csv")
+        constructors = cargar_tabla("constructors")
+        drivers = cargar_tabla("drivers")
         
         print("✅ Datos cargados exitosamente")
         
         # Análisis de tendencias recientes (2019-2024)
         print("\n📈 ANALIZANDO TENDENCIAS RECIENTES (2019-2024)...")
         
-        # Filtrar datos recientes
-        races_recientes = races[(races['year'] >= 2019) & (races['year'] <= 2024)]
-        
-        # Análisis de constructores
-        constructor_standings_recientes = constructor_standings.merge(
-            races_recientes[['raceId', 'year']], on='raceId'
-        )
-        
-        # Puntos finales por constructor por año
-        puntos_constructores = constructor_standings_recientes.groupby(['year', 'constructorId']).agg({
-            'points': 'max',
-            'position': 'min',
-            'wins': 'max'
-        }).reset_index()
+        # Puntos finales por constructor por año (snapshot de la última ronda de cada temporada)
+        puntos_constructores = cargar_clasificacion_final('constructores', 2019, 2024)[
+            ['year', 'constructorId', 'points', 'position', 'wins']
+        ]
         
         puntos_constructores = puntos_constructores.merge(
             constructors[['constructorId', 'name']], on='constructorId'
         )
         
         # Análisis de pilotos
-        driver_standings_recientes = driver_standings.merge(
-            races_recientes[['raceId', 'year']], on='raceId'
-        )
-        
-        puntos_pilotos = driver_standings_recientes.groupby(['year', 'driverId']).agg({
-            'points': 'max',
-            'position': 'min',
-            'wins': 'max'
-        }).reset_index()
+        puntos_pilotos = cargar_clasificacion_final('pilotos', 2019, 2024)[
+            ['year', 'driverId', 'points', 'position', 'wins']
+        ]
         
         puntos_pilotos = puntos_pilotos.merge(
             drivers[['driverId', 'forename', 'surname', 'dob', 'nationality']], on='driverId'
@@ -85,17 +95,11 @@ def predecir_temporada_2026():
                 # Calcular tendencia
                 años_recientes = datos_constructor.sort_values('year').tail(3)
                 
-                # Tendencia de puntos (regresión simple)
-                x = np.array(range(len(años_recientes)))
-                y = años_recientes['points'].values
-                if len(x) > 1:
-                    pendiente = np.polyfit(x, y, 1)[0]
-                else:
-                    pendiente = 0
+                # Tendencia de puntos (regresión simple) y proyección a 2 años
+                tendencia_2026, pendiente = proyectar_puntos_constructor(años_recientes['points'], horizonte=2)
                 
                 # Factores de ajuste
                 puntos_2024 = años_recientes['points'].iloc[-1] if len(años_recientes) > 0 else 200
-                tendencia_2026 = puntos_2024 + (pendiente * 2)  # Proyección 2 años
                 
                 # Aplicar factores específicos por equipo
                 factor_ajuste = 1.0
@@ -164,6 +168,13 @@ def predecir_temporada_2026():
             {'nombre': 'Oliver Bearman', 'equipo': 'Haas F1 Team', 'edad': 21, 'experiencia': 'Baja'} # Rookie
         ]
         
+        # Factor por piloto a partir del rating Elo actual (rookies sin historial = 1.0)
+        ids_pilotos = ids_por_nombre([p['nombre'] for p in pilotos_2026])
+        factores_piloto = factores_elo(cargar_elo('pilotos'), ids_pilotos)
+        
+        # Duelos históricos entre compañeros para repartir los puntos del equipo
+        duelos = cargar_duelos()
+        
         # Calcular predicciones para pilotos
         predicciones_pilotos = []
         
@@ -172,36 +183,14 @@ def predecir_temporada_2026():
             factor_equipo = df_constructores[df_constructores['equipo'] == piloto['equipo']]['factor_aplicado'].iloc[0] \
                            if piloto['equipo'] in df_constructores['equipo'].values else 0.8
             
-            # Factor de edad (curva de performance)
-            if piloto['edad'] <= 25:
-                factor_edad = 1.05  # Jóvenes en ascenso
-            elif piloto['edad'] <= 32:
-                factor_edad = 1.1   # Prime años
-            elif piloto['edad'] <= 38:
-                factor_edad = 1.0   # Experiencia compensa declive
-            else:
-                factor_edad = 0.9   # Veteranos en declive
+            # Factor de edad: jóvenes en ascenso, prime años, experiencia compensa declive, veteranos
+            factor_de_edad = factor_edad(piloto['edad'])
             
             # Factor de experiencia
-            factor_experiencia = {
-                'Baja': 0.85,
-                'Media': 0.95,
-                'Alta': 1.0,
-                'Máxima': 1.05
-            }[piloto['experiencia']]
+            factor_experiencia = FACTOR_EXPERIENCIA[piloto['experiencia']]
             
-            # Factores específicos por piloto
-            factor_piloto = 1.0
-            if piloto['nombre'] == 'Max Verstappen':
-                factor_piloto = 1.2
-            elif piloto['nombre'] in ['Charles Leclerc', 'Lando Norris']:
-                factor_piloto = 1.15
-            elif piloto['nombre'] in ['Lewis Hamilton', 'George Russell']:
-                factor_piloto = 1.1
-            elif piloto['nombre'] == 'Sergio Pérez':
-                factor_piloto = 0.95  # Declive esperado
-            elif piloto['nombre'] == 'Fernando Alonso':
-                factor_piloto = 1.0   # Experiencia compensa edad
+            # Factor específico del piloto (Elo)
+            factor_piloto = factores_piloto[piloto['nombre']]
             
             # Puntos base según posición en equipo
             puntos_equipo = df_constructores[df_constructores['equipo'] == piloto['equipo']]['prediccion_puntos'].iloc[0] \
@@ -212,9 +201,14 @@ def predecir_temporada_2026():
                                                    'George Russell', 'Fernando Alonso', 'Pierre Gasly',
                                                    'Alex Albon', 'Yuki Tsunoda', 'Valtteri Bottas', 'Nico Hulkenberg']
             
-            distribucion = 0.6 if es_primer_piloto else 0.4
+            # Si ya fueron compañeros se usa el reparto de puntos observado; si no, 60/40
+            compañero = next((p['nombre'] for p in pilotos_2026
+                              if p['equipo'] == piloto['equipo'] and p['nombre'] != piloto['nombre']), None)
+            distribucion = reparto_observado(duelos, ids_pilotos[piloto['nombre']], ids_pilotos.get(compañero))
+            if distribucion is None:
+                distribucion = REPARTO_PRIMER_PILOTO if es_primer_piloto else 1 - REPARTO_PRIMER_PILOTO
             
-            puntos_predichos = puntos_equipo * distribucion * factor_edad * factor_experiencia * factor_piloto
+            puntos_predichos = puntos_equipo * distribucion * factor_de_edad * factor_experiencia * factor_piloto
             
             predicciones_pilotos.append({
                 'piloto': piloto['nombre'],
@@ -222,7 +216,9 @@ def predecir_temporada_2026():
                 'edad': piloto['edad'],
                 'experiencia': piloto['experiencia'],
                 'puntos_predichos': max(0, puntos_predichos),
-                'factor_total': factor_edad * factor_experiencia * factor_piloto
+                'factor_piloto': factor_piloto,
+                'reparto_equipo': distribucion,
+                'factor_total': factor_de_edad * factor_experiencia * factor_piloto
             })
         
         # Ordenar predicciones de pilotos
@@ -233,7 +229,24 @@ def predecir_temporada_2026():
         print("🏆 PREDICCIÓN CAMPEONATO DE PILOTOS 2026:")
         for _, row in df_pilotos.head(15).iterrows():
             print(f"{row['posicion_predicha']:2d}. {row['piloto']:<18} ({row['equipo']:<15}): "
-                  f"{row['puntos_predichos']:6.0f} pts - {row['edad']} años")
+                  f"{row['puntos_predichos']:6.0f} pts - {row['edad']} años (Elo: {row['factor_piloto']:.2f}, "
+                  f"reparto: {row['reparto_equipo']:.0%})")
+        
+        # Monte Carlo: las fuerzas salen de los puntos predichos por los factores anteriores
+        print(f"\n🎲 SIMULACIÓN MONTE CARLO 2026")
+        print("-" * 60)
+        df_pilotos['fuerza'] = fuerzas_desde_puntos(df_pilotos['puntos_predichos'])
+        simulacion = simular_temporadas(df_pilotos[['piloto', 'equipo', 'fuerza']], semilla=2026)
+        print(f"📊 {simulacion['temporadas']:,} temporadas simuladas de {N_CARRERAS} carreras")
+        
+        print("🏆 PROBABILIDADES PILOTOS (título | podio final | victoria por carrera):")
+        for _, row in simulacion['pilotos'].head(10).iterrows():
+            print(f"   • {row['piloto']:<18}: {row['prob_titulo']:6.1%} | {row['prob_podio']:6.1%} | "
+                  f"{row['prob_victoria_carrera']:5.1%} - {row['puntos_medios']:4.0f} pts medios")
+        
+        print("🏗️ PROBABILIDADES CONSTRUCTORES (título | top 3):")
+        for _, row in simulacion['constructores'].head(5).iterrows():
+            print(f"   • {row['equipo']:<18}: {row['prob_titulo']:6.1%} | {row['prob_podio']:6.1%}")
         
         # Análisis de factores clave para 2026
         print(f"\n🔍 FACTORES CLAVE PARA 2026")
@@ -274,17 +287,35 @@ def predecir_temporada_2026():
         print("📈 Comeback: Mercedes con nuevo lineup")
         print("🎭 Drama: Hamilton vs Leclerc en Ferrari")
         
-        print(f"\n📊 CONFIANZA EN PREDICCIONES")
+        # Confianza medida sobre la simulación en lugar de valores fijos
+        distribucion_pilotos = simulacion['distribucion_pilotos']
+        distribucion_constructores = simulacion['distribucion_constructores']
+        top3_constructores = df_constructores.head(3)['equipo']
+        pilotos_4_8 = df_pilotos[df_pilotos['posicion_predicha'].between(4, 8)]['piloto']
+        rookies = df_pilotos[df_pilotos['piloto'].isin(['Kimi Antonelli', 'Oliver Bearman'])]
+        
+        def prob_rango(distribucion, nombre, desde, hasta):
+            return distribucion.loc[nombre, max(desde, 1):hasta].sum()
+        
+        confianza_top3 = np.mean([prob_rango(distribucion_constructores, e, 1, 3)
+                                  for e in top3_constructores if e in distribucion_constructores.index])
+        campeon_predicho = df_pilotos.iloc[0]['piloto']
+        confianza_4_8 = np.mean([prob_rango(distribucion_pilotos, p, 4, 8) for p in pilotos_4_8])
+        confianza_rookies = np.mean([prob_rango(distribucion_pilotos, r['piloto'],
+                                                r['posicion_predicha'] - 2, r['posicion_predicha'] + 2)
+                                     for _, r in rookies.iterrows()])
+        
+        print(f"\n📊 CONFIANZA EN PREDICCIONES (Monte Carlo)")
         print("-" * 60)
-        print("• Constructores Top 3: 75% confianza")
-        print("• Campeón Pilotos: 70% confianza")
-        print("• Posiciones 4-8: 60% confianza")
-        print("• Rookies performance: 45% confianza")
-        print("• Factores técnicos: 55% confianza")
+        print(f"• Constructores Top 3: {confianza_top3:.0%} confianza")
+        print(f"• Campeón Pilotos ({campeon_predicho}): {distribucion_pilotos.loc[campeon_predicho, 1]:.0%} confianza")
+        print(f"• Posiciones 4-8: {confianza_4_8:.0%} confianza")
+        print(f"• Rookies performance (±2 posiciones): {confianza_rookies:.0%} confianza")
         
         return {
             'constructores': df_constructores,
             'pilotos': df_pilotos,
+            'simulacion': simulacion,
             'factores_clave': factores_2026
         }
         
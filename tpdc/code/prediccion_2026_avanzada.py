@@ -1,7 +1,48 @@
 import pandas as pd
 import numpy as np
-import os
 from datetime import datetime
+from cargador_datos import cargar_tabla
+from tabla_hechos import cargar_hechos
+from analisis_clasificacion import SESIONES
+
+# Factores del modelo avanzado (compartidos con el backtest en backtest_prediccion.py)
+FACTOR_CONTRATO = {
+    'confirmado': 1.1,
+    'probable': 1.0,
+    'incierto': 0.9
+}
+MOMENTUM_MINIMO, MOMENTUM_MAXIMO = 0.5, 2.0
+ADAPTACION_BASE, ADAPTACION_PENDIENTE = 0.8, 0.4
+# Curva de edad: un factor por banda (edad <= cada límite) y el último para los mayores
+LIMITES_EDAD_AVANZADO = [25, 30, 35, 40]
+FACTORES_EDAD_AVANZADO = [1.1, 1.15, 1.05, 0.95, 0.85]
+
+
+def factor_edad_avanzado(edad):
+    """
+    Curva de edad del modelo avanzado, vectorizada (escalar o array de edades)
+    """
+    edad = np.asarray(edad)
+    return np.select([edad <= limite for limite in LIMITES_EDAD_AVANZADO],
+                     FACTORES_EDAD_AVANZADO[:-1], FACTORES_EDAD_AVANZADO[-1])[()]
+
+
+def factor_adaptacion(q3_rate, race_skill):
+    """
+    Adaptabilidad a un cambio de reglamento según tasa de Q3 y habilidad en carrera (20 - posición media)
+    """
+    return ADAPTACION_BASE + ADAPTACION_PENDIENTE * (q3_rate + race_skill / 10) / 2
+
+
+def momentum_equipo(puntos_recientes, puntos_anteriores):
+    """
+    Cociente de puntos por temporada entre el período reciente y el anterior, limitado
+    a [MOMENTUM_MINIMO, MOMENTUM_MAXIMO]; 1.0 si no hay puntos en el período anterior
+    """
+    recientes = np.asarray(puntos_recientes, dtype=np.float64)
+    anteriores = np.asarray(puntos_anteriores, dtype=np.float64)
+    cociente = np.divide(recientes, anteriores, out=np.ones_like(recientes), where=anteriores > 0)
+    return np.clip(cociente, MOMENTUM_MINIMO, MOMENTUM_MAXIMO)[()]
 
 def prediccion_2026_avanzada():
     """
@@ -13,17 +54,11 @@ def prediccion_2026_avanzada():
     print("="*80)
     
     try:
-        # Rutas de archivos
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        archive_path = os.path.join(base_path, '..', 'archive')
-        
         # Cargar datos principales
         print("📁 Cargando datos históricos...")
-        races = pd.read_csv(os.path.join(archive_path, 'races.csv'))
-        results = pd.read_csv(os.path.join(archive_path, 'results.csv'))
-        drivers = pd.read_csv(os.path.join(archive_path, 'drivers.csv'))
-        constructors = pd.read_csv(os.path.join(archive_path, 'constructors.csv'))
-        qualifying = pd.read_csv(os.path.join(archive_path, 'qualifying.csv'))
+        races = cargar_tabla('races')
+        results = cargar_tabla('results')
+        qualifying = cargar_tabla('qualifying')
         
         print(f"✅ Datos cargados: {len(races)} carreras, {len(results)} resultados")
         
@@ -35,26 +70,22 @@ def prediccion_2026_avanzada():
         
         print(f"📊 Datos modernos (2018-2024): {len(races_modernas)} carreras, {len(results_modernos)} resultados")
         
-        # Combinar datos
+        # Combinar datos: la tabla de hechos ya trae carrera, piloto y constructor unidos
         print("🔗 Combinando datasets...")
-        data_completa = results_modernos.merge(races_modernas[['raceId', 'year', 'circuitId', 'name']], on='raceId')
-        data_completa = data_completa.merge(drivers[['driverId', 'forename', 'surname', 'dob']], on='driverId')
-        data_completa = data_completa.merge(constructors[['constructorId', 'name']], 
-                                          on='constructorId', suffixes=('', '_constructor'))
-        
-        # Añadir datos de clasificación
-        qualifying_stats = qualifying_moderno.groupby('driverId').agg({
-            'q1': 'count',
-            'q2': 'count', 
-            'q3': 'count'
-        }).reset_index()
-        qualifying_stats.columns = ['driverId', 'q1_participations', 'q2_participations', 'q3_participations']
+        data_completa = cargar_hechos(['raceId', 'year', 'circuitId', 'race_name', 'driverId', 'driver_name',
+                                       'dob', 'constructor_name', 'points', 'position', 'grid'])
+        data_completa = data_completa[data_completa['raceId'].isin(races_ids)].reset_index(drop=True)
         
-        data_completa = data_completa.merge(qualifying_stats, on='driverId', how='left')
-        data_completa = data_completa.fillna(0)
+        # Añadir datos de clasificación: una fila por entrada (carrera, piloto), no totales
+        # por piloto repetidos en cada fila, para que las sumas posteriores cuenten sesiones
+        entradas_qualy = qualifying_moderno[['raceId', 'driverId']].copy()
+        for sesion in SESIONES:
+            entradas_qualy[f'{sesion}_participations'] = qualifying_moderno[sesion].notna().astype('int8')
+        entradas_qualy = entradas_qualy.drop_duplicates(['raceId', 'driverId'])
         
-        # Crear nombre completo del piloto
-        data_completa['driver_name'] = data_completa['forename'] + ' ' + data_completa['surname']
+        data_completa = data_completa.merge(entradas_qualy, on=['raceId', 'driverId'], how='left')
+        columnas_qualy = ['q1_participations', 'q2_participations', 'q3_participations']
+        data_completa[columnas_qualy] = data_completa[columnas_qualy].fillna(0)
         
         print(f"✅ Dataset completo: {len(data_completa)} registros combinados")
         
@@ -75,9 +106,10 @@ def prediccion_2026_avanzada():
             data_periodo = data_completa[data_completa['year'].isin(years)].copy()
             
             if len(data_periodo) > 0:
-                stats_periodo = data_periodo.groupby('name_constructor').agg({
+                stats_periodo = data_periodo.groupby('constructor_name').agg({
                     'points': ['sum', 'mean'],
-                    'position': ['mean', 'count'],
+                    'position': 'mean',
+                    'raceId': 'count',
                     'grid': 'mean',
                     'q3_participations': 'mean'
                 }).reset_index()
@@ -114,10 +146,11 @@ def prediccion_2026_avanzada():
         # Estadísticas por piloto
         stats_pilotos = data_actual.groupby(['driverId', 'driver_name']).agg({
             'points': ['sum', 'mean'],
-            'position': ['mean', 'count'],
+            'position': 'mean',
+            'raceId': 'count',
             'grid': 'mean',
             'q3_participations': 'sum',
-            'name_constructor': lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else 'Unknown',
+            'constructor_name': lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else 'Unknown',
             'edad_2026': 'first',
             'year': 'count'
         }).reset_index()
@@ -173,15 +206,14 @@ def prediccion_2026_avanzada():
             for periodo, years in [('2020-2021', [2020, 2021]), ('2022-2024', [2022, 2023, 2024])]:
                 data_equipo = data_completa[
                     (data_completa['year'].isin(years)) & 
-                    (data_completa['name_constructor'].str.contains(equipo, na=False))
+                    (data_completa['constructor_name'].str.contains(equipo, na=False))
                 ]
                 if len(data_equipo) > 0:
                     pts_promedio = data_equipo['points'].sum() / len(data_equipo['year'].unique())
                     tendencia_reciente.append(pts_promedio)
             
             if len(tendencia_reciente) >= 2:
-                momentum = (tendencia_reciente[-1] / tendencia_reciente[0]) if tendencia_reciente[0] > 0 else 1.0
-                momentum_equipos[equipo] = min(max(momentum, 0.5), 2.0)  # Limitar entre 0.5 y 2.0
+                momentum_equipos[equipo] = momentum_equipo(tendencia_reciente[-1], tendencia_reciente[0])
             else:
                 momentum_equipos[equipo] = 1.0
         
@@ -210,34 +242,20 @@ def prediccion_2026_avanzada():
                 # Performance base
                 base_points = stats['points_per_race'] * 24  # 24 carreras esperadas en 2026
                 
-                # Factor de edad optimizado
+                # Factor de edad optimizado: pico de aprendizaje, de performance, de experiencia y declive
                 edad = stats['edad_2026']
-                if edad <= 25:
-                    age_factor = 1.1  # Pico de aprendizaje
-                elif edad <= 30:
-                    age_factor = 1.15  # Pico de performance
-                elif edad <= 35:
-                    age_factor = 1.05  # Experience peak
-                elif edad <= 40:
-                    age_factor = 0.95  # Ligero declive
-                else:
-                    age_factor = 0.85  # Declive notable
+                age_factor = factor_edad_avanzado(edad)
                 
                 # Factor de equipo con momentum
                 team = mercado_info['team']
                 team_factor = momentum_equipos.get(team, 1.0)
                 
                 # Factor de mercado (estabilidad contractual)
-                contract_factor = {
-                    'confirmado': 1.1,
-                    'probable': 1.0, 
-                    'incierto': 0.9
-                }.get(mercado_info['contract'], 1.0)
+                contract_factor = FACTOR_CONTRATO.get(mercado_info['contract'], 1.0)
                 
                 # Factor de adaptación a nueva era (2026 regulations)
                 qualifying_adaptability = stats['q3_rate']
-                race_adaptability = stats['race_skill'] / 10
-                adaptation_factor = 0.8 + 0.4 * (qualifying_adaptability + race_adaptability) / 2
+                adaptation_factor = factor_adaptacion(qualifying_adaptability, stats['race_skill'])
                 
                 # Predicción final
                 predicted_points = base_points * age_factor * team_factor * contract_factor * adaptation_factor
@@ -1,18 +1,35 @@
 import pandas as pd
 import numpy as np
-import fastf1 as ff1
 import warnings
 import os
 from datetime import datetime
+from sesiones_fastf1 import CARPETAS_SESION, cargar_sesiones, resumen_cargas
+from almacen_vueltas import cargar_almacen_vueltas, tablas_sesion
+from resumen_sesiones import CLAVES_SESION, resumir_sesiones
+from vueltas_verdes import clasificar_vueltas, ritmo_verde
+from degradacion_neumaticos import ajustar_stints, tabla_degradacion
 
-# Configurar FastF1
 warnings.filterwarnings('ignore')
-ff1.Cache.enable_cache('./fastf1_cache')
 
-def prediccion_2026_con_fastf1():
+def _mostrar_cargas(resumen, accion):
+    """
+    Tiempo o error de cada sesión cargada por sesiones_fastf1
+    """
+    for _, fila in resumen.iterrows():
+        if fila['ok']:
+            print(f"   📡 {fila['evento']} {fila['year']} {fila['sesion']}: {accion} en {fila['segundos']:.2f} s")
+        else:
+            print(f"   ⚠️  {fila['evento']} {fila['year']} {fila['sesion']} omitida "
+                  f"({fila['error_tipo']}): {fila['error_mensaje']}")
+
+def prediccion_2026_con_fastf1(offline=True, n_procesos=None):
     """
     Predicción temporada 2026 usando datos FastF1 (2018-2024)
-    con telemetría, datos climáticos y performance detallada
+    con telemetría, datos climáticos y performance detallada.
+
+    Vueltas, clima y resultados se leen del almacén compacto de almacen_vueltas (extraído
+    de fastf1_cache); con offline=False antes se descargan en paralelo las sesiones faltantes.
+    Las sesiones que no están en la cache se omiten.
     """
     print("="*100)
     print("🏎️ PREDICCIÓN F1 2026 CON FASTF1 - DATOS AVANZADOS (2018-2024)")
@@ -21,7 +38,8 @@ def prediccion_2026_con_fastf1():
     try:
         # Análisis de performance por temporada usando FastF1
         print("📡 Iniciando análisis con datos FastF1...")
-        print("⏳ Este proceso puede tardar varios minutos la primera vez...")
+        if not offline:
+            print("⏳ Este proceso puede tardar varios minutos la primera vez...")
         
         # Eventos clave para analizar (muestra representativa por año)
         eventos_muestra = [
@@ -43,25 +61,39 @@ def prediccion_2026_con_fastf1():
         # Datos de performance por piloto
         performance_data = []
         weather_data = []
+        sesiones_ok, etiquetas = [], {}
+        vueltas_muestra, estados_muestra = [], []
+        clasificadas = None
         
         print(f"\n🔄 Analizando {len(eventos_muestra)} carreras clave...")
+        if not offline:
+            # Descarga a fastf1_cache las sesiones que falten; el análisis lee siempre el almacén
+            _mostrar_cargas(resumen_cargas(cargar_sesiones(eventos_muestra, n_procesos=n_procesos, offline=False)),
+                            "descargada")
+        almacen, cargas = cargar_almacen_vueltas(('vueltas', 'clima', 'resultados', 'estado_pista'),
+                                                 n_procesos=n_procesos)
+        if cargas is not None:
+            print(f"   🗜️  Almacén de vueltas reconstruido desde fastf1_cache ({len(cargas)} sesiones):")
+            _mostrar_cargas(cargas, "extraída")
         
         for year, event, session_type in eventos_muestra:
+            year = int(year)
             try:
-                print(f"   📊 Cargando {event} {year}...")
-                
-                # Cargar sesión
-                session = ff1.get_session(year, event, session_type)
-                session.load()
+                sesion = tablas_sesion(almacen, year, event, CARPETAS_SESION[session_type].replace('_', ' '))
                 
                 # Obtener resultados
-                results = session.results
+                results = sesion['resultados']
+                laps = sesion['vueltas']
+                if len(results) == 0:
+                    print(f"   ⚠️  {event} {year} omitida: no está en el almacén de vueltas")
+                    continue
+                print(f"   📊 {event} {year}: {len(laps):,} vueltas")
                 
                 # Datos meteorológicos
-                if hasattr(session, 'weather_data') and len(session.weather_data) > 0:
-                    weather = session.weather_data.iloc[-1]  # Condiciones finales
+                if len(sesion['clima']) > 0:
+                    weather = sesion['clima'].iloc[-1]  # Condiciones finales
                     weather_data.append({
-                        'year': int(year),
+                        'year': year,
                         'event': event,
                         'air_temp': weather.get('AirTemp', 25),
                         'track_temp': weather.get('TrackTemp', 35),
@@ -69,38 +101,43 @@ def prediccion_2026_con_fastf1():
                         'rainfall': weather.get('Rainfall', False)
                     })
                 
-                # Analizar cada piloto
-                for _, result in results.iterrows():
-                    driver_code = result.get('Abbreviation', 'UNK')
-                    
-                    # Obtener vueltas del piloto
-                    driver_laps = session.laps.pick_driver(driver_code)
-                    
-                    if len(driver_laps) > 0:
-                        # Estadísticas de performance
-                        fastest_lap = driver_laps.pick_fastest()
-                        
-                        # Telemetría básica si está disponible
-                        avg_speed = driver_laps['LapTime'].mean().total_seconds() if len(driver_laps) > 0 else 0
-                        
-                        performance_data.append({
-                            'year': int(year),
-                            'event': event,
-                            'driver': result.get('FullName', 'Unknown'),
-                            'driver_code': driver_code,
-                            'team': result.get('TeamName', 'Unknown'),
-                            'position': result.get('Position', 20),
-                            'points': result.get('Points', 0),
-                            'laps_completed': len(driver_laps),
-                            'fastest_lap_time': fastest_lap['LapTime'].total_seconds() if len(driver_laps) > 0 else 0,
-                            'avg_lap_time': avg_speed,
-                            'grid_position': result.get('GridPosition', 20)
-                        })
+                sesiones_ok.append((year, laps['evento'].iloc[0], laps['sesion'].iloc[0]))
+                vueltas_muestra.append(laps)
+                estados_muestra.append(sesion['estado_pista'])
+                etiquetas[(year, laps['evento'].iloc[0])] = event
                         
             except Exception as e:
-                print(f"      ⚠️  Error en {event} {year}: {str(e)[:50]}...")
+                print(f"      ⚠️  Error procesando {event} {year} ({type(e).__name__}): {e}")
                 continue
         
+        # Resumen por piloto de todas las sesiones en un único groupby sobre las vueltas
+        if sesiones_ok:
+            resumen = resumir_sesiones(sesiones_ok, almacen)
+            resumen = resumen[resumen['FullName'].notna() & (resumen['vueltas'] > 0)]
+            
+            # Ritmo medio solo con vueltas en bandera verde (sin SC/VSC, boxes ni primera vuelta);
+            # la misma clasificación se reutiliza para la degradación de neumáticos
+            clasificadas = clasificar_vueltas(pd.concat(vueltas_muestra, ignore_index=True),
+                                              pd.concat(estados_muestra, ignore_index=True))
+            ritmo = ritmo_verde(clasificadas)
+            for col in CLAVES_SESION[1:] + ['Driver']:
+                ritmo[col] = ritmo[col].astype('string')
+            resumen = resumen.merge(ritmo[CLAVES_SESION + ['Driver', 'media_verde_ms']],
+                                    on=CLAVES_SESION + ['Driver'], how='left')
+            performance_data = pd.DataFrame({
+                'year': resumen['year'].astype(int),
+                'event': [etiquetas[(y, e)] for y, e in zip(resumen['year'], resumen['evento'])],
+                'driver': resumen['FullName'].astype(str),
+                'driver_code': resumen['Driver'].astype(str),
+                'team': resumen['TeamName'].astype(str),
+                'position': resumen['Position'].fillna(20).astype(float),
+                'points': resumen['Points'].fillna(0).astype(float),
+                'laps_completed': resumen['vueltas'],
+                'fastest_lap_time': resumen['vuelta_rapida_ms'] / 1000,
+                'avg_lap_time': resumen['media_verde_ms'] / 1000,
+                'grid_position': resumen['GridPosition'].fillna(20).astype(float)
+            })
+        
         # Crear DataFrames
         df_performance = pd.DataFrame(performance_data)
         df_weather = pd.DataFrame(weather_data)
@@ -172,6 +209,15 @@ def prediccion_2026_con_fastf1():
                 print(f"   {lluvia}{row['event']:<15}: {row['air_temp']:.1f}°C aire, "
                       f"{row['track_temp']:.1f}°C pista, {row['humidity']:.0f}% humedad")
         
+        # 4b. Degradación de neumáticos por compuesto (todos los stints en un único ajuste)
+        df_degradacion = pd.DataFrame()
+        if clasificadas is not None:
+            df_degradacion = tabla_degradacion(ajustar_stints(clasificadas))
+            print(f"\n🛞 DEGRADACIÓN DE NEUMÁTICOS (ms por vuelta, corregida por combustible):")
+            for _, row in df_degradacion.iterrows():
+                print(f"   {row['evento']:<28} {row['Compound']:<12}: {row['degradacion_ms']:+6.1f} ms/vuelta "
+                      f"({row['stints']} stints)")
+        
         # 5. PREDICCIÓN 2026 CON DATOS FASTF1
         print(f"\n🔮 PREDICCIÓN 2026 CON DATOS FASTF1")
         print("=" * 70)
@@ -281,24 +327,30 @@ def prediccion_2026_con_fastf1():
             'predicciones_ff1': df_pred_ff1,
             'performance_data': df_performance,
             'weather_data': df_weather,
+            'degradacion': df_degradacion,
             'team_trends': equipos_modernos,
             'driver_analysis': pilotos_modernos
         }
         
     except Exception as e:
         print(f"❌ Error durante análisis FastF1: {str(e)}")
-        print("💡 Nota: FastF1 requiere conexión a internet para datos recientes")
+        print("💡 Nota: en modo offline solo se usan las sesiones de fastf1_cache (--online para descargar)")
         return None
 
 if __name__ == "__main__":
+    import sys
+
+    # Por defecto solo se usa fastf1_cache; con --online se descargan las sesiones faltantes
+    offline = '--online' not in sys.argv
     print("🚀 Iniciando predicción F1 2026 con FastF1...")
-    print("⚠️  Primera ejecución puede tardar 5-10 minutos descargando datos...")
+    if not offline:
+        print("⚠️  Primera ejecución puede tardar 5-10 minutos descargando datos...")
     
-    resultados = prediccion_2026_con_fastf1()
+    resultados = prediccion_2026_con_fastf1(offline=offline)
     
     if resultados:
         print(f"\n✅ Predicción con FastF1 completada!")
         print("🎯 Predicción más precisa basada en telemetría y datos meteorológicos reales")
     else:
         print("\n❌ No se pudo completar el análisis con FastF1")
-        print("💡 Verifica conexión a internet y intenta nuevamente")
\ No newline at end of file
+        print("💡 Verifica fastf1_cache o ejecuta con --online para descargar las sesiones")
\ No newline at end of file
@@ -0,0 +1,155 @@
+import pandas as pd
+import numpy as np
+from cargador_datos import cargar_tabla
+from tabla_hechos import cargar_hechos
+
+# Sistemas de puntos históricos: puntos por posición en carrera, bonus por vuelta
+# rápida (solo si se termina dentro de 'vuelta_rapida_top') y puntos de sprint.
+# archive solo registra la vuelta rápida (rank y fastestLapTime) desde 2004: en las
+# temporadas anteriores el bonus no se puede otorgar y puntos_reescalados lo avisa.
+SISTEMAS_PUNTOS = {
+    '1950': {'carrera': [8, 6, 4, 3, 2], 'vuelta_rapida': 1, 'vuelta_rapida_top': None, 'sprint': None},
+    '1960': {'carrera': [8, 6, 4, 3, 2, 1], 'vuelta_rapida': 0, 'vuelta_rapida_top': None, 'sprint': None},
+    '1961': {'carrera': [9, 6, 4, 3, 2, 1], 'vuelta_rapida': 0, 'vuelta_rapida_top': None, 'sprint': None},
+    '1991': {'carrera': [10, 6, 4, 3, 2, 1], 'vuelta_rapida': 0, 'vuelta_rapida_top': None, 'sprint': None},
+    '2003': {'carrera': [10, 8, 6, 5, 4, 3, 2, 1], 'vuelta_rapida': 0, 'vuelta_rapida_top': None, 'sprint': None},
+    '2010': {'carrera': [25, 18, 15, 12, 10, 8, 6, 4, 2, 1], 'vuelta_rapida': 0, 'vuelta_rapida_top': None,
+             'sprint': None},
+    '2022': {'carrera': [25, 18, 15, 12, 10, 8, 6, 4, 2, 1], 'vuelta_rapida': 1, 'vuelta_rapida_top': 10,
+             'sprint': [8, 7, 6, 5, 4, 3, 2, 1]},
+    'solo_ganador': {'carrera': [1], 'vuelta_rapida': 0, 'vuelta_rapida_top': None, 'sprint': None}
+}
+
+
+def _matriz_puntos(sistemas, clave, max_pos):
+    """
+    Matriz (sistemas × posiciones+1) de puntos; la columna 0 es 'no clasificado'
+    """
+    matriz = np.zeros((len(sistemas), max_pos + 1), dtype=np.float64)
+    for i, sistema in enumerate(sistemas.values()):
+        puntos = sistema.get(clave) or []
+        matriz[i, 1:len(puntos) + 1] = puntos
+    return matriz
+
+
+def _indice_posicion(df, max_pos):
+    """
+    Índice de columna en la matriz de puntos: positionOrder si el auto fue clasificado, 0 si no
+    """
+    orden = df['positionOrder'].to_numpy(dtype=np.int64)
+    clasificado = df['position'].notna().to_numpy()
+    return np.where(clasificado & (orden <= max_pos), orden, 0)
+
+
+def puntos_reescalados(sistemas=None, hechos=None, sprints=None):
+    """
+    Puntos de cada resultado bajo cada sistema: matriz (sistemas × resultados)
+    calculada con una sola indexación sobre la tabla de puntos.
+    Devuelve (matriz, filas) donde 'filas' tiene year, raceId, driverId y constructorId de cada columna.
+    """
+    sistemas = sistemas or SISTEMAS_PUNTOS
+    if hechos is None:
+        hechos = cargar_hechos(['raceId', 'year', 'driverId', 'constructorId', 'position',
+                                'positionOrder', 'rank'])
+    if sprints is None:
+        sprints = cargar_tabla('sprint_results', ['raceId', 'driverId', 'constructorId',
+                                                  'position', 'positionOrder'])
+        sprints = sprints.merge(cargar_tabla('races', ['raceId', 'year']), on='raceId')
+
+    max_pos = max(max(len(s['carrera']), len(s.get('sprint') or [])) for s in sistemas.values())
+
+    # Carrera: lookup de puntos por posición
+    tabla_carrera = _matriz_puntos(sistemas, 'carrera', max_pos)
+    puntos_carrera = tabla_carrera[:, _indice_posicion(hechos, max_pos)]
+
+    # Vuelta rápida: bonus por sistema si rank == 1 y se termina dentro del top exigido
+    # (sin dato de rank, antes de 2004, no hay bonus)
+    bonus = np.array([s.get('vuelta_rapida', 0) for s in sistemas.values()], dtype=np.float64)
+    top = np.array([s.get('vuelta_rapida_top') or 10**6 for s in sistemas.values()])
+    vuelta_rapida = (hechos['rank'] == 1).fillna(False).to_numpy()
+    con_dato = hechos['rank'].notna().groupby(hechos['year']).any()
+    sin_dato = con_dato.index[~con_dato.to_numpy()]
+    if bonus.any() and len(sin_dato) > 0:
+        con_bonus = [nombre for nombre, b in zip(sistemas, bonus) if b]
+        print(f"⚠️  Sin datos de vuelta rápida en {len(sin_dato)} temporadas ({sin_dato.min()}-{sin_dato.max()}): "
+              f"el bonus de {', '.join(con_bonus)} no se otorga en ellas")
+    orden = hechos['positionOrder'].to_numpy()
+    puntos_carrera += bonus[:, None] * (vuelta_rapida[None, :] & (orden[None, :] <= top[:, None]))
+
+    # Sprint: otra tabla de puntos sobre sprint_results
+    tabla_sprint = _matriz_puntos(sistemas, 'sprint', max_pos)
+    puntos_sprint = tabla_sprint[:, _indice_posicion(sprints, max_pos)]
+
+    filas = pd.concat([hechos[['year', 'raceId', 'driverId', 'constructorId']],
+                       sprints[['year', 'raceId', 'driverId', 'constructorId']]], ignore_index=True)
+    return np.hstack([puntos_carrera, puntos_sprint]), filas
+
+
+def _sumar_por_grupo(matriz, claves):
+    """
+    Suma las columnas de 'matriz' por grupo con un solo np.add.reduceat.
+    Devuelve (sumas (sistemas × grupos), DataFrame de claves de cada grupo).
+    """
+    codigos = claves.groupby(list(claves.columns), sort=True).ngroup().to_numpy()
+    orden = np.argsort(codigos, kind='stable')
+    codigos_ordenados = codigos[orden]
+    inicios = np.flatnonzero(np.r_[True, codigos_ordenados[1:] != codigos_ordenados[:-1]])
+    sumas = np.add.reduceat(matriz[:, orden], inicios, axis=1)
+    return sumas, claves.iloc[orden[inicios]].reset_index(drop=True)
+
+
+def reescalar_temporadas(sistemas=None, nivel='driverId', hechos=None, sprints=None):
+    """
+    Reescala las 75 temporadas bajo todos los sistemas pedidos en una sola llamada.
+
+    Devuelve un diccionario con:
+    - 'temporadas': puntos por (year, entidad) con una columna por sistema
+    - 'carrera': puntos totales de carrera por entidad con una columna por sistema
+    - 'campeones': campeón de cada temporada bajo cada sistema
+    """
+    sistemas = sistemas or SISTEMAS_PUNTOS
+    nombres = list(sistemas)
+    matriz, filas = puntos_reescalados(sistemas, hechos, sprints)
+
+    sumas_temporada, claves_temporada = _sumar_por_grupo(matriz, filas[['year', nivel]])
+    temporadas = pd.concat([claves_temporada, pd.DataFrame(sumas_temporada.T, columns=nombres)], axis=1)
+
+    sumas_carrera, claves_carrera = _sumar_por_grupo(matriz, filas[[nivel]])
+    carrera = pd.concat([claves_carrera, pd.DataFrame(sumas_carrera.T, columns=nombres)], axis=1)
+
+    # Campeón por temporada y sistema: máximo de cada (year, sistema) en formato largo
+    largo = temporadas.melt(id_vars=['year', nivel], var_name='sistema', value_name='puntos')
+    idx = largo.groupby(['year', 'sistema'])['puntos'].idxmax()
+    campeones = largo.loc[idx].sort_values(['year', 'sistema']).reset_index(drop=True)
+
+    return {'temporadas': temporadas, 'carrera': carrera, 'campeones': campeones}
+
+
+def cambios_de_campeon(campeones, sistema_base='2010', nivel='driverId'):
+    """
+    Temporadas cuyo campeón ('nivel', el mismo usado en reescalar_temporadas) cambia
+    respecto de 'sistema_base'
+    """
+    tabla = campeones.pivot(index='year', columns='sistema', values=nivel)
+    distintos = tabla.ne(tabla[sistema_base], axis=0)
+    return tabla[distintos.any(axis=1)]
+
+
+if __name__ == "__main__":
+    import time
+
+    hechos = cargar_hechos(['raceId', 'year', 'driverId', 'constructorId', 'driver_name',
+                            'position', 'positionOrder', 'rank'])
+    inicio = time.perf_counter()
+    reescalado = reescalar_temporadas(hechos=hechos)
+    print(f"🧮 {len(SISTEMAS_PUNTOS)} sistemas de puntos aplicados a {len(hechos):,} resultados "
+          f"en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    nombres = hechos.drop_duplicates('driverId').set_index('driverId')['driver_name']
+    carrera = reescalado['carrera']
+    print("\n🏆 TOP 10 HISTÓRICO CON EL SISTEMA 2010 (25-18-15-...):")
+    for i, (_, fila) in enumerate(carrera.nlargest(10, '2010').iterrows(), 1):
+        print(f"{i:2d}. {nombres[fila['driverId']]:<22}: {fila['2010']:7.0f} pts")
+
+    cambios = cambios_de_campeon(reescalado['campeones'])
+    print(f"\n🔄 Temporadas cuyo campeón depende del sistema de puntos: {len(cambios)}")
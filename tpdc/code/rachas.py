@@ -0,0 +1,131 @@
+import pandas as pd
+import numpy as np
+from cargador_datos import cargar_tabla
+from tabla_hechos import cargar_hechos
+
+# Tipos de racha disponibles y su descripción
+TIPOS_RACHA = {
+    'puntos': 'carreras consecutivas sumando puntos',
+    'podio': 'podios consecutivos',
+    'sin_abandono': 'carreras consecutivas terminadas sin abandono',
+    'q3': 'clasificaciones consecutivas llegando a Q3'
+}
+
+
+def rachas_rle(entidad, condicion):
+    """
+    Racha actual y máxima de 'condicion' para cada entidad mediante run-length encoding.
+
+    'entidad' y 'condicion' son arrays alineados, ordenados por entidad y, dentro
+    de cada entidad, cronológicamente. Devuelve un DataFrame indexado por entidad
+    con las columnas 'actual' (racha vigente al final) y 'maxima'.
+    """
+    entidad = np.asarray(entidad)
+    condicion = np.asarray(condicion, dtype=bool)
+    n = len(entidad)
+    if n == 0:
+        return pd.DataFrame({'actual': [], 'maxima': []}, dtype=np.int32)
+
+    # Inicio de cada run: cambia la entidad o cambia el valor de la condición
+    cambio = np.empty(n, dtype=bool)
+    cambio[0] = True
+    np.not_equal(entidad[1:], entidad[:-1], out=cambio[1:])
+    cambio[1:] |= condicion[1:] != condicion[:-1]
+
+    inicios = np.flatnonzero(cambio)
+    largos = np.diff(np.append(inicios, n))
+    valor_run = condicion[inicios]
+
+    entidades, codigo = np.unique(entidad, return_inverse=True)
+    codigo_run = codigo[inicios]
+
+    # Racha máxima: el run verdadero más largo de cada entidad
+    maxima = np.zeros(len(entidades), dtype=np.int32)
+    np.maximum.at(maxima, codigo_run[valor_run], largos[valor_run])
+
+    # Racha actual: el último run de cada entidad, si es verdadero
+    ultimo_run = np.append(codigo_run[1:] != codigo_run[:-1], True)
+    actual = np.zeros(len(entidades), dtype=np.int32)
+    actual[codigo_run[ultimo_run]] = np.where(valor_run[ultimo_run], largos[ultimo_run], 0)
+
+    return pd.DataFrame({'actual': actual, 'maxima': maxima}, index=pd.Index(entidades, name='entidad'))
+
+
+def es_llegada(status):
+    """
+    Resultado terminado sin abandono: 'Finished' o clasificado a vueltas ('+1 Lap', '+2 Laps', ...)
+    """
+    status = status.astype(str)
+    return (status == 'Finished') | status.str.match(r'^\+\d+ Laps?$')
+
+
+def _eventos_carrera(hechos, nivel):
+    """
+    Condiciones por resultado (o por constructor y carrera) en orden cronológico
+    """
+    eventos = pd.DataFrame({
+        nivel: hechos[nivel].to_numpy(),
+        'orden': np.arange(len(hechos)),
+        'raceId': hechos['raceId'].to_numpy(),
+        'puntos': (hechos['points'] > 0).to_numpy(),
+        'podio': (hechos['position'] <= 3).fillna(False).to_numpy(dtype=bool),
+        'sin_abandono': es_llegada(hechos['status']).to_numpy()
+    })
+    if nivel == 'constructorId':
+        # Un constructor suma/hace podio si lo logra algún auto; termina sin abandono si terminan todos
+        eventos = eventos.groupby([nivel, 'raceId'], sort=False).agg(
+            orden=('orden', 'min'), puntos=('puntos', 'any'),
+            podio=('podio', 'any'), sin_abandono=('sin_abandono', 'all')
+        ).reset_index()
+    return eventos.sort_values([nivel, 'orden'], kind='stable')
+
+
+def _eventos_q3(nivel):
+    """
+    Llegadas a Q3 por participación en clasificación (qualifying.csv) en orden cronológico
+    """
+    qualifying = cargar_tabla('qualifying', ['raceId', 'driverId', 'constructorId', 'q3'])
+    races = cargar_tabla('races', ['raceId', 'date'])
+    eventos = qualifying.merge(races, on='raceId')
+    eventos['q3'] = eventos['q3'].notna().to_numpy()
+    if nivel == 'constructorId':
+        eventos = eventos.groupby([nivel, 'raceId', 'date'], sort=False)['q3'].any().reset_index()
+    return eventos.sort_values([nivel, 'date', 'raceId'], kind='stable')
+
+
+def calcular_rachas(nivel='driverId', hechos=None):
+    """
+    Rachas actuales y máximas de todos los pilotos (nivel='driverId') o constructores
+    (nivel='constructorId') para cada tipo de TIPOS_RACHA, en una sola tabla.
+    """
+    if hechos is None:
+        hechos = cargar_hechos(['raceId', 'driverId', 'constructorId', 'points', 'position', 'status'])
+
+    eventos = _eventos_carrera(hechos, nivel)
+    tablas = []
+    for tipo in ('puntos', 'podio', 'sin_abandono'):
+        tablas.append(rachas_rle(eventos[nivel].to_numpy(), eventos[tipo].to_numpy())
+                      .add_prefix(f'{tipo}_'))
+
+    eventos_q3 = _eventos_q3(nivel)
+    tablas.append(rachas_rle(eventos_q3[nivel].to_numpy(), eventos_q3['q3'].to_numpy()).add_prefix('q3_'))
+
+    rachas = pd.concat(tablas, axis=1).fillna(0).astype(np.int32)
+    rachas.index.name = nivel
+    return rachas.reset_index()
+
+
+if __name__ == "__main__":
+    import time
+
+    hechos = cargar_hechos(['raceId', 'driverId', 'constructorId', 'driver_name', 'points', 'position', 'status'])
+    inicio = time.perf_counter()
+    rachas_pilotos = calcular_rachas('driverId', hechos)
+    rachas_constructores = calcular_rachas('constructorId', hechos)
+    print(f"⚡ Rachas de {len(rachas_pilotos)} pilotos y {len(rachas_constructores)} constructores "
+          f"en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    nombres = hechos.drop_duplicates('driverId').set_index('driverId')['driver_name']
+    for tipo, descripcion in TIPOS_RACHA.items():
+        mejor = rachas_pilotos.nlargest(1, f'{tipo}_maxima').iloc[0]
+        print(f"   • Récord de {descripcion}: {nombres[mejor['driverId']]} ({mejor[f'{tipo}_maxima']})")
@@ -0,0 +1,190 @@
+import pandas as pd
+import numpy as np
+import unicodedata
+from cargador_datos import cargar_derivada
+from tabla_hechos import cargar_hechos, FUENTES_HECHOS
+
+# Versión del historial de ratings: incrementarla al cambiar parámetros o reglas
+VERSION_ELO = 1
+
+RATING_INICIAL = 1500.0
+K_CARRERA = 32.0          # Cambio máximo de rating por carrera (repartido entre los N-1 rivales)
+ESCALA_ELO = 400.0
+ESCALA_FACTOR = 2000.0    # +100 de Elo sobre el promedio de la grilla = factor 1.05
+
+ENTIDADES = {'pilotos': 'driverId', 'constructores': 'constructorId'}
+COLUMNAS_HECHOS = ['raceId', 'race_date', 'driverId', 'constructorId', 'positionOrder']
+
+
+def actualizar_elo(ratings, orden_llegada):
+    """
+    Cambio de rating de una carrera como comparaciones por pares en matrices N×N.
+
+    'ratings' son los ratings previos de los N participantes y 'orden_llegada' su
+    posición (menor = mejor; empates cuentan medio punto). Cada participante gana
+    contra los que terminaron detrás; el cambio es K × Σ(resultado − esperado) / (N − 1).
+    """
+    n = len(ratings)
+    if n < 2:
+        return np.zeros(n)
+    diferencia = ratings[None, :] - ratings[:, None]
+    esperado = 1.0 / (1.0 + 10.0 ** (diferencia / ESCALA_ELO))
+    resultado = (orden_llegada[:, None] < orden_llegada[None, :]) \
+        + 0.5 * (orden_llegada[:, None] == orden_llegada[None, :])
+    np.fill_diagonal(esperado, 0.0)
+    np.fill_diagonal(resultado, 0.0)
+    return K_CARRERA * (resultado - esperado).sum(axis=1) / (n - 1)
+
+
+def _participantes(hechos, nivel):
+    """
+    Una fila por (carrera, entidad) con su orden de llegada; para constructores
+    cuenta el mejor auto del equipo
+    """
+    entidad = ENTIDADES[nivel]
+    return hechos.groupby(['race_date', 'raceId', entidad], as_index=False, sort=True)['positionOrder'].min()
+
+
+def iniciar_estado(nivel='pilotos', max_id=None):
+    """
+    Estado vacío del motor: ratings indexados directamente por id y historial compacto
+    """
+    return {
+        'nivel': nivel,
+        'ratings': np.full((max_id or 0) + 1, RATING_INICIAL),
+        'carreras': np.zeros((max_id or 0) + 1, dtype=np.int32),
+        'historial': []
+    }
+
+
+def agregar_carrera(estado, race_id, entidades, orden_llegada):
+    """
+    Procesa una carrera en O(N²) sobre los N participantes y agrega sus filas al historial
+    """
+    entidades = np.asarray(entidades, dtype=np.int64)
+    if entidades.max() >= len(estado['ratings']):
+        extra = entidades.max() + 1 - len(estado['ratings'])
+        estado['ratings'] = np.concatenate([estado['ratings'], np.full(extra, RATING_INICIAL)])
+        estado['carreras'] = np.concatenate([estado['carreras'], np.zeros(extra, dtype=np.int32)])
+
+    previos = estado['ratings'][entidades]
+    nuevos = previos + actualizar_elo(previos, np.asarray(orden_llegada, dtype=np.float64))
+    estado['ratings'][entidades] = nuevos
+    estado['carreras'][entidades] += 1
+    estado['historial'].append((np.full(len(entidades), race_id, dtype=np.int32),
+                                entidades.astype(np.int32), previos.astype(np.float32),
+                                nuevos.astype(np.float32)))
+    return estado
+
+
+def historial_como_tabla(estado):
+    """
+    Historial compacto (int32/float32) como DataFrame: una fila por (raceId, entidad)
+    """
+    entidad = ENTIDADES[estado['nivel']]
+    if not estado['historial']:
+        return pd.DataFrame({'raceId': [], entidad: [], 'rating_previo': [], 'rating': []})
+    race_ids, entidades, previos, nuevos = (np.concatenate(c) for c in zip(*estado['historial']))
+    return pd.DataFrame({'raceId': race_ids, entidad: entidades, 'rating_previo': previos, 'rating': nuevos})
+
+
+def calcular_elo(nivel='pilotos', hechos=None):
+    """
+    Recorre todas las carreras en orden cronológico y devuelve el estado final
+    (ratings actuales por id e historial)
+    """
+    if hechos is None:
+        hechos = cargar_hechos(COLUMNAS_HECHOS)
+    entidad = ENTIDADES[nivel]
+    participantes = _participantes(hechos, nivel)
+    estado = iniciar_estado(nivel, int(participantes[entidad].max()))
+
+    race_ids = participantes['raceId'].to_numpy()
+    entidades = participantes[entidad].to_numpy()
+    orden = participantes['positionOrder'].to_numpy(dtype=np.float64)
+    cortes = np.flatnonzero(np.r_[True, race_ids[1:] != race_ids[:-1], True])
+    for a, b in zip(cortes[:-1], cortes[1:]):
+        agregar_carrera(estado, race_ids[a], entidades[a:b], orden[a:b])
+    return estado
+
+
+def cargar_elo(nivel='pilotos', forzar=False):
+    """
+    Historial de ratings persistido y estado reconstruido a partir de él (sin volver a
+    recorrer las carreras); el estado devuelto acepta agregar_carrera para carreras nuevas
+    """
+    historial = cargar_derivada(f"elo_{nivel}", FUENTES_HECHOS, VERSION_ELO,
+                                lambda: historial_como_tabla(calcular_elo(nivel)), forzar=forzar)
+    entidad = ENTIDADES[nivel]
+    estado = iniciar_estado(nivel, int(historial[entidad].max()))
+    ultimo = historial.drop_duplicates(entidad, keep='last')
+    estado['ratings'][ultimo[entidad].to_numpy()] = ultimo['rating'].to_numpy()
+    estado['carreras'][:] = np.bincount(historial[entidad].to_numpy(), minlength=len(estado['carreras']))
+    estado['historial'] = [tuple(historial[c].to_numpy() for c in ['raceId', entidad, 'rating_previo', 'rating'])]
+    return estado
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def _normalizar_serie(textos):
+    """
+    _normalizar vectorizado sobre una columna de texto (sin acentos y en minúsculas)
+    """
+    return textos.astype('string').str.normalize('NFKD').str.encode('ascii', 'ignore') \
+        .str.decode('ascii').str.lower()
+
+
+def ids_por_nombre(nombres, hechos=None):
+    """
+    driverId de cada nombre sin acentos: primero por nombre completo ('Nombre Apellido'
+    o 'Apellido Nombre') y, si no aparece, solo por el apellido (última palabra). El
+    nombre de pila nunca se busca como apellido. Ante coincidencias repetidas se elige
+    el piloto con la carrera más reciente; devuelve None para nombres sin carreras en
+    archive (rookies).
+    """
+    if hechos is None:
+        hechos = cargar_hechos(['driverId', 'race_date', 'driver_name'])
+    pilotos = hechos.drop_duplicates('driverId', keep='last').sort_values('race_date', ascending=False)
+    completos = _normalizar_serie(pilotos['driver_name'])
+    apellidos = _normalizar_serie(pilotos['driver_name'].astype('string').str.split(' ', n=1).str[-1])
+
+    ids = {}
+    for nombre in nombres:
+        palabras = _normalizar(nombre).split()
+        coincidencias = pilotos[completos.isin([' '.join(palabras), ' '.join(palabras[1:] + palabras[:1])])]
+        if len(coincidencias) == 0:
+            coincidencias = pilotos[apellidos == palabras[-1]]
+        ids[nombre] = int(coincidencias['driverId'].iloc[0]) if len(coincidencias) > 0 else None
+    return ids
+
+
+def factores_elo(estado, ids):
+    """
+    Factor multiplicativo de fuerza por rating: 1 + (rating − promedio de los ids
+    conocidos) / ESCALA_FACTOR. Los ids None (sin historial) quedan en 1.0.
+    """
+    conocidos = [i for i in ids.values() if i is not None]
+    promedio = estado['ratings'][conocidos].mean() if conocidos else RATING_INICIAL
+    return {clave: 1.0 if i is None else float(1 + (estado['ratings'][i] - promedio) / ESCALA_FACTOR)
+            for clave, i in ids.items()}
+
+
+if __name__ == "__main__":
+    import time
+
+    hechos = cargar_hechos(COLUMNAS_HECHOS + ['driver_name', 'constructor_name'])
+    for nivel, entidad in ENTIDADES.items():
+        inicio = time.perf_counter()
+        estado = cargar_elo(nivel, forzar=True)
+        historial = historial_como_tabla(estado)
+        print(f"📈 Elo de {nivel}: {historial['raceId'].nunique():,} carreras, {len(historial):,} filas de "
+              f"historial ({historial.memory_usage(index=False).sum() / 1024:.0f} KB) en "
+              f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+        columna_nombre = 'driver_name' if nivel == 'pilotos' else 'constructor_name'
+        nombres = hechos.drop_duplicates(entidad).set_index(entidad)[columna_nombre].astype(str)
+        pico = historial.groupby(entidad)['rating'].max().nlargest(5)
+        print(f"   🏔️ Picos históricos: " + ", ".join(f"{nombres[i]} {r:.0f}" for i, r in pico.items()))
@@ -0,0 +1,166 @@
+import pandas as pd
+import numpy as np
+from cargador_datos import cargar_tabla
+
+# Tabla de standings de archive y columna de entidad para cada nivel
+NIVELES = {
+    'pilotos': ('driver_standings', 'driverId'),
+    'constructores': ('constructor_standings', 'constructorId')
+}
+
+COLUMNAS_RESULTADOS = ['raceId', 'driverId', 'constructorId', 'position', 'points']
+
+# Posiciones contempladas en el desempate por countback (victorias, segundos, terceros, ...)
+MAX_POSICION_COUNTBACK = 40
+COLUMNAS_COUNTBACK = [f'p{i}' for i in range(1, MAX_POSICION_COUNTBACK + 1)]
+
+
+def construir_puntos_por_carrera(results, sprint_results, races, entidad):
+    """
+    Puntos y resultados de cada entidad en cada ronda: carrera + sprint.
+    Devuelve una fila por (year, round, entidad) con points y la cantidad de
+    resultados en cada posición (p1 = victorias, p2, p3, ...) para el countback.
+    """
+    carrera = results[COLUMNAS_RESULTADOS]
+    posicion = carrera['position'].fillna(0).to_numpy(dtype=np.int64)
+
+    # Conteo de posiciones en una matriz one-hot (posición 0 = no clasificado, se ignora)
+    conteos = np.zeros((len(carrera), MAX_POSICION_COUNTBACK + 1), dtype=np.int32)
+    conteos[np.arange(len(carrera)), np.minimum(posicion, MAX_POSICION_COUNTBACK)] = 1
+    carrera = pd.concat([
+        carrera[['raceId', entidad, 'points']].reset_index(drop=True),
+        pd.DataFrame(conteos[:, 1:], columns=COLUMNAS_COUNTBACK)
+    ], axis=1)
+
+    # Las sprints solo aportan puntos (no cuentan como resultados de Gran Premio)
+    sprint = sprint_results[['raceId', entidad, 'points']]
+
+    puntos = pd.concat([carrera, sprint], ignore_index=True)
+    puntos[COLUMNAS_COUNTBACK] = puntos[COLUMNAS_COUNTBACK].fillna(0).astype(np.int32)
+    puntos = puntos.groupby(['raceId', entidad], as_index=False).sum()
+    return puntos.merge(races[['raceId', 'year', 'round']], on='raceId')
+
+
+def reconstruir_clasificacion(puntos_carrera, entidad):
+    """
+    Clasificación después de cada ronda a partir de los puntos por carrera.
+
+    Cada entidad aparece desde su primera ronda de la temporada; los puntos y
+    los conteos de posiciones se acumulan con cumsum por (year, entidad). La
+    posición se ordena por puntos y, en caso de empate, por countback (más
+    victorias, luego más segundos puestos, etc.).
+    """
+    acumulables = ['points'] + COLUMNAS_COUNTBACK
+    rondas = puntos_carrera[['year', 'round', 'raceId']].drop_duplicates()
+    primera = puntos_carrera.groupby(['year', entidad], as_index=False)['round'].min() \
+        .rename(columns={'round': 'primera_ronda'})
+
+    # Grilla (ronda × entidad) de cada temporada desde la primera aparición de la entidad
+    grilla = primera.merge(rondas, on='year')
+    grilla = grilla[grilla['round'] >= grilla['primera_ronda']].drop(columns='primera_ronda')
+    grilla = grilla.merge(puntos_carrera[['raceId', entidad] + acumulables],
+                          on=['raceId', entidad], how='left')
+    grilla[acumulables] = grilla[acumulables].fillna(0)
+
+    grilla = grilla.sort_values(['year', entidad, 'round']).reset_index(drop=True)
+    grilla[acumulables] = grilla.groupby(['year', entidad])[acumulables].cumsum()
+
+    # Posición: np.lexsort ordena por la última clave primero (year, round, -puntos, -p1, -p2, ...)
+    claves = [grilla[entidad].to_numpy()]
+    claves += [-grilla[col].to_numpy() for col in reversed(COLUMNAS_COUNTBACK)]
+    claves += [-grilla['points'].to_numpy(), grilla['round'].to_numpy(), grilla['year'].to_numpy()]
+    grilla = grilla.iloc[np.lexsort(claves)].reset_index(drop=True)
+    grilla['position'] = grilla.groupby(['year', 'round']).cumcount() + 1
+    grilla['wins'] = grilla['p1'].astype(np.int32)
+
+    return grilla[['year', 'round', 'raceId', entidad, 'points', 'position', 'wins']]
+
+
+def verificar_contra_archive(reconstruida, nivel='pilotos'):
+    """
+    Compara la clasificación reconstruida con driver_standings/constructor_standings.
+    Devuelve por temporada el porcentaje de filas con puntos, posición y victorias iguales.
+    Las diferencias esperables vienen de reglas históricas no modeladas (resultados
+    descartados antes de 1991, solo el mejor auto puntuando para constructores, etc.).
+    """
+    tabla, entidad = NIVELES[nivel]
+    archive = cargar_tabla(tabla, ['raceId', entidad, 'points', 'position', 'wins'])
+    comparacion = archive.merge(reconstruida, on=['raceId', entidad], how='inner',
+                                suffixes=('_archive', '_reconstruida'))
+    comparacion['puntos_ok'] = np.isclose(comparacion['points_archive'], comparacion['points_reconstruida'])
+    comparacion['posicion_ok'] = comparacion['position_archive'] == comparacion['position_reconstruida']
+    comparacion['victorias_ok'] = comparacion['wins_archive'] == comparacion['wins_reconstruida']
+
+    por_año = comparacion.groupby('year').agg(
+        filas=('raceId', 'count'),
+        puntos_ok=('puntos_ok', 'mean'),
+        posicion_ok=('posicion_ok', 'mean'),
+        victorias_ok=('victorias_ok', 'mean')
+    )
+    return (por_año[['puntos_ok', 'posicion_ok', 'victorias_ok']] * 100).join(por_año['filas']).reset_index()
+
+
+def iniciar_reproduccion():
+    """
+    Estado inicial del motor: datos de archive y clasificación reconstruida de
+    pilotos y constructores para todas las temporadas
+    """
+    estado = {
+        'races': cargar_tabla('races', ['raceId', 'year', 'round']),
+        'results': cargar_tabla('results', COLUMNAS_RESULTADOS),
+        'sprint_results': cargar_tabla('sprint_results', ['raceId', 'driverId', 'constructorId', 'points'])
+    }
+    for nivel, (_, entidad) in NIVELES.items():
+        puntos = construir_puntos_por_carrera(estado['results'], estado['sprint_results'],
+                                              estado['races'], entidad)
+        estado[nivel] = reconstruir_clasificacion(puntos, entidad)
+    return estado
+
+
+def agregar_carrera(estado, race, resultados, sprint_resultados=None):
+    """
+    Incorpora una carrera nueva al estado y recalcula solo su temporada.
+
+    'race' es un dict con raceId, year y round; 'resultados' y 'sprint_resultados'
+    son DataFrames con las columnas de results.csv / sprint_results.csv.
+    """
+    año = race['year']
+    estado['races'] = pd.concat([estado['races'][estado['races']['raceId'] != race['raceId']],
+                                 pd.DataFrame([race])[['raceId', 'year', 'round']]], ignore_index=True)
+    estado['results'] = pd.concat([estado['results'], resultados[COLUMNAS_RESULTADOS]], ignore_index=True)
+    if sprint_resultados is not None and len(sprint_resultados) > 0:
+        estado['sprint_results'] = pd.concat(
+            [estado['sprint_results'], sprint_resultados[['raceId', 'driverId', 'constructorId', 'points']]],
+            ignore_index=True
+        )
+
+    races_año = estado['races'][estado['races']['year'] == año]
+    ids_año = races_año['raceId']
+    results_año = estado['results'][estado['results']['raceId'].isin(ids_año)]
+    sprints_año = estado['sprint_results'][estado['sprint_results']['raceId'].isin(ids_año)]
+
+    for nivel, (_, entidad) in NIVELES.items():
+        puntos = construir_puntos_por_carrera(results_año, sprints_año, races_año, entidad)
+        temporada = reconstruir_clasificacion(puntos, entidad)
+        resto = estado[nivel][estado[nivel]['year'] != año]
+        estado[nivel] = pd.concat([resto, temporada], ignore_index=True)
+
+    return estado
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    estado = iniciar_reproduccion()
+    print(f"🔁 Clasificaciones ronda a ronda reconstruidas en {(time.perf_counter() - inicio) * 1000:.0f} ms "
+          f"({len(estado['pilotos']):,} filas de pilotos, {len(estado['constructores']):,} de constructores)")
+
+    for nivel in NIVELES:
+        verificacion = verificar_contra_archive(estado[nivel], nivel)
+        modernas = verificacion[verificacion['year'] >= 1991]
+        print(f"\n✅ Verificación {nivel} vs archive:")
+        print(f"   • Todas las temporadas: puntos {verificacion['puntos_ok'].mean():.1f}% | "
+              f"posición {verificacion['posicion_ok'].mean():.1f}% | victorias {verificacion['victorias_ok'].mean():.1f}%")
+        print(f"   • Desde 1991:           puntos {modernas['puntos_ok'].mean():.1f}% | "
+              f"posición {modernas['posicion_ok'].mean():.1f}% | victorias {modernas['victorias_ok'].mean():.1f}%")
@@ -0,0 +1,98 @@
+import pandas as pd
+from almacen_vueltas import cargar_almacen_vueltas
+
+# Columnas que identifican una sesión en el almacén de vueltas
+CLAVES_SESION = ['year', 'evento', 'sesion']
+
+# Distancia mínima al auto de adelante en pista (al cruzar la línea) para considerar la vuelta en aire limpio
+UMBRAL_AIRE_LIMPIO_MS = 2_000
+
+SECTORES = ['Sector1Time_ms', 'Sector2Time_ms', 'Sector3Time_ms']
+
+
+def marcar_vueltas(vueltas):
+    """
+    Agrega a la tabla de vueltas compacta la distancia al auto de adelante en pista
+    ('gap_adelante_ms': tiempo desde el cruce de meta anterior de la sesión, sea de la
+    misma vuelta o de un auto doblado; NA para el primer cruce), si es representativa
+    ('limpia': con tiempo, precisa, sin entrar ni salir de boxes y no es la primera) y si
+    además se corrió en aire limpio ('aire_limpio')
+    """
+    vueltas = vueltas.sort_values(CLAVES_SESION + ['Time_ms']).copy()
+    cruce = vueltas['Time_ms'].astype('float64')
+    vueltas['gap_adelante_ms'] = cruce - cruce.groupby([vueltas[c] for c in CLAVES_SESION], observed=True).shift()
+
+    vueltas['limpia'] = (vueltas['LapTime_ms'].notna() & vueltas['PitInTime_ms'].isna()
+                         & vueltas['PitOutTime_ms'].isna() & vueltas['LapNumber'].gt(1).fillna(False)
+                         & vueltas['IsAccurate'].fillna(False)).astype(bool)
+    sin_auto_adelante = vueltas['gap_adelante_ms'].isna() & vueltas['Time_ms'].notna()
+    vueltas['aire_limpio'] = vueltas['limpia'] & (sin_auto_adelante | vueltas['gap_adelante_ms']
+                                                  .ge(UMBRAL_AIRE_LIMPIO_MS).fillna(False)).astype(bool)
+    return vueltas
+
+
+def resumir_vueltas(vueltas):
+    """
+    Resumen por piloto y sesión en un único groupby sobre la tabla de vueltas del
+    almacén (una o muchas sesiones): vueltas, vuelta rápida (entre sus mejores
+    personales, como pick_fastest), media y mediana, mejor tiempo de cada sector,
+    vuelta ideal y ritmo en aire limpio (mediana de las vueltas en aire limpio)
+    """
+    vueltas = marcar_vueltas(vueltas)
+    tiempo = vueltas['LapTime_ms'].astype('float64')
+    columnas = pd.DataFrame({
+        'tiempo': tiempo,
+        'rapida': tiempo.where(vueltas['IsPersonalBest'].fillna(False).astype(bool)),
+        'ritmo_limpio': tiempo.where(vueltas['limpia']),
+        'ritmo_aire_limpio': tiempo.where(vueltas['aire_limpio']),
+        **{sector: vueltas[sector].astype('float64') for sector in SECTORES}
+    })
+    claves = [vueltas[c] for c in CLAVES_SESION + ['Driver']]
+    resumen = columnas.groupby(claves, observed=True).agg(
+        vueltas=('tiempo', 'size'),
+        vuelta_rapida_ms=('rapida', 'min'),
+        media_ms=('tiempo', 'mean'),
+        mediana_ms=('tiempo', 'median'),
+        ritmo_limpio_ms=('ritmo_limpio', 'median'),
+        ritmo_aire_limpio_ms=('ritmo_aire_limpio', 'median'),
+        vueltas_aire_limpio=('ritmo_aire_limpio', 'count'),
+        mejor_s1_ms=(SECTORES[0], 'min'),
+        mejor_s2_ms=(SECTORES[1], 'min'),
+        mejor_s3_ms=(SECTORES[2], 'min')
+    )
+    resumen['vuelta_ideal_ms'] = resumen[['mejor_s1_ms', 'mejor_s2_ms', 'mejor_s3_ms']].sum(axis=1, min_count=3)
+    return resumen.reset_index()
+
+
+def resumir_sesiones(sesiones=None, almacen=None):
+    """
+    Resumen de todas las sesiones del almacén de vueltas (o solo las pedidas como
+    lista de (year, evento, sesión)) en una sola tabla, unido a sus resultados
+    """
+    if almacen is None:
+        almacen, _ = cargar_almacen_vueltas(('vueltas', 'resultados'))
+    vueltas, resultados = almacen['vueltas'], almacen['resultados']
+    if sesiones is not None:
+        elegidas = pd.DataFrame(list(sesiones), columns=CLAVES_SESION).astype({'year': 'int16'})
+        vueltas = vueltas.merge(elegidas, on=CLAVES_SESION)
+    resumen = resumir_vueltas(vueltas)
+    resultados = resultados.rename(columns={'Abbreviation': 'Driver'})
+    for tabla in (resumen, resultados):
+        for col in CLAVES_SESION[1:] + ['Driver']:
+            tabla[col] = tabla[col].astype('string')
+    return resumen.merge(resultados, on=CLAVES_SESION + ['Driver'], how='left')
+
+
+if __name__ == "__main__":
+    import time
+
+    almacen, _ = cargar_almacen_vueltas(('vueltas', 'resultados'))
+    inicio = time.perf_counter()
+    resumen = resumir_sesiones(almacen=almacen)
+    print(f"⏱️ {len(resumen):,} resúmenes piloto-sesión de {len(almacen['vueltas']):,} vueltas "
+          f"en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    for (year, evento, sesion), grupo in resumen.groupby(CLAVES_SESION):
+        print(f"\n🏁 {evento} {year} ({sesion}) — ritmo en aire limpio:")
+        for _, fila in grupo.nsmallest(5, 'ritmo_aire_limpio_ms').iterrows():
+            print(f"   • {fila['Driver']:<4}: {fila['ritmo_aire_limpio_ms'] / 1000:7.3f} s "
+                  f"({fila['vueltas_aire_limpio']} vueltas) | rápida {fila['vuelta_rapida_ms'] / 1000:7.3f} s")
@@ -0,0 +1,282 @@
+import pandas as pd
+import glob
+import logging
+import os
+import pickle
+import time
+import warnings
+from multiprocessing import Pool
+from tabla_hechos import cargar_hechos
+
+# Cache de FastF1 junto al código (no depende del directorio desde el que se ejecuta)
+RUTA_CACHE_FF1 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fastf1_cache")
+
+# Carpeta que FastF1 usa en la cache para cada identificador de sesión
+CARPETAS_SESION = {
+    'R': 'Race', 'Q': 'Qualifying', 'S': 'Sprint', 'SQ': 'Sprint_Qualifying',
+    'FP1': 'Practice_1', 'FP2': 'Practice_2', 'FP3': 'Practice_3'
+}
+
+
+def configurar_fastf1(offline=True):
+    """
+    Habilita la cache local de FastF1 y, en modo offline, prohíbe cualquier descarga:
+    solo se leen los .ff1pkl existentes
+    """
+    import fastf1 as ff1
+
+    warnings.filterwarnings('ignore')
+    logging.getLogger('fastf1').setLevel(logging.ERROR)
+    ff1.Cache.enable_cache(RUTA_CACHE_FF1)
+    ff1.Cache.offline_mode(offline)
+
+
+def carpeta_en_cache(year, evento, tipo):
+    """
+    Carpeta de la sesión dentro de la cache (p. ej. 2024/2024-05-26_Monaco_Grand_Prix/2024-05-26_Race),
+    o None si la sesión nunca se descargó. La sesión se compara entera ('Q' no es
+    Sprint_Qualifying)
+    """
+    evento = str(evento).replace(' ', '_').lower()
+    sesion = CARPETAS_SESION.get(tipo, tipo).replace(' ', '_').lower()
+    for carpeta in sorted(glob.glob(os.path.join(RUTA_CACHE_FF1, str(year), '*', '*'))):
+        gran_premio = os.path.basename(os.path.dirname(carpeta)).lower()
+        partes = os.path.basename(carpeta).split('_', 1)
+        if evento in gran_premio and len(partes) == 2 and partes[1].lower() == sesion \
+                and glob.glob(os.path.join(carpeta, '*.ff1pkl')):
+            return carpeta
+    return None
+
+
+def _error(tipo, mensaje):
+    return {'tipo': tipo, 'mensaje': mensaje}
+
+
+def _leer_ff1pkl(carpeta, nombre):
+    """
+    Contenido ('data') de un .ff1pkl de la cache, o None si no existe. Son pickles de
+    pandas y tipos básicos, así que se leen sin importar FastF1
+    """
+    ruta = os.path.join(carpeta, f"{nombre}.ff1pkl")
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, "rb") as f:
+        contenido = pickle.load(f)
+    return contenido['data'] if isinstance(contenido, dict) and 'data' in contenido else contenido
+
+
+def _pilotos_desde_cache(carpeta):
+    """
+    Pilotos de la sesión según driver_info: número, abreviatura, nombre, equipo y
+    posición final del timing en vivo ('Line')
+    """
+    pilotos = pd.DataFrame.from_dict(_leer_ff1pkl(carpeta, 'driver_info') or {}, orient='index')
+    return pd.DataFrame({
+        'DriverNumber': pilotos['RacingNumber'].astype(str),
+        'Abbreviation': pilotos['Tla'],
+        'FullName': pilotos['FullName'],
+        'TeamName': pilotos['TeamName'],
+        'Position': pd.to_numeric(pilotos['Line'], errors='coerce')
+    }).reset_index(drop=True) if len(pilotos) else pd.DataFrame(columns=['DriverNumber', 'Abbreviation'])
+
+
+def _resultados_desde_cache(pilotos, year, gran_premio):
+    """
+    Resultados de una carrera de la cache: los pilotos de driver_info completados con
+    grilla, puntos, posición y estado de archive (por año, nombre de la carrera y código)
+    """
+    hechos = cargar_hechos(['year', 'race_name', 'driver_code', 'grid', 'points', 'positionOrder', 'status'])
+    carrera = hechos[(hechos['year'] == year) & (hechos['race_name'].astype('string') == gran_premio)]
+    carrera = carrera.rename(columns={'driver_code': 'Abbreviation', 'grid': 'GridPosition', 'points': 'Points',
+                                      'positionOrder': 'Position', 'status': 'Status'})
+    carrera['Abbreviation'] = carrera['Abbreviation'].astype('string')
+    resultados = pilotos.astype({'Abbreviation': 'string'}).merge(
+        carrera[['Abbreviation', 'GridPosition', 'Points', 'Position', 'Status']], on='Abbreviation',
+        how='left', suffixes=('_vivo', ''))
+    resultados['Position'] = resultados['Position'].fillna(resultados.pop('Position_vivo'))
+    return resultados
+
+
+def _vueltas_desde_cache(carpeta, pilotos):
+    """
+    Vueltas con las columnas de session.laps armadas desde los datos crudos de la cache:
+    _extended_timing_data (vueltas y posiciones) y timing_app_data (stints y neumáticos).
+
+    Como FastF1, el stint avanza con cada salida de boxes, el compuesto es el último
+    publicado para el stint (el primero puede ser UNKNOWN), la vida del neumático es la
+    del juego al empezar el stint más las vueltas dadas con él y la posición es la
+    última publicada al cruzar la línea. 'IsAccurate' se aproxima (vuelta con tiempo y
+    los tres sectores, sin boxes y no la primera) y 'Deleted' queda en NA.
+    """
+    laps_data, stream_data = _leer_ff1pkl(carpeta, '_extended_timing_data')[:2]
+    vueltas = pd.DataFrame(laps_data).rename(columns={'Driver': 'DriverNumber', 'NumberOfLaps': 'LapNumber'})
+    vueltas['DriverNumber'] = vueltas['DriverNumber'].astype(str)
+    vueltas = vueltas.sort_values(['DriverNumber', 'LapNumber']).reset_index(drop=True)
+    vueltas['LapStartTime'] = vueltas.groupby('DriverNumber')['Time'].shift() \
+        .fillna(vueltas['Time'] - vueltas['LapTime'])
+    salida = vueltas['PitOutTime'].notna() & vueltas['LapNumber'].gt(1)
+    vueltas['Stint'] = salida.astype('int64').groupby(vueltas['DriverNumber']).cumsum() + 1
+
+    neumaticos = pd.DataFrame(_leer_ff1pkl(carpeta, 'timing_app_data'))
+    neumaticos['DriverNumber'] = neumaticos['Driver'].astype(str)
+    stints = neumaticos[neumaticos['Stint'].notna()].groupby(['DriverNumber', 'Stint']).agg(
+        Compound=('Compound', 'last'),
+        TotalLaps=('TotalLaps', 'first'),
+        New=('New', 'first')
+    ).reset_index()
+    stints['Stint'] = stints.groupby('DriverNumber')['Stint'].rank(method='dense').astype('int64')
+    vueltas = vueltas.merge(stints, on=['DriverNumber', 'Stint'], how='left')
+    vueltas['TyreLife'] = pd.to_numeric(vueltas.pop('TotalLaps'), errors='coerce') \
+        + vueltas.groupby(['DriverNumber', 'Stint']).cumcount() + 1
+    vueltas['Compound'] = vueltas['Compound'].astype('string').str.upper()
+    vueltas['FreshTyre'] = vueltas.pop('New').astype('string').str.lower().map({'true': True, 'false': False})
+
+    posiciones = pd.DataFrame(stream_data).rename(columns={'Driver': 'DriverNumber'})
+    posiciones['DriverNumber'] = posiciones['DriverNumber'].astype(str)
+    posiciones['Position'] = pd.to_numeric(posiciones['Position'], errors='coerce')
+    posiciones = posiciones.dropna(subset=['Time', 'Position']).sort_values('Time')
+    cruces = vueltas.loc[vueltas['Time'].notna(), ['Time', 'DriverNumber']].sort_values('Time').reset_index()
+    vueltas['Position'] = pd.merge_asof(cruces, posiciones[['Time', 'DriverNumber', 'Position']], on='Time',
+                                        by='DriverNumber').set_index('index')['Position']
+
+    por_numero = pilotos.set_index('DriverNumber')
+    vueltas['Driver'] = vueltas['DriverNumber'].map(por_numero['Abbreviation'])
+    vueltas['Team'] = vueltas['DriverNumber'].map(por_numero['TeamName'])
+    sectores = vueltas[['Sector1Time', 'Sector2Time', 'Sector3Time']].notna().all(axis=1)
+    vueltas['IsAccurate'] = vueltas['LapTime'].notna() & sectores & vueltas['PitInTime'].isna() \
+        & vueltas['PitOutTime'].isna() & vueltas['LapNumber'].gt(1)
+    vueltas['Deleted'] = pd.NA
+    return vueltas
+
+
+def leer_sesion_cache(carpeta, year, tipo):
+    """
+    Resultados, vueltas, clima y estado de pista de una sesión leyendo directamente sus
+    .ff1pkl, sin FastF1 ni el calendario de eventos (que la cache no tiene). Los
+    resultados de carrera se completan con grilla, puntos y estado de archive.
+    """
+    gran_premio = os.path.basename(os.path.dirname(carpeta)).split('_', 1)[1].replace('_', ' ')
+    pilotos = _pilotos_desde_cache(carpeta)
+    es_carrera = CARPETAS_SESION.get(tipo, tipo).replace(' ', '_') == 'Race'
+    clima = pd.DataFrame(_leer_ff1pkl(carpeta, 'weather_data') or {})
+    for col in clima.columns.difference(['Time', 'Rainfall']):
+        clima[col] = pd.to_numeric(clima[col], errors='coerce')
+    if 'Rainfall' in clima:
+        clima['Rainfall'] = clima['Rainfall'].astype('string').str.lower().isin(['true', '1'])
+    return {
+        'resultados': _resultados_desde_cache(pilotos, int(year), gran_premio) if es_carrera else pilotos,
+        'vueltas': _vueltas_desde_cache(carpeta, pilotos),
+        'clima': clima,
+        'estado_pista': pd.DataFrame(_leer_ff1pkl(carpeta, 'track_status_data') or {})
+    }
+
+
+def cargar_sesion(tarea, offline=True):
+    """
+    Carga una sesión (year, evento, tipo) y devuelve un diccionario con su estado,
+    el tiempo de carga y, si salió bien, resultados, vueltas, clima y estado de pista
+    como DataFrames planos (sin referencias a la sesión, para poder devolverlos desde
+    otro proceso).
+
+    En modo offline la sesión se lee directamente de sus .ff1pkl (leer_sesion_cache);
+    solo el modo online pasa por FastF1. Los errores no se propagan: quedan en 'error'
+    como {'tipo', 'mensaje'}.
+    """
+    year, evento, tipo = tarea
+    carga = {'year': int(year), 'evento': evento, 'sesion': tipo, 'ok': False,
+             'segundos': 0.0, 'error': None, 'resultados': None, 'vueltas': None, 'clima': None,
+             'estado_pista': None}
+    carpeta = carpeta_en_cache(year, evento, tipo) if offline else None
+    if offline and carpeta is None:
+        carga['error'] = _error('SinCache', f"{evento} {year} {tipo} no está en {RUTA_CACHE_FF1}")
+        return carga
+
+    inicio = time.perf_counter()
+    try:
+        if offline:
+            carga.update(leer_sesion_cache(carpeta, year, tipo))
+        else:
+            import fastf1 as ff1
+
+            session = ff1.get_session(int(year), evento, tipo)
+            session.load(laps=True, telemetry=False, weather=True, messages=True)
+            carga['resultados'] = pd.DataFrame(session.results)
+            carga['vueltas'] = pd.DataFrame(session.laps)
+            carga['clima'] = pd.DataFrame(session.weather_data) if session.weather_data is not None \
+                else pd.DataFrame()
+            carga['estado_pista'] = pd.DataFrame(session.track_status) if session.track_status is not None \
+                else pd.DataFrame()
+        carga['ok'] = True
+    except Exception as e:
+        carga['error'] = _error(type(e).__name__, str(e))
+    carga['segundos'] = time.perf_counter() - inicio
+    return carga
+
+
+def _iniciar_trabajador(offline):
+    if not offline:
+        configurar_fastf1(offline)
+
+
+def _cargar_en_trabajador(argumentos):
+    indice, tarea, offline = argumentos
+    return indice, cargar_sesion(tarea, offline)
+
+
+def cargar_sesiones(eventos, n_procesos=None, offline=True):
+    """
+    Carga varias sesiones (lista de (year, evento, tipo)), una por tarea en un Pool.
+    Devuelve las cargas en el mismo orden que 'eventos'; las fallidas tienen ok=False
+    y el error estructurado, y las que no están en la cache se descartan sin lanzar
+    ningún proceso cuando offline=True (modo en el que FastF1 no se importa).
+    """
+    eventos = list(eventos)
+    cargas = [None] * len(eventos)
+    pendientes = []
+    for indice, tarea in enumerate(eventos):
+        if offline and carpeta_en_cache(*tarea) is None:
+            cargas[indice] = cargar_sesion(tarea, offline)
+        else:
+            pendientes.append((indice, tarea, offline))
+
+    n_procesos = os.cpu_count() if n_procesos is None else n_procesos
+    if n_procesos <= 1 or len(pendientes) <= 1:
+        if not offline:
+            configurar_fastf1(offline)
+        for indice, tarea, _ in pendientes:
+            cargas[indice] = cargar_sesion(tarea, offline)
+    elif pendientes:
+        with Pool(min(n_procesos, len(pendientes)), initializer=_iniciar_trabajador,
+                  initargs=(offline,)) as pool:
+            for indice, carga in pool.imap_unordered(_cargar_en_trabajador, pendientes):
+                cargas[indice] = carga
+    return cargas
+
+
+def resumen_cargas(cargas):
+    """
+    Tabla de tiempos y errores por sesión (sin los DataFrames cargados)
+    """
+    return pd.DataFrame([{
+        'year': c['year'],
+        'evento': c['evento'],
+        'sesion': c['sesion'],
+        'ok': c['ok'],
+        'segundos': c['segundos'],
+        'error_tipo': c['error']['tipo'] if c['error'] else None,
+        'error_mensaje': c['error']['mensaje'] if c['error'] else None
+    } for c in cargas])
+
+
+if __name__ == "__main__":
+    import sys
+
+    eventos = [('2024', 'Monaco', 'R'), ('2024', 'Azerbaijan', 'R'), ('2023', 'Monaco', 'R')]
+    offline = '--online' not in sys.argv
+    inicio = time.perf_counter()
+    cargas = cargar_sesiones(eventos, offline=offline)
+    print(f"📡 {len(eventos)} sesiones procesadas en {time.perf_counter() - inicio:.2f} s "
+          f"({'offline' if offline else 'online'})")
+    for _, fila in resumen_cargas(cargas).iterrows():
+        estado = f"✅ {fila['segundos']:5.2f} s" if fila['ok'] else f"⚠️  {fila['error_tipo']}: {fila['error_mensaje']}"
+        print(f"   • {fila['evento']} {fila['year']} {fila['sesion']}: {estado}")
@@ -0,0 +1,248 @@
+import pandas as pd
+import numpy as np
+import os
+from multiprocessing import Pool, shared_memory
+from puntuacion_alternativa import SISTEMAS_PUNTOS
+
+# Calendario y reglamento de puntos de la temporada a simular
+N_CARRERAS = 24
+PUNTOS_CARRERA = SISTEMAS_PUNTOS['2010']['carrera']
+
+# Temporadas simuladas por lote: acota la memoria a lote × carreras × pilotos float32
+TAMAÑO_LOTE = 10_000
+
+
+def fuerzas_desde_puntos(puntos, temperatura=1.0, minimo=1.0):
+    """
+    Convierte puntos predichos en fuerzas de Plackett-Luce (probabilidad de ganar
+    proporcional a la fuerza). 'temperatura' > 1 aplana las diferencias y < 1 las acentúa;
+    'minimo' evita fuerzas nulas para pilotos sin puntos predichos.
+    """
+    puntos = np.maximum(np.asarray(puntos, dtype=np.float64), minimo)
+    return (puntos / puntos.max()) ** (1.0 / temperatura)
+
+
+def _posiciones_finales(totales, victorias):
+    """
+    Posición final (0 = campeón) de cada columna en cada temporada: más puntos y,
+    en caso de empate, más victorias (victorias <= carreras < 100 y los puntos son enteros)
+    """
+    clave = totales + victorias / 100.0
+    clasificacion = np.argsort(-clave, axis=1)
+    posiciones = np.empty_like(clasificacion)
+    np.put_along_axis(posiciones, clasificacion,
+                      np.broadcast_to(np.arange(totales.shape[1]), totales.shape), axis=1)
+    return posiciones
+
+
+def _histograma(posiciones):
+    """
+    Conteos (entidad × posición final) acumulados sobre todas las temporadas del lote
+    """
+    n = posiciones.shape[1]
+    indice = np.arange(n) * n + posiciones
+    return np.bincount(indice.ravel(), minlength=n * n).reshape(n, n)
+
+
+def simular_lote(log_fuerzas, tabla_puntos, equipo_de_piloto, n_equipos, n_temporadas, n_carreras, rng):
+    """
+    Simula un lote de temporadas completas como arrays (temporadas × carreras × pilotos).
+
+    El orden de llegada de cada carrera se muestrea de un modelo de Plackett-Luce con el
+    truco de Gumbel: ordenar log(fuerza) + ruido Gumbel equivale a sacar pilotos sin
+    reposición con probabilidad proporcional a su fuerza. Devuelve los conteos del lote.
+    """
+    n_pilotos = len(log_fuerzas)
+    uniforme = rng.random((n_temporadas, n_carreras, n_pilotos), dtype=np.float32)
+    uniforme = np.maximum(uniforme, np.finfo(np.float32).tiny)  # random() puede devolver 0
+    utilidad = log_fuerzas - np.log(-np.log(uniforme))
+
+    # Piloto en cada posición de llegada y puntos por lookup en la tabla del reglamento
+    orden = np.argsort(-utilidad, axis=-1)
+    puntos = np.empty_like(utilidad)
+    np.put_along_axis(puntos, orden, np.broadcast_to(tabla_puntos, orden.shape), axis=-1)
+
+    totales = puntos.sum(axis=1)
+    victorias = np.zeros((n_temporadas, n_pilotos), dtype=np.float32)
+    np.add.at(victorias, (np.arange(n_temporadas)[:, None], orden[:, :, 0]), 1)
+
+    # Constructores: suma de sus pilotos con una matriz piloto → equipo
+    pertenencia = np.zeros((n_pilotos, n_equipos), dtype=np.float32)
+    pertenencia[np.arange(n_pilotos), equipo_de_piloto] = 1
+    totales_equipo = totales @ pertenencia
+    victorias_equipo = victorias @ pertenencia
+
+    return {
+        'posiciones_pilotos': _histograma(_posiciones_finales(totales, victorias)),
+        'posiciones_equipos': _histograma(_posiciones_finales(totales_equipo, victorias_equipo)),
+        'puntos_pilotos': totales.sum(axis=0, dtype=np.float64),
+        'puntos_equipos': totales_equipo.sum(axis=0, dtype=np.float64),
+        'victorias_carrera': victorias.sum(axis=0, dtype=np.float64)
+    }
+
+
+def resumir_simulacion(conteos, pilotos, equipos, n_temporadas, n_carreras):
+    """
+    Convierte los conteos acumulados en distribuciones de probabilidad por piloto y equipo
+    """
+    def tabla(nombre, entidades, histograma, puntos, extra=None):
+        probabilidades = histograma / n_temporadas
+        posiciones = np.arange(1, histograma.shape[1] + 1)
+        resumen = pd.DataFrame({
+            nombre: entidades,
+            'puntos_medios': puntos / n_temporadas,
+            'posicion_media': probabilidades @ posiciones,
+            'prob_titulo': probabilidades[:, 0],
+            'prob_podio': probabilidades[:, :3].sum(axis=1),
+            'prob_top5': probabilidades[:, :5].sum(axis=1)
+        })
+        if extra is not None:
+            resumen = pd.concat([resumen, extra], axis=1)
+        distribucion = pd.DataFrame(probabilidades, index=entidades, columns=posiciones)
+        return resumen.sort_values('posicion_media').reset_index(drop=True), distribucion
+
+    pilotos_resumen, pilotos_distribucion = tabla(
+        'piloto', pilotos['piloto'].to_numpy(), conteos['posiciones_pilotos'], conteos['puntos_pilotos'],
+        pd.DataFrame({'equipo': pilotos['equipo'].to_numpy(),
+                      'prob_victoria_carrera': conteos['victorias_carrera'] / (n_temporadas * n_carreras)})
+    )
+    equipos_resumen, equipos_distribucion = tabla(
+        'equipo', np.asarray(equipos), conteos['posiciones_equipos'], conteos['puntos_equipos']
+    )
+    return {
+        'pilotos': pilotos_resumen,
+        'constructores': equipos_resumen,
+        'distribucion_pilotos': pilotos_distribucion,
+        'distribucion_constructores': equipos_distribucion,
+        'temporadas': n_temporadas
+    }
+
+
+def preparar_simulacion(pilotos, puntos=None):
+    """
+    Arrays de entrada del simulador a partir de un DataFrame con columnas
+    piloto, equipo y fuerza
+    """
+    puntos = PUNTOS_CARRERA if puntos is None else puntos
+    n_pilotos = len(pilotos)
+    tabla_puntos = np.zeros(n_pilotos, dtype=np.float32)
+    tabla_puntos[:min(len(puntos), n_pilotos)] = puntos[:n_pilotos]
+    equipo_de_piloto, equipos = pd.factorize(pilotos['equipo'])
+    log_fuerzas = np.log(pilotos['fuerza'].to_numpy(dtype=np.float64)).astype(np.float32)
+    return log_fuerzas, tabla_puntos, equipo_de_piloto, list(equipos)
+
+
+def _lotes_con_semilla(n_temporadas, tamaño_lote, semilla):
+    """
+    Divide la simulación en lotes fijos, cada uno con su propia SeedSequence hija.
+    La división no depende de la cantidad de procesos, así que el resultado es
+    reproducible con cualquier número de workers.
+    """
+    n_lotes = -(-n_temporadas // tamaño_lote)
+    hijas = np.random.SeedSequence(semilla).spawn(n_lotes)
+    return [(hija, min(tamaño_lote, n_temporadas - i * tamaño_lote)) for i, hija in enumerate(hijas)]
+
+
+def _sumar_conteos(conteos, lote):
+    return lote if conteos is None else {k: conteos[k] + v for k, v in lote.items()}
+
+
+# Arrays de entrada vistos por cada worker (adjuntados a memoria compartida en el initializer)
+_COMPARTIDO = {}
+
+
+def _compartir_arrays(arrays):
+    """
+    Copia cada array a un bloque de multiprocessing.shared_memory.
+    Devuelve los bloques (para liberarlos al terminar) y sus descriptores (nombre, forma, dtype).
+    """
+    bloques, descriptores = [], {}
+    for clave, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        bloque = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=bloque.buf)[...] = array
+        bloques.append(bloque)
+        descriptores[clave] = (bloque.name, array.shape, array.dtype.str)
+    return bloques, descriptores
+
+
+def _iniciar_trabajador(descriptores):
+    for clave, (nombre, forma, tipo) in descriptores.items():
+        bloque = shared_memory.SharedMemory(name=nombre)
+        _COMPARTIDO[clave] = (bloque, np.ndarray(forma, dtype=tipo, buffer=bloque.buf))
+
+
+def _simular_lote_compartido(tarea):
+    semilla, n_temporadas, n_carreras, n_equipos = tarea
+    arrays = {clave: array for clave, (_, array) in _COMPARTIDO.items()}
+    return simular_lote(arrays['log_fuerzas'], arrays['tabla_puntos'], arrays['equipo_de_piloto'],
+                        n_equipos, n_temporadas, n_carreras, np.random.default_rng(semilla))
+
+
+def simular_temporadas(pilotos, n_temporadas=100_000, n_carreras=N_CARRERAS, puntos=None,
+                       semilla=None, tamaño_lote=TAMAÑO_LOTE, n_procesos=1):
+    """
+    Monte Carlo de temporadas completas.
+
+    'pilotos' es un DataFrame con columnas piloto, equipo y fuerza (ver fuerzas_desde_puntos).
+    Devuelve probabilidades de título, podio y top 5, posición y puntos medios de pilotos
+    y constructores, y la distribución completa de posiciones finales.
+
+    Con n_procesos > 1 (o None = todos los núcleos) los lotes se reparten en un Pool:
+    las fuerzas y tablas se comparten por memoria compartida y cada worker devuelve solo
+    histogramas de conteos, que se suman. Con la misma 'semilla' el resultado es idéntico
+    para cualquier n_procesos.
+    """
+    log_fuerzas, tabla_puntos, equipo_de_piloto, equipos = preparar_simulacion(pilotos, puntos)
+    lotes = _lotes_con_semilla(n_temporadas, tamaño_lote, semilla)
+    n_procesos = os.cpu_count() if n_procesos is None else n_procesos
+
+    conteos = None
+    if n_procesos <= 1 or len(lotes) == 1:
+        for hija, n in lotes:
+            conteos = _sumar_conteos(conteos, simular_lote(log_fuerzas, tabla_puntos, equipo_de_piloto,
+                                                           len(equipos), n, n_carreras,
+                                                           np.random.default_rng(hija)))
+    else:
+        bloques, descriptores = _compartir_arrays({
+            'log_fuerzas': log_fuerzas,
+            'tabla_puntos': tabla_puntos,
+            'equipo_de_piloto': equipo_de_piloto
+        })
+        try:
+            tareas = [(hija, n, n_carreras, len(equipos)) for hija, n in lotes]
+            with Pool(min(n_procesos, len(lotes)), initializer=_iniciar_trabajador,
+                      initargs=(descriptores,)) as pool:
+                for lote in pool.imap_unordered(_simular_lote_compartido, tareas):
+                    conteos = _sumar_conteos(conteos, lote)
+        finally:
+            for bloque in bloques:
+                bloque.close()
+                bloque.unlink()
+
+    return resumir_simulacion(conteos, pilotos, equipos, n_temporadas, n_carreras)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    pilotos = pd.DataFrame({
+        'piloto': ['A', 'B', 'C', 'D', 'E', 'F'],
+        'equipo': ['X', 'X', 'Y', 'Y', 'Z', 'Z'],
+        'fuerza': fuerzas_desde_puntos([400, 300, 250, 200, 100, 50])
+    })
+    n_temporadas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    referencia = None
+    for n_procesos in sorted({1, os.cpu_count()}):
+        inicio = time.perf_counter()
+        simulacion = simular_temporadas(pilotos, n_temporadas, semilla=2026, n_procesos=n_procesos)
+        print(f"🎲 {n_temporadas:,} temporadas de {N_CARRERAS} carreras con {n_procesos} proceso(s): "
+              f"{time.perf_counter() - inicio:.2f} s")
+        if referencia is None:
+            referencia = simulacion
+        else:
+            iguales = referencia['distribucion_pilotos'].equals(simulacion['distribucion_pilotos'])
+            print(f"   • Resultado idéntico al de 1 proceso: {'✅' if iguales else '❌'}")
+    print(simulacion['pilotos'].round(3).to_string(index=False))
@@ -0,0 +1,64 @@
+from cargador_datos import cargar_tabla, cargar_derivada
+
+# Versión del build de la tabla de hechos: incrementarla al cambiar columnas o joins
+VERSION_HECHOS = 1
+
+# Tablas de archive de las que depende la tabla de hechos
+FUENTES_HECHOS = ["results", "races", "drivers", "constructors", "circuits", "status"]
+
+
+def construir_tabla_hechos():
+    """
+    Arma la tabla de hechos de resultados: una fila por resultado (results.csv)
+    con todos los atributos de carrera, piloto, constructor, circuito y estado.
+
+    Las columnas de dimensión con nombres repetidos se prefijan
+    (race_name, circuit_name, constructor_name, driver_nationality, ...).
+    """
+    results = cargar_tabla("results")
+    races = cargar_tabla("races", ["raceId", "year", "round", "circuitId", "name", "date"])
+    drivers = cargar_tabla("drivers", ["driverId", "driverRef", "code", "forename", "surname",
+                                       "dob", "nationality"])
+    constructors = cargar_tabla("constructors", ["constructorId", "constructorRef", "name", "nationality"])
+    circuits = cargar_tabla("circuits", ["circuitId", "circuitRef", "name", "location", "country"])
+    status = cargar_tabla("status")
+
+    races = races.rename(columns={"name": "race_name", "date": "race_date"})
+    drivers = drivers.rename(columns={"code": "driver_code", "nationality": "driver_nationality"})
+    constructors = constructors.rename(columns={"name": "constructor_name",
+                                                "nationality": "constructor_nationality"})
+    circuits = circuits.rename(columns={"name": "circuit_name"})
+
+    hechos = results.merge(races, on="raceId", how="left")
+    hechos = hechos.merge(drivers, on="driverId", how="left")
+    hechos = hechos.merge(constructors, on="constructorId", how="left")
+    hechos = hechos.merge(circuits, on="circuitId", how="left")
+    hechos = hechos.merge(status, on="statusId", how="left")
+
+    hechos["driver_name"] = hechos["forename"] + " " + hechos["surname"]
+
+    # Orden cronológico estable: todas las consultas por piloto/temporada lo aprovechan
+    hechos = hechos.sort_values(["race_date", "raceId", "positionOrder"]).reset_index(drop=True)
+    return hechos
+
+
+def cargar_hechos(columnas=None, forzar=False):
+    """
+    Devuelve la tabla de hechos materializada, leyendo solo las columnas pedidas.
+    Se reconstruye automáticamente si cambia VERSION_HECHOS o alguna tabla fuente.
+    """
+    return cargar_derivada("hechos_resultados", FUENTES_HECHOS, VERSION_HECHOS,
+                           construir_tabla_hechos, columnas=columnas, forzar=forzar)
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    hechos = cargar_hechos(forzar=True)
+    print(f"🧱 Tabla de hechos construida: {len(hechos):,} filas × {hechos.shape[1]} columnas "
+          f"({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+
+    inicio = time.perf_counter()
+    cargar_hechos(["driverId", "year", "points"])
+    print(f"⚡ Lectura de 3 columnas desde la cache: {(time.perf_counter() - inicio) * 1000:.1f} ms")
@@ -1,6 +1,7 @@
 import pandas as pd
-import os
-from datetime import datetime
+from cargador_datos import cargar_tabla
+from tabla_hechos import cargar_hechos
+from margenes_carrera import calcular_margenes, edad_en_fecha
 
 def analizar_carreras_2024():
     """
@@ -10,10 +11,6 @@ def analizar_carreras_2024():
     - Diferencia de tiempos entre piloto 1 y 2
     """
     
-    # Obtener la ruta a los archivos
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    ruta = os.path.join(script_dir, "..", "archive") + os.sep
-    
     print("="*90)
     print("🏎️ ANÁLISIS DE CARRERAS F1 - TEMPORADA 2024")
     print("="*90)
@@ -21,9 +18,9 @@ def analizar_carreras_2024():
     try:
         # Cargar los datos necesarios
         print("📂 Cargando datos...")
-        drivers = pd.read_csv(ruta + "drivers.csv")
-        results = pd.read_csv(ruta + "results.csv")
-        races = pd.read_csv(ruta + "races.csv")
+        drivers = cargar_tabla("drivers")
+        results = cargar_tabla("results")
+        races = cargar_tabla("races")
         
         print(f"✅ Datos cargados exitosamente!")
         print(f"   • Pilotos: {len(drivers)} registros")
@@ -42,30 +39,17 @@ def analizar_carreras_2024():
         print("❌ No se encontraron carreras del 2024")
         return None
     
-    # Obtener resultados de 2024
-    race_ids_2024 = carreras_2024['raceId'].tolist()
-    resultados_2024 = results[results['raceId'].isin(race_ids_2024)].copy()
-    
-    # Unir datos
-    datos_completos = resultados_2024.merge(carreras_2024[['raceId', 'name', 'date']], on='raceId')
-    datos_completos = datos_completos.merge(drivers[['driverId', 'driverRef', 'forename', 'surname', 'dob', 'nationality']], on='driverId')
+    # Obtener resultados de 2024 desde la tabla de hechos (carrera y piloto ya unidos)
+    hechos = cargar_hechos(['raceId', 'year', 'race_name', 'race_date', 'driverId', 'driverRef',
+                            'forename', 'surname', 'dob', 'driver_nationality', 'driver_name',
+                            'position', 'points', 'milliseconds'])
+    datos_completos = hechos[hechos['year'] == 2024].rename(columns={
+        'race_name': 'name', 'race_date': 'date', 'driver_nationality': 'nationality',
+        'driver_name': 'nombre_completo'
+    }).reset_index(drop=True)
     
     # Calcular edad de los pilotos al momento de cada carrera
-    def calcular_edad(fecha_nacimiento, fecha_carrera):
-        try:
-            nac = datetime.strptime(fecha_nacimiento, '%Y-%m-%d')
-            carr = datetime.strptime(fecha_carrera, '%Y-%m-%d')
-            edad = carr.year - nac.year - ((carr.month, carr.day) < (nac.month, nac.day))
-            return edad
-        except:
-            return None
-    
-    datos_completos['edad_en_carrera'] = datos_completos.apply(
-        lambda row: calcular_edad(row['dob'], row['date']), axis=1
-    )
-    
-    # Crear nombre completo del piloto
-    datos_completos['nombre_completo'] = datos_completos['forename'] + ' ' + datos_completos['surname']
+    datos_completos['edad_en_carrera'] = edad_en_fecha(datos_completos['dob'], datos_completos['date'])
     
     print(f"📊 Resultados procesados: {len(datos_completos)}")
     
@@ -81,7 +65,7 @@ def analizar_carreras_2024():
         'points': 'sum'
     }).reset_index()
     edad_stats.columns = ['Piloto', 'Edad', 'Nacionalidad', 'Carreras', 'Puntos_Total']
-    edad_stats = edad_stats.sort_values('Edad')
+    edad_stats = edad_stats.sort_values(['Edad', 'Piloto'])  # Desempate estable por nombre
     
     print("🔢 Estadísticas generales de edad:")
     print(f"   • Piloto más joven: {edad_stats.iloc[0]['Piloto']} ({edad_stats.iloc[0]['Edad']} años)")
@@ -102,7 +86,7 @@ def analizar_carreras_2024():
     print(f"\n🌍 ANÁLISIS POR NACIONALIDAD EN 2024:")
     print("-" * 60)
     
-    por_pais = edad_stats.groupby('Nacionalidad').agg({
+    por_pais = edad_stats.groupby('Nacionalidad', observed=True).agg({
         'Carreras': 'sum',
         'Puntos_Total': 'sum',
         'Piloto': 'count',
@@ -120,56 +104,12 @@ def analizar_carreras_2024():
     print(f"\n⏱️ ANÁLISIS DE DIFERENCIAS DE TIEMPO 2024:")
     print("-" * 60)
     
-    # Analizar diferencias de tiempo por carrera (posición 1 vs posición 2)
-    diferencias_tiempo = []
-    
-    for race_id in carreras_2024['raceId']:
-        resultados_carrera = datos_completos[datos_completos['raceId'] == race_id].copy()
-        
-        # Obtener información de la carrera
-        info_carrera = carreras_2024[carreras_2024['raceId'] == race_id].iloc[0]
-        
-        # Filtrar solo posiciones válidas y ordenar
-        resultados_validos = resultados_carrera[
-            (resultados_carrera['position'] != '\\N') & 
-            (resultados_carrera['position'].notna())
-        ].copy()
-        
-        if len(resultados_validos) >= 2:
-            # Convertir posición a int y ordenar
-            resultados_validos['pos_int'] = resultados_validos['position'].astype(int)
-            resultados_validos = resultados_validos.sort_values('pos_int')
-            
-            # Obtener primero y segundo lugar
-            primero = resultados_validos.iloc[0]
-            segundo = resultados_validos.iloc[1]
-            
-            # Calcular diferencia de tiempo si está disponible
-            tiempo_diff = None
-            if 'milliseconds' in resultados_validos.columns:
-                if (primero['milliseconds'] != '\\N' and segundo['milliseconds'] != '\\N' and 
-                    pd.notna(primero['milliseconds']) and pd.notna(segundo['milliseconds'])):
-                    try:
-                        tiempo_primero = float(primero['milliseconds'])
-                        tiempo_segundo = float(segundo['milliseconds'])
-                        tiempo_diff = (tiempo_segundo - tiempo_primero) / 1000  # Convertir a segundos
-                    except:
-                        tiempo_diff = None
-            
-            diferencias_tiempo.append({
-                'carrera': info_carrera['name'],
-                'fecha': info_carrera['date'],
-                'piloto_1': primero['nombre_completo'],
-                'edad_1': primero['edad_en_carrera'],
-                'pais_1': primero['nationality'],
-                'piloto_2': segundo['nombre_completo'],
-                'edad_2': segundo['edad_en_carrera'],
-                'pais_2': segundo['nationality'],
-                'diferencia_tiempo': tiempo_diff,
-                'diferencia_edad': abs(primero['edad_en_carrera'] - segundo['edad_en_carrera']) if (primero['edad_en_carrera'] and segundo['edad_en_carrera']) else None
-            })
-    
-    df_diferencias = pd.DataFrame(diferencias_tiempo)
+    # Diferencias de tiempo 1º vs 2º de todas las carreras en una pasada vectorizada
+    margenes = calcular_margenes()
+    df_diferencias = margenes[margenes['year'] == 2024].rename(columns={
+        'race_name': 'carrera', 'diferencia_p2': 'diferencia_tiempo'
+    })
+    df_diferencias['fecha'] = df_diferencias['race_date'].dt.date
     
     print(f"🏁 ANÁLISIS DE GANADORES Y SEGUNDOS LUGARES:")
     print(f"   • Total de carreras analizadas: {len(df_diferencias)}")
@@ -194,9 +134,9 @@ def analizar_carreras_2024():
             print(f"\n{i:2d}. {carrera['carrera']} ({carrera['fecha']})")
             print(f"    🥇 1º: {carrera['piloto_1']:<20} ({carrera['edad_1']} años, {carrera['pais_1']})")
             print(f"    🥈 2º: {carrera['piloto_2']:<20} ({carrera['edad_2']} años, {carrera['pais_2']})")
-            if carrera['diferencia_tiempo']:
+            if pd.notna(carrera['diferencia_tiempo']):
                 print(f"    ⏱️ Diferencia: {carrera['diferencia_tiempo']:.3f} segundos")
-            if carrera['diferencia_edad']:
+            if pd.notna(carrera['diferencia_edad']) and carrera['diferencia_edad']:
                 print(f"    👥 Diferencia edad: {carrera['diferencia_edad']} años")
     
     # ===== RESUMEN ESTADÍSTICO =====
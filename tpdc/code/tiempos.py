@@ -0,0 +1,52 @@
+import pandas as pd
+
+# [[h:]m:]s[.fracción]: '1:26.572' (clasificación), '26.898' o '16:44.718' (pit stops), '1:32:10.5'
+PATRON_TIEMPO = r'^\s*(?:(?:(?P<h>\d+):)?(?P<m>\d+):)?(?P<s>\d+)(?:\.(?P<f>\d+))?\s*$'
+
+
+def tiempo_a_ms(tiempos):
+    """
+    Convierte una Series de tiempos en texto a milisegundos enteros (Int64) sin apply
+    por fila: una sola extracción con expresión regular y aritmética sobre columnas.
+    Los valores nulos o con formato inválido quedan como NA.
+    """
+    tiempos = pd.Series(tiempos, copy=False).astype('string')
+    partes = tiempos.str.extract(PATRON_TIEMPO)
+
+    # Fracción a milisegundos: '5' → 500, '57' → 570, '572' → 572, '5721' → 572
+    fraccion = partes['f'].str.slice(0, 3).str.pad(3, side='right', fillchar='0')
+    ms = partes['s'].astype('Int64') * 1000 + fraccion.fillna('000').astype('Int64')
+    ms += partes['m'].fillna('0').astype('Int64') * 60_000
+    ms += partes['h'].fillna('0').astype('Int64') * 3_600_000
+    return ms.where(partes['s'].notna()).astype('Int64')
+
+
+def ms_a_tiempo(ms):
+    """
+    Formato inverso 'm:ss.sss' para mostrar resultados (NA → '')
+    """
+    ms = pd.Series(ms, copy=False).astype('Int64')
+    minutos = (ms // 60_000).astype('string')
+    segundos = (ms % 60_000 // 1000).astype('string').str.zfill(2)
+    milesimas = (ms % 1000).astype('string').str.zfill(3)
+    return (minutos + ':' + segundos + '.' + milesimas).fillna('')
+
+
+if __name__ == "__main__":
+    import time
+    from cargador_datos import cargar_tabla
+
+    columnas = [('qualifying', 'q1'), ('qualifying', 'q2'), ('qualifying', 'q3'),
+                ('results', 'fastestLapTime'), ('pit_stops', 'duration')]
+    for tabla, columna in columnas:
+        texto = cargar_tabla(tabla, [columna])[columna]
+        inicio = time.perf_counter()
+        ms = tiempo_a_ms(texto)
+        invalidos = (texto.notna() & ms.isna()).sum()
+        print(f"⏱️ {tabla}.{columna:<15}: {ms.notna().sum():6,} tiempos en "
+              f"{(time.perf_counter() - inicio) * 1000:5.1f} ms | inválidos: {invalidos} | "
+              f"mínimo {ms_a_tiempo(pd.Series([ms.min()])).iloc[0]}")
+
+    pit = cargar_tabla('pit_stops', ['duration', 'milliseconds'])
+    coincide = (tiempo_a_ms(pit['duration']) == pit['milliseconds']).mean()
+    print(f"✅ pit_stops.duration coincide con milliseconds en el {coincide:.2%} de las filas")
@@ -0,0 +1,113 @@
+import pandas as pd
+import numpy as np
+from almacen_vueltas import cargar_almacen_vueltas
+from resumen_sesiones import CLAVES_SESION
+
+# Estados de pista de FastF1 que neutralizan la carrera: 4 = safety car, 5 = bandera roja,
+# 6 = VSC desplegado, 7 = VSC terminando. Las amarillas (2) son locales y no se descartan.
+ESTADOS_NEUTRALIZADOS = ['4', '5', '6', '7']
+ESTADO_VERDE = '1'
+
+
+def _preparar_estados(estado_pista):
+    """
+    Cambios de estado de pista ordenados por tiempo con el conteo acumulado de
+    neutralizaciones de cada sesión
+    """
+    columnas = CLAVES_SESION + ['Time_ms', 'Status']
+    if not set(columnas) <= set(estado_pista.columns):
+        estado_pista = pd.DataFrame({'year': pd.Series(dtype='int16'), 'evento': pd.Series(dtype='string'),
+                                     'sesion': pd.Series(dtype='string'), 'Time_ms': pd.Series(dtype='Int64'),
+                                     'Status': pd.Series(dtype='string')})
+    estados = estado_pista[columnas].dropna(subset=['Time_ms']).copy()
+    for col in CLAVES_SESION[1:]:
+        estados[col] = estados[col].astype('string')
+    estados['Time_ms'] = estados['Time_ms'].astype('int64')
+    estados['Status'] = estados['Status'].astype('string')
+    estados = estados.sort_values(CLAVES_SESION + ['Time_ms'])
+    estados['neutralizaciones'] = estados['Status'].isin(ESTADOS_NEUTRALIZADOS).astype(np.int32) \
+        .groupby([estados[c] for c in CLAVES_SESION]).cumsum()
+    return estados.sort_values('Time_ms', kind='stable')
+
+
+def _estado_en(vueltas, estados, columna_tiempo):
+    """
+    Estado de pista y neutralizaciones acumuladas vigentes en 'columna_tiempo' de cada
+    vuelta, con un merge_asof hacia atrás por sesión (las vueltas sin tiempo quedan en NA)
+    """
+    con_tiempo = vueltas[['fila'] + CLAVES_SESION].assign(t=vueltas[columna_tiempo])
+    con_tiempo = con_tiempo[con_tiempo['t'].notna()].astype({'t': 'int64'}).sort_values('t')
+    unidas = pd.merge_asof(con_tiempo, estados, left_on='t', right_on='Time_ms', by=CLAVES_SESION,
+                           direction='backward')
+    return unidas.set_index('fila')[['Status', 'neutralizaciones']].reindex(vueltas['fila'])
+
+
+def clasificar_vueltas(vueltas, estado_pista):
+    """
+    Etiqueta cada vuelta del almacén con el estado de pista al empezarla ('estado_inicio'),
+    si hubo una neutralización en algún momento de la vuelta ('neutralizada'), si entró
+    o salió de boxes ('boxes'), si es la primera y si es una vuelta verde representativa
+    ('verde': con tiempo, sin neutralización, sin boxes y no la primera).
+
+    El estado se obtiene con dos uniones por intervalos (inicio y fin de la vuelta contra
+    los cambios de estado ordenados): si el conteo acumulado de neutralizaciones cambia
+    entre ambos extremos, la vuelta tuvo un SC, VSC o bandera roja en el medio.
+    """
+    vueltas = vueltas.reset_index(drop=True).copy()
+    vueltas['fila'] = np.arange(len(vueltas))
+    for col in CLAVES_SESION[1:]:
+        vueltas[col] = vueltas[col].astype('string')
+    estados = _preparar_estados(estado_pista)
+
+    inicio = _estado_en(vueltas, estados, 'LapStartTime_ms')
+    fin = _estado_en(vueltas, estados, 'Time_ms')
+    vueltas['estado_inicio'] = inicio['Status'].to_numpy()
+    vueltas['estado_inicio'] = vueltas['estado_inicio'].fillna(ESTADO_VERDE).astype('category')
+    neutralizaciones_inicio = inicio['neutralizaciones'].fillna(0).to_numpy()
+    neutralizaciones_fin = fin['neutralizaciones'].fillna(0).to_numpy()
+    vueltas['neutralizada'] = vueltas['estado_inicio'].isin(ESTADOS_NEUTRALIZADOS).to_numpy() \
+        | (neutralizaciones_fin > neutralizaciones_inicio)
+
+    vueltas['boxes'] = (vueltas['PitInTime_ms'].notna() | vueltas['PitOutTime_ms'].notna()).astype(bool)
+    vueltas['primera'] = vueltas['LapNumber'].eq(1).fillna(False).astype(bool)
+    vueltas['verde'] = vueltas['LapTime_ms'].notna().astype(bool) & ~vueltas['neutralizada'] \
+        & ~vueltas['boxes'] & ~vueltas['primera']
+    return vueltas.drop(columns='fila')
+
+
+def ritmo_verde(vueltas):
+    """
+    Ritmo en bandera verde de todos los pilotos de una o varias sesiones ('vueltas' ya
+    pasadas por clasificar_vueltas) en un único groupby: vueltas verdes, parte del
+    total, media, mediana y desvío del tiempo de vuelta
+    """
+    tiempo = vueltas['LapTime_ms'].astype('float64')
+    verde = tiempo.where(vueltas['verde'])
+    ritmo = pd.DataFrame({'tiempo': tiempo, 'verde': verde}) \
+        .groupby([vueltas[c] for c in CLAVES_SESION + ['Driver']], observed=True).agg(
+            vueltas=('tiempo', 'size'),
+            vueltas_verdes=('verde', 'count'),
+            media_verde_ms=('verde', 'mean'),
+            mediana_verde_ms=('verde', 'median'),
+            desvio_verde_ms=('verde', 'std')
+        ).reset_index()
+    ritmo['parte_verde'] = ritmo['vueltas_verdes'] / ritmo['vueltas']
+    return ritmo
+
+
+if __name__ == "__main__":
+    import time
+
+    almacen, _ = cargar_almacen_vueltas(('vueltas', 'estado_pista'))
+    inicio = time.perf_counter()
+    clasificadas = clasificar_vueltas(almacen['vueltas'], almacen['estado_pista'])
+    ritmo = ritmo_verde(clasificadas)
+    print(f"🟢 {len(clasificadas):,} vueltas clasificadas y ritmo verde de {len(ritmo):,} pilotos-sesión "
+          f"en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    print(f"   • Vueltas verdes: {clasificadas['verde'].mean():.1%} | neutralizadas: "
+          f"{clasificadas['neutralizada'].mean():.1%} | boxes: {clasificadas['boxes'].mean():.1%}")
+    for (year, evento, sesion), grupo in ritmo.groupby(CLAVES_SESION):
+        print(f"\n🏁 {evento} {year} ({sesion}) — ritmo en verde:")
+        for _, fila in grupo.nsmallest(5, 'mediana_verde_ms').iterrows():
+            print(f"   • {fila['Driver']:<4}: {fila['mediana_verde_ms'] / 1000:7.3f} s "
+                  f"({fila['vueltas_verdes']} de {fila['vueltas']} vueltas)")